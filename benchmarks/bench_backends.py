@@ -0,0 +1,83 @@
+#%%
+"""
+Compares the SQLite and DuckDB storage backends on the bundled analytics queries.
+
+The same synthetic normalized dataset (see bench_db_load.py) is bulk loaded
+into a fresh database of each backend in a temporary directory. Then every
+query of ANALYTICS_BASE_QUERIES runs on both, plus SQLite's summary-table
+versions (ANALYTICS_QUERIES) for reference. Query times are the fastest of
+`--repeat` runs, and the results of both engines are checked to agree.
+
+Usage:
+    python benchmarks/bench_backends.py [--shows 1000000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_db_load import synthetic_normalized_data
+from db_backend import get_backend
+from db_loader import ANALYTICS_BASE_QUERIES, ANALYTICS_QUERIES
+
+def best_of(func, repeat):
+    """Fastest of `repeat` calls, with the last result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _canonical(df):
+    """Rows of a result as a sorted list, rounded so both engines' floats compare."""
+    return sorted(tuple(round(value, 6) if isinstance(value, float) else value for value in row)
+                  for row in df.astype(object).where(df.notna(), None).itertuples(index=False))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shows", type=int, default=1_000_000, help="Number of synthetic shows")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the fastest counts")
+    args = parser.parse_args()
+
+    tables = synthetic_normalized_data(args.shows)
+    rows = sum(len(df) for df in tables.values())
+    print(f"Loading {args.shows} shows ({rows} rows across {len(tables)} tables)")
+
+    timings = {}
+    results = {}
+    with tempfile.TemporaryDirectory() as db_dir:
+        for backend in ("sqlite", "duckdb"):
+            db = get_backend(backend, os.path.join(db_dir, f"bench.{backend}"))
+            start = time.perf_counter()
+            db.bulk_load(tables)
+            timings[(backend, "bulk_load")] = time.perf_counter() - start
+            for name, query in ANALYTICS_BASE_QUERIES.items():
+                timings[(backend, name)], results[(backend, name)] = best_of(lambda: db.run_query(query), args.repeat)
+            if backend == "sqlite":
+                for name in ANALYTICS_BASE_QUERIES:
+                    timings[("sqlite summary", name)], _ = best_of(
+                        lambda: db.run_query(ANALYTICS_QUERIES[name]), args.repeat)
+            db.close_connection()
+
+    print(f"\n{'':>16} {'sqlite':>12} {'duckdb':>12} {'sqlite summary':>16}")
+    for name in ("bulk_load",) + tuple(ANALYTICS_BASE_QUERIES):
+        cells = [f"{timings[(engine, name)] * 1000:10.1f}ms" if (engine, name) in timings else f"{'-':>12}"
+                 for engine in ("sqlite", "duckdb", "sqlite summary")]
+        print(f"{name:>16} {cells[0]:>12} {cells[1]:>12} {cells[2]:>16}")
+
+    mismatched = [name for name in ANALYTICS_BASE_QUERIES
+                  if _canonical(results[("sqlite", name)]) != _canonical(results[("duckdb", name)])]
+    if mismatched:
+        print(f"\nResults differ between the engines for: {', '.join(mismatched)}")
+        return 1
+    print("\nBoth engines return the same results.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
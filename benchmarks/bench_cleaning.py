@@ -0,0 +1,82 @@
+#%%
+"""
+Compares TVMazeDataCleaner.clean_data with the previous row-wise implementation.
+
+The processed January 2024 shows are replicated to `--rows` rows. Each
+implementation runs in its own child process, which reports wall time and the
+growth of peak RSS while cleaning. The legacy cleaner mutates its input, so it
+is measured both in place and with the defensive copy callers needed to keep
+the raw frame.
+
+Usage:
+    python benchmarks/bench_cleaning.py [--rows 1000000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+from data_cleaning import TVMazeDataCleaner, COLUMNS_TO_DROP, COLUMNS_TO_RENAME
+from data_processing import TVMazeDataProcessor
+
+def legacy_clean_data(df):
+    """The cleaner before the column-spec rewrite: in-place edits and per-row lambdas."""
+    df.drop(columns=COLUMNS_TO_DROP, errors='ignore', inplace=True)
+    df.rename(columns=COLUMNS_TO_RENAME, inplace=True)
+    df["official_site_url"] = df["official_site_url"].fillna("Not Available")
+    df["show_language"] = df["show_language"].fillna("Other")
+    df["last_updated_utc"] = pd.to_datetime(df["last_updated_utc"], unit='s', utc=True).dt.tz_localize(None)
+    df["premiere_date"] = pd.to_datetime(df["premiere_date"], errors='coerce')
+    df["end_date"] = pd.to_datetime(df["end_date"], errors='coerce')
+    df["average_runtime_minutes"] = pd.to_numeric(df["average_runtime_minutes"], errors='coerce')
+    df['show_schedule_days'] = df['show_schedule_days'].apply(lambda x: ['Unknown'] if not x else x)
+    df['show_genres'] = df['show_genres'].apply(lambda x: ['Undefined'] if not x else x)
+    return df
+
+def synthetic_frame(rows):
+    """Replicates the processed January 2024 shows up to `rows` rows with unique ids."""
+    shows = TVMazeDataProcessor().process_tv_shows("2024-01")
+    copies = -(-rows // len(shows))
+    df = pd.concat([shows] * copies, ignore_index=True).iloc[:rows]
+    df["id"] = range(1, len(df) + 1)
+    return df
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_child(implementation, rows):
+    df = synthetic_frame(rows)
+    baseline = peak_rss_mib()
+    start = time.perf_counter()
+    if implementation == "legacy":
+        cleaned = legacy_clean_data(df)
+    elif implementation == "legacy+copy":
+        cleaned = legacy_clean_data(df.copy())
+    else:
+        cleaned = TVMazeDataCleaner(df).clean_data()
+    elapsed = time.perf_counter() - start
+    frame_mib = cleaned.memory_usage(deep=True).sum() / 2**20
+    print(f"{implementation:>11}: {elapsed:6.2f}s  peak RSS +{peak_rss_mib() - baseline:7.1f} MiB  "
+          f"output {frame_mib:7.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic frame")
+    parser.add_argument("--child", choices=("legacy", "legacy+copy", "vectorized"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.rows)
+        return
+    print(f"Cleaning {args.rows} rows")
+    for implementation in ("legacy", "legacy+copy", "vectorized"):
+        subprocess.run([sys.executable, __file__, "--rows", str(args.rows), "--child", implementation], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#%%
+"""
+Compares the per-table `to_sql` load with SQLiteDB.bulk_load.
+
+A synthetic normalized dataset shaped like TVMazeDataNormalizer.transform()
+output is loaded into two fresh databases in a temporary directory. bulk_load's
+time includes rebuilding the indexes and summary tables and running ANALYZE,
+which `to_sql` leaves out (its summaries stay empty).
+
+Usage:
+    python benchmarks/bench_db_load.py [--shows 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+from db_loader import SQLiteDB
+
+DAYS = ['Unknown', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def _lookup(column, values):
+    return pd.DataFrame({"id": range(1, len(values) + 1), column: values})
+
+def _junction(rng, show_ids, max_per_show, lookup_size, column):
+    counts = rng.integers(1, max_per_show + 1, size=len(show_ids))
+    return pd.DataFrame({
+        "show_id": np.repeat(show_ids, counts),
+        column: rng.integers(1, lookup_size + 1, size=counts.sum()),
+    })
+
+def synthetic_normalized_data(num_shows, seed=0):
+    """Builds normalized tables for `num_shows` shows with realistic cardinalities."""
+    rng = np.random.default_rng(seed)
+    show_ids = np.arange(1, num_shows + 1)
+    tables = {
+        "show_types": _lookup("show_type", [f"Type {i}" for i in range(11)]),
+        "languages": _lookup("language", [f"Language {i}" for i in range(40)]),
+        "genres": _lookup("genre", [f"Genre {i}" for i in range(27)]),
+        "statuses": _lookup("status", ["Ended", "Running", "To Be Determined"]),
+        "schedule_days": _lookup("day_name", DAYS),
+    }
+    tables["shows"] = pd.DataFrame({
+        "tvmaze_id": show_ids,
+        "show_name": [f"Show {i}" for i in show_ids],
+        "tvmaze_url": [f"https://www.tvmaze.com/shows/{i}" for i in show_ids],
+        "official_site_url": "Not Available",
+        "average_runtime_minutes": rng.integers(5, 120, size=num_shows).astype(float),
+        "premiere_date": pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, size=num_shows), unit="D"),
+        "end_date": pd.NaT,
+        "show_tvmaze_weight": rng.integers(0, 100, size=num_shows),
+        "show_summary": "<p>Synthetic show.</p>",
+        "last_updated_utc": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 86400 * 30, size=num_shows), unit="s"),
+        "imdb_id": None,
+        "image_medium_url": None,
+        "image_original_url": None,
+        "language_id": rng.integers(1, 41, size=num_shows),
+        "show_type_id": rng.integers(1, 12, size=num_shows),
+        "status_id": rng.integers(1, 4, size=num_shows),
+    })
+    tables["show_genres"] = _junction(rng, show_ids, 3, 27, "genre_id")
+    tables["show_schedule_days"] = _junction(rng, show_ids, 5, 8, "day_id")
+    return tables
+
+def load_with_to_sql(db, tables):
+    for table_name, df in tables.items():
+        db.insert_dataframe(df, table_name)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shows", type=int, default=1_000_000, help="Number of synthetic shows")
+    args = parser.parse_args()
+
+    tables = synthetic_normalized_data(args.shows)
+    rows = sum(len(df) for df in tables.values())
+    print(f"Loading {args.shows} shows ({rows} rows across {len(tables)} tables)")
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        for label, load in (("to_sql", load_with_to_sql), ("bulk_load", SQLiteDB.bulk_load)):
+            db = SQLiteDB(db_name=os.path.join(db_dir, f"{label}.db"))
+            start = time.perf_counter()
+            load(db, tables)
+            elapsed = time.perf_counter() - start
+            db.close_connection()
+            print(f"{label:>10}: {elapsed:6.2f}s  {rows / elapsed:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#%%
+"""
+Compares the pandas classes with the lazy Polars engine on the clean and normalize steps.
+
+Synthetic schedules (see synthetic.py) are processed once, then each engine
+cleans and normalizes the shows from two sources:
+
+    arrow    The streaming scan's Arrow table (SHOW_SCHEMA fields only)
+    parquet  A Parquet file of the json_normalize frame, with every nested
+             column (network.*, webChannel.*, ...) that the cleaner drops
+
+Every engine and source runs in a fresh process. Peak RSS is sampled during
+the first run, above the process's RSS once its input is loaded, so memory
+kept by the allocator from an earlier run does not hide it. Times are the
+fastest of `--repeat` later runs.
+
+Usage:
+    python benchmarks/bench_engines.py [--scale 100k] [--repeat 3]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_schedule, parse_scale
+
+ENGINES = ("pandas", "polars")
+SOURCES = ("arrow", "parquet")
+
+def _peak_rss(func, interval=0.005):
+    """Runs func while sampling the process RSS; returns the peak above the RSS before the call."""
+    process = psutil.Process()
+    baseline = process.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], process.memory_info().rss)
+            done.wait(interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak[0], process.memory_info().rss) - baseline
+
+def run_engine(engine, source, json_dir, parquet_path, repeat):
+    """Cleans and normalizes one source with one engine. Runs in its own process."""
+    import pyarrow.parquet as pq
+    from data_cleaning import TVMazeDataCleaner
+    from data_normalization import TVMazeDataNormalizer
+    from data_processing import TVMazeDataProcessor
+
+    processor = TVMazeDataProcessor(json_dir)
+    table = processor.tv_shows_to_table(processor.get_json_files("")) if source == "arrow" else None
+    if engine == "pandas":
+        def chain():
+            shows = processor._table_to_dataframe(table if table is not None else pq.read_table(parquet_path))
+            cleaned = TVMazeDataCleaner(shows).clean_data()
+            return TVMazeDataNormalizer(cleaned).transform()
+    else:
+        import polars as pl
+        from data_lazy import TVMazeLazyEngine
+
+        pl.DataFrame({"x": [1]}).lazy().sort("x").collect()  # Starts the thread pool
+
+        def chain():
+            return TVMazeLazyEngine().run(table if table is not None else parquet_path)
+
+    peak = _peak_rss(chain)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chain()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", help="Episodes: 1k, 10k, 100k, 1m, 10m or a number")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the fastest counts")
+    args = parser.parse_args()
+
+    episodes = parse_scale(args.scale)
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_dir = os.path.join(work_dir, "json")
+        generate_schedule(json_dir, episodes)
+        from data_processing import TVMazeDataProcessor
+        processor = TVMazeDataProcessor(json_dir)
+        processed = processor.tv_shows_to_dataframe(processor.get_json_files(""))
+        parquet_path = os.path.join(work_dir, "processed.parquet")
+        processed.to_parquet(parquet_path)
+        print(f"{episodes} episodes, {len(processed)} shows, {len(processed.columns)} processed columns\n")
+        del processed
+
+        print(f"{'source':>8} {'engine':>8} {'seconds':>10} {'peak RSS':>12}")
+        for source in SOURCES:
+            for engine in ENGINES:
+                with context.Pool(1) as pool:
+                    seconds, peak = pool.apply(run_engine, (engine, source, json_dir, parquet_path, args.repeat))
+                print(f"{source:>8} {engine:>8} {seconds:9.3f}s {peak / 2**20:9.1f} MiB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#%%
+"""
+Compares loading several months one after the other with multi_month.run_months.
+
+A synthetic schedule (see synthetic.py) is generated per month, each with its
+own seed so recurring shows get new versions, then processed, cleaned,
+normalized and loaded into a fresh SQLite database twice:
+
+    sequential  One month at a time in this process, one transaction per load
+                call, like running main.py once per month
+    parallel    run_months: worker processes and a single writer that merges
+                queued months in batched transactions
+
+Parquet export is skipped in both. The speedup is bounded by the CPUs
+available: on one core the parallel run can only overlap loading with
+processing.
+
+Usage:
+    python benchmarks/bench_multi_month.py [--scale 100k] [--months 6] [--workers 4] [--max-batch 6]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic import generate_schedule, parse_scale
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="100k", help="Episodes per month: 1k, 10k, 100k, 1m, 10m or a number")
+    parser.add_argument("--months", type=int, default=6, help="Months to generate, from 2024-01")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--max-batch", type=int, default=None, help="Most months per transaction")
+    args = parser.parse_args()
+
+    from db_loader import SQLiteDB
+    from multi_month import MAX_BATCH_MONTHS, process_month, run_months
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_dir = os.path.join(work_dir, "json")
+        os.makedirs(json_dir)
+        months = [f"{2024 + index // 12}-{index % 12 + 1:02d}" for index in range(args.months)]
+        for seed, year_month in enumerate(months):
+            month_dir = os.path.join(work_dir, year_month)
+            for path in generate_schedule(month_dir, parse_scale(args.scale), seed=seed):
+                # Days keep their number and move to this month
+                day = os.path.basename(path)[8:]
+                shutil.move(path, os.path.join(json_dir, f"{year_month}-{day}"))
+        print(f"{args.months} months of {args.scale} episodes, {os.cpu_count()} CPUs\n")
+
+        start = time.perf_counter()
+        db = SQLiteDB(os.path.join(work_dir, "sequential.db"))
+        for year_month in months:
+            normalized_data, airings = process_month(year_month, json_dir, lookups=db.fetch_lookups(), export=False)
+            db.load_incremental(normalized_data)
+            db.load_airings(airings)
+        db.close_connection()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_months(months, json_dir=json_dir, db_name=os.path.join(work_dir, "parallel.db"), workers=args.workers,
+                   max_batch=args.max_batch or MAX_BATCH_MONTHS, export=False)
+        parallel = time.perf_counter() - start
+
+    print(f"\n{'run':>10} {'seconds':>10}")
+    print(f"{'sequential':>10} {sequential:9.2f}s")
+    print(f"{'parallel':>10} {parallel:9.2f}s  ({sequential / parallel:.2f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+#%%
+"""
+Times TVMazeDataNormalizer.transform at growing row counts to check it scales linearly.
+
+The cleaned January 2024 shows are replicated with unique ids and written to a
+temporary Parquet file per size.
+
+Usage:
+    python benchmarks/bench_normalization.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+from data_cleaning import TVMazeDataCleaner
+from data_normalization import TVMazeDataNormalizer
+from data_processing import TVMazeDataProcessor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Row counts to time")
+    args = parser.parse_args()
+
+    cleaned = TVMazeDataCleaner(TVMazeDataProcessor().process_tv_shows("2024-01")).clean_data()
+    with tempfile.TemporaryDirectory() as data_dir:
+        for rows in args.rows:
+            df = pd.concat([cleaned] * (rows // len(cleaned) + 1), ignore_index=True).iloc[:rows]
+            df["tvmaze_id"] = pd.array(range(1, rows + 1), dtype="Int64")
+            parquet_path = os.path.join(data_dir, f"{rows}.parquet")
+            df.to_parquet(parquet_path)
+
+            normalizer = TVMazeDataNormalizer(parquet_path)
+            start = time.perf_counter()
+            normalizer.transform()
+            elapsed = time.perf_counter() - start
+            print(f"{rows:>10} rows: {elapsed:6.2f}s  {elapsed / rows * 1e6:5.2f} us/row")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#%%
+"""
+Compares the json_normalize, streaming Arrow and process-pool paths of TVMazeDataProcessor.
+
+The bundled January 2024 files are replicated into a temporary directory with
+shifted show ids, so each copy adds new unique shows. Reports wall time and
+peak traced memory (from a separate traced run) for each path. Peak memory of
+the parallel path only covers the parent process.
+
+Usage:
+    python benchmarks/bench_processing.py [--copies 12] [--workers 4]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+from data_processing import TVMazeDataProcessor
+
+def replicate_json(source_dir, target_dir, copies):
+    """Writes `copies` versions of each source file, offsetting show ids per copy."""
+    for file_name in sorted(os.listdir(source_dir)):
+        if not file_name.endswith(".json"):
+            continue
+        with open(os.path.join(source_dir, file_name), encoding="utf-8") as f:
+            data = json.load(f)
+        for copy in range(copies):
+            for episode in data:
+                show = episode.get("_embedded", {}).get("show")
+                if show is not None:
+                    show["id"] = show["id"] % 10_000_000 + copy * 10_000_000
+            with open(os.path.join(target_dir, f"{copy:03d}-{file_name}"), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+def measure(func):
+    """Times one untraced run, then takes peak memory from a second traced run."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=12, help="Copies of the bundled month to process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes for the parallel path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as json_dir:
+        replicate_json(os.path.join(project_root, "json"), json_dir, args.copies)
+        processor = TVMazeDataProcessor(json_dir)
+        json_files = processor.get_json_files("2024-01")
+        print(f"Processing {len(json_files)} files")
+
+        runs = (
+            ("json_normalize", {}),
+            ("streaming", {"streaming": True}),
+            (f"{args.workers} workers", {"workers": args.workers}),
+        )
+        for label, options in runs:
+            df, elapsed, peak = measure(lambda: processor.tv_shows_to_dataframe(json_files, **options))
+            print(f"{label:>15}: {elapsed:6.2f}s  peak {peak / 2**20:7.1f} MiB  {len(df)} shows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#%%
+"""
+Runs the pipeline benchmarks on synthetic schedules and checks them against earlier commits.
+
+Each benchmark runs `--repeat` times on data from synthetic.py and keeps the
+fastest run. With `--save`, results are appended to benchmarks/results.jsonl
+tagged with the current commit. Every run is compared with the latest saved
+result for the same benchmark and scale from another commit (or from
+`--baseline`), and the script exits with status 1 when a benchmark is slower
+than that by more than `--threshold`.
+
+Benchmarks:
+    process_json_normalize  TVMazeDataProcessor, json_normalize path
+    process_streaming       TVMazeDataProcessor, streaming Arrow path
+    clean                   TVMazeDataCleaner.clean_data
+    normalize               TVMazeDataNormalizer.transform
+    db_bulk_load            SQLiteDB.bulk_load into a fresh database
+    db_load_incremental     SQLiteDB.load_incremental into a fresh database
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale 100k [--repeat 3] [--only clean normalize]
+                                        [--save] [--baseline COMMIT] [--threshold 0.2]
+                                        [--data-dir DIR]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_cleaning import TVMazeDataCleaner
+from data_normalization import TVMazeDataNormalizer
+from data_processing import TVMazeDataProcessor
+from db_loader import SQLiteDB
+from synthetic import generate_schedule, parse_scale
+
+RESULTS_PATH = os.path.join(project_root, "benchmarks", "results.jsonl")
+BENCHMARKS = ("process_json_normalize", "process_streaming", "clean", "normalize",
+              "db_bulk_load", "db_load_incremental")
+
+def current_commit():
+    """Short hash of HEAD, with '-dirty' when the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=project_root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+def ensure_data(base_dir, episodes, seed):
+    """Generates the synthetic schedule once per scale and seed; later runs reuse it."""
+    data_dir = os.path.join(base_dir, f"episodes-{episodes}-seed-{seed}")
+    marker = os.path.join(data_dir, ".complete")
+    if not os.path.exists(marker):
+        start = time.perf_counter()
+        generate_schedule(data_dir, episodes, seed=seed)
+        open(marker, "w").close()
+        print(f"Generated {episodes} episodes in {time.perf_counter() - start:.1f}s")
+    return TVMazeDataProcessor(data_dir).get_json_files("")
+
+def time_best(func, setup, repeat):
+    """Fastest of `repeat` runs of func(setup()), with setup excluded from the timing."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        result = func(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_suite(json_files, episodes, work_dir, repeat, only=None):
+    """
+    Runs the benchmarks in pipeline order; each stage's output feeds the next.
+    Processing throughput counts episodes read, the later stages count shows
+    (or loaded rows for the database benchmarks).
+
+    Returns:
+        list: One dict per benchmark with seconds, rows and rows per second.
+    """
+    selected = set(only or BENCHMARKS)
+    processor = TVMazeDataProcessor(os.path.dirname(json_files[0]))
+    results = []
+
+    def record(name, seconds, rows):
+        results.append({"benchmark": name, "seconds": round(seconds, 4), "rows": rows,
+                        "rows_per_second": round(rows / seconds, 1) if seconds else None})
+        print(f"{name:>24}: {seconds:8.3f}s  {rows:>10} rows  {rows / seconds:12,.0f} rows/s")
+
+    if "process_json_normalize" in selected:
+        seconds, _ = time_best(lambda files: processor.tv_shows_to_dataframe(files), lambda: json_files, repeat)
+        record("process_json_normalize", seconds, episodes)
+    # The streaming output feeds the later stages: it has a fixed schema at every scale
+    seconds, processed = time_best(lambda files: processor.tv_shows_to_dataframe(files, streaming=True),
+                                   lambda: json_files, repeat if "process_streaming" in selected else 1)
+    if "process_streaming" in selected:
+        record("process_streaming", seconds, episodes)
+
+    seconds, cleaned = time_best(lambda df: TVMazeDataCleaner(df).clean_data(), lambda: processed,
+                                 repeat if "clean" in selected else 1)
+    if "clean" in selected:
+        record("clean", seconds, len(cleaned))
+
+    seconds, normalized = time_best(lambda df: TVMazeDataNormalizer(df).transform(), lambda: cleaned,
+                                    repeat if "normalize" in selected else 1)
+    if "normalize" in selected:
+        record("normalize", seconds, len(cleaned))
+
+    loaded_rows = sum(len(df) for df in normalized.values())
+    for name, load in (("db_bulk_load", SQLiteDB.bulk_load), ("db_load_incremental", SQLiteDB.load_incremental)):
+        if name not in selected:
+            continue
+        databases = []
+
+        def fresh_db():
+            db_path = os.path.join(work_dir, f"{name}-{len(databases)}.db")
+            databases.append(SQLiteDB(db_name=db_path))
+            return databases[-1]
+
+        seconds, _ = time_best(lambda db: load(db, normalized), fresh_db, repeat)
+        for db in databases:
+            db.close_connection()
+        record(name, seconds, loaded_rows)
+    return results
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def compare(results, history, commit, scale, threshold, baseline=None):
+    """
+    Compares results with the latest matching entry of another (or the baseline) commit.
+
+    Returns:
+        list: (benchmark, baseline seconds, seconds, relative change) for each regression.
+    """
+    regressions = []
+    for result in results:
+        previous = [
+            entry for entry in history
+            if entry["benchmark"] == result["benchmark"] and entry["scale"] == scale
+            and (entry["commit"] == baseline if baseline else entry["commit"] != commit)
+        ]
+        if not previous:
+            print(f"{result['benchmark']:>24}: no baseline")
+            continue
+        reference = previous[-1]
+        change = result["seconds"] / reference["seconds"] - 1
+        flag = "REGRESSION" if change > threshold else "ok"
+        print(f"{result['benchmark']:>24}: {change:+7.1%} vs {reference['commit']}  {flag}")
+        if change > threshold:
+            regressions.append((result["benchmark"], reference["seconds"], result["seconds"], change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="10k", help="Episodes: 1k, 10k, 100k, 1m, 10m or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest counts")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Benchmarks to run")
+    parser.add_argument("--data-dir", default=None,
+                        help="Keep the generated data here and reuse it (default: a temporary directory)")
+    parser.add_argument("--results", default=RESULTS_PATH, help="History file of saved results")
+    parser.add_argument("--save", action="store_true", help="Append the results to the history file")
+    parser.add_argument("--baseline", default=None, help="Commit to compare with (default: latest other commit)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    episodes = parse_scale(args.scale)
+    commit = current_commit()
+    print(f"Benchmarking {episodes} episodes at {commit}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_files = ensure_data(args.data_dir or work_dir, episodes, args.seed)
+        results = run_suite(json_files, episodes, work_dir, args.repeat, args.only)
+
+    regressions = compare(results, load_history(args.results), commit, episodes, args.threshold, args.baseline)
+
+    if args.save:
+        run_info = {
+            "commit": commit,
+            "scale": episodes,
+            "seed": args.seed,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        }
+        with open(args.results, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({**run_info, **result}) + "\n")
+        print(f"Results appended to {args.results}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmarks slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
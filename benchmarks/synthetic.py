@@ -0,0 +1,181 @@
+#%%
+"""
+Deterministic synthetic TVmaze schedules for benchmarks.
+
+Writes one raw file per day shaped like `json/2024-01-*.json`: episodes with an
+embedded show, including the nested network/webChannel/externals/image/_links
+objects and the nulls and empty lists the cleaner has to handle. The same
+scale and seed always give byte-identical files.
+
+Days hold at most EPISODES_PER_DAY episodes, so large scales span more days
+(10M episodes cover about 200 days from 2024-01-01) instead of growing files
+past what one day of the API returns.
+
+Usage:
+    python benchmarks/synthetic.py 100k --json-dir /tmp/tvmaze-100k [--seed 0] [--raw-format ndjson.gz]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+from raw_storage import RAW_FORMATS, raw_path, write_raw
+
+EPISODES_PER_DAY = 50_000
+MIN_DAYS = 31  # A full month, like the bundled sample
+EPISODES_PER_SHOW = 11  # Ratio of the January 2024 sample (8,200 episodes, 725 shows)
+START_DATE = date(2024, 1, 1)
+UPDATED_BASE = 1704067200  # 2024-01-01T00:00:00Z
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+TYPES = ["Scripted", "Reality", "Animation", "Documentary", "Talk Show", "News", "Variety", "Game Show", "Sports"]
+LANGUAGES = ["English", "Japanese", "Korean", "Chinese", "Spanish", "Russian", "German", "French", "Portuguese", None]
+GENRES = ["Drama", "Comedy", "Action", "Crime", "Romance", "Family", "Fantasy", "Thriller",
+          "Science-Fiction", "Anime", "Mystery", "Horror", "Adventure", "History", "Music"]
+STATUSES = ["Running", "Ended", "To Be Determined"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+COUNTRIES = [("United States", "US", "America/New_York"), ("Japan", "JP", "Asia/Tokyo"),
+             ("Korea, Republic of", "KR", "Asia/Seoul"), ("United Kingdom", "GB", "Europe/London")]
+
+def parse_scale(scale):
+    """Turns '1k', '10M', '2500' into an episode count."""
+    scale = str(scale).strip().lower()
+    if scale in SCALES:
+        return SCALES[scale]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(scale[-1:], 1)
+    return int(float(scale.rstrip("km")) * multiplier)
+
+def layout(episodes):
+    """Returns (days, shows) used for a number of episodes."""
+    days = max(MIN_DAYS, math.ceil(episodes / EPISODES_PER_DAY))
+    shows = max(1, episodes // EPISODES_PER_SHOW)
+    return days, shows
+
+def _mix(show_id, seed, salt):
+    """Cheap deterministic hash of a show id, so show fields need no stored state."""
+    value = (show_id * 2654435761 + seed * 97 + salt * 40503) & 0xFFFFFFFF
+    value ^= value >> 16
+    return (value * 73244475) & 0xFFFFFFFF
+
+def make_show(show_id, seed=0):
+    """Builds the embedded show object for an id; the same id always gives the same show."""
+    h = [_mix(show_id, seed, salt) for salt in range(8)]
+    country_name, country_code, timezone = COUNTRIES[h[0] % len(COUNTRIES)]
+    channel = {
+        "id": 1 + h[1] % 500,
+        "name": f"Channel {h[1] % 500}",
+        "country": {"name": country_name, "code": country_code, "timezone": timezone},
+        "officialSite": f"https://channel{h[1] % 500}.example.com/" if h[1] % 3 else None,
+    }
+    on_network = h[2] % 2 == 0
+    premiered = START_DATE - timedelta(days=h[3] % 9000)
+    status = STATUSES[h[4] % len(STATUSES)]
+    name = f"Show {show_id}"
+    slug = f"show-{show_id}"
+    return {
+        "id": show_id,
+        "url": f"https://www.tvmaze.com/shows/{show_id}/{slug}",
+        "name": name,
+        "type": TYPES[h[0] % len(TYPES)],
+        "language": LANGUAGES[h[5] % len(LANGUAGES)],
+        "genres": [GENRES[(h[6] + i * 5) % len(GENRES)] for i in range(h[6] % 4)],
+        "status": status,
+        "runtime": None if h[7] % 4 == 0 else 15 + h[7] % 46,
+        "averageRuntime": None if h[7] % 10 == 0 else 15 + h[7] % 46,
+        "premiered": None if h[3] % 20 == 0 else premiered.isoformat(),
+        "ended": (START_DATE + timedelta(days=h[4] % 60)).isoformat() if status == "Ended" else None,
+        "officialSite": f"https://www.{slug}.example.com/" if h[5] % 3 else None,
+        "schedule": {"time": f"{h[6] % 24:02d}:00" if h[6] % 2 else "", "days": DAYS[h[2] % 7:h[2] % 7 + h[7] % 3]},
+        "rating": {"average": None if h[3] % 2 else round(5 + (h[3] % 50) / 10, 1)},
+        "weight": h[1] % 101,
+        "network": channel if on_network else None,
+        "webChannel": None if on_network else channel,
+        "dvdCountry": None,
+        "externals": {"tvrage": None, "thetvdb": h[2] % 400_000 or None,
+                      "imdb": f"tt{h[4] % 10_000_000:07d}" if h[4] % 3 else None},
+        "image": None if h[6] % 8 == 0 else {
+            "medium": f"https://static.tvmaze.com/uploads/images/medium_portrait/{h[0] % 500}/{show_id}.jpg",
+            "original": f"https://static.tvmaze.com/uploads/images/original_untouched/{h[0] % 500}/{show_id}.jpg",
+        },
+        "summary": f"<p>{name} is a synthetic {TYPES[h[0] % len(TYPES)].lower()} show.</p>" if h[7] % 5 else None,
+        "updated": UPDATED_BASE + h[3] % 2_600_000,
+        "_links": {"self": {"href": f"https://api.tvmaze.com/shows/{show_id}"}},
+    }
+
+def make_day(day_index, episodes, shows, first_episode_id, seed=0):
+    """Builds one day of schedule entries."""
+    rng = random.Random(f"{seed}-{day_index}")
+    airdate = (START_DATE + timedelta(days=day_index)).isoformat()
+    entries = []
+    for offset in range(episodes):
+        episode_id = first_episode_id + offset
+        show_id = 1 + rng.randrange(shows)
+        show = make_show(show_id, seed)
+        number = 1 + rng.randrange(24)
+        entries.append({
+            "id": episode_id,
+            "url": f"https://www.tvmaze.com/episodes/{episode_id}/episode-{number}",
+            "name": f"Episode {number}",
+            "season": 1 + rng.randrange(10),
+            "number": number,
+            "type": "regular",
+            "airdate": airdate,
+            "airtime": show["schedule"]["time"],
+            "airstamp": f"{airdate}T{show['schedule']['time'] or '00:00'}:00+00:00",
+            "runtime": show["averageRuntime"],
+            "rating": {"average": None},
+            "image": None,
+            "summary": None,
+            "_links": {
+                "self": {"href": f"https://api.tvmaze.com/episodes/{episode_id}"},
+                "show": {"href": f"https://api.tvmaze.com/shows/{show_id}", "name": show["name"]},
+            },
+            "_embedded": {"show": show},
+        })
+    return entries
+
+def generate_schedule(json_dir, episodes, seed=0, raw_format="json"):
+    """
+    Writes `episodes` synthetic schedule entries into daily raw files.
+
+    Args:
+        json_dir (str): Target directory, created if needed.
+        episodes (int): Total number of episodes.
+        seed (int, optional): Changes every generated value. Defaults to 0.
+        raw_format (str, optional): One of raw_storage.RAW_FORMATS. Defaults to "json".
+
+    Returns:
+        list: Paths of the written files, earliest day first.
+    """
+    os.makedirs(json_dir, exist_ok=True)
+    days, shows = layout(episodes)
+    base, extra = divmod(episodes, days)
+    paths = []
+    first_episode_id = 1
+    for day_index in range(days):
+        count = base + (1 if day_index < extra else 0)
+        file_path = raw_path(json_dir, (START_DATE + timedelta(days=day_index)).isoformat(), raw_format)
+        write_raw(file_path, make_day(day_index, count, shows, first_episode_id, seed))
+        paths.append(file_path)
+        first_episode_id += count
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scale", help=f"Episodes to generate: {', '.join(SCALES)} or a number such as 250k")
+    parser.add_argument("--json-dir", required=True, help="Directory for the generated raw files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--raw-format", default="json", choices=RAW_FORMATS)
+    args = parser.parse_args()
+
+    episodes = parse_scale(args.scale)
+    paths = generate_schedule(args.json_dir, episodes, seed=args.seed, raw_format=args.raw_format)
+    print(f"Wrote {episodes} episodes in {len(paths)} files to {args.json_dir}")
+
+if __name__ == "__main__":
+    main()
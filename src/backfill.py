@@ -0,0 +1,41 @@
+#%%
+import argparse
+import sys
+from data_ingestion import TVMazeDataFetcher
+from raw_storage import RAW_FORMATS
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fetch TVmaze schedules for a date range, resuming from the fetch manifest."
+    )
+    parser.add_argument("start", help="First month 'YYYY-MM' or day 'YYYY-MM-DD', or a 'START..END' range")
+    parser.add_argument("end", nargs="?", help="Last month 'YYYY-MM' or day 'YYYY-MM-DD' (inclusive)")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Conditionally re-request days that are already settled")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum concurrent requests")
+    parser.add_argument("--json-dir", default=None, help="Directory for the raw JSON files")
+    parser.add_argument("--raw-format", default="json", choices=RAW_FORMATS,
+                        help="Landing format of the raw files")
+    parser.add_argument("--split-shows", action="store_true",
+                        help="Store each show version once and reference it from the daily files")
+    args = parser.parse_args(argv)
+
+    if args.end is None:
+        args.start, _, args.end = args.start.partition("..")
+        if not args.end:
+            parser.error("Provide an end bound or a 'START..END' range")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    fetcher = TVMazeDataFetcher(json_dir=args.json_dir, raw_format=args.raw_format, split_shows=args.split_shows)
+    failed = fetcher.backfill(args.start, args.end, revalidate=args.revalidate, max_in_flight=args.max_in_flight)
+    if failed:
+        print(f"\n\nCould not fetch {len(failed)} days: {', '.join(failed)}")
+        return 1
+    print(f"\n\nBackfill {args.start}..{args.end} complete")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+#%%
+"""
+Command line for the TVmaze pipeline, for scripts and cron.
+
+Subcommands:
+    fetch    Download the raw schedules of a month (or up to --to) from the API
+    process  Raw files -> cleaned shows and airings, exported as Parquet datasets
+    load     Exported datasets of a month -> database
+    query    Run a named analytics query (--list) or any SQL, read-only
+    report   Print the stage report of a run (the latest by default)
+
+Only the standard library is imported at startup: each subcommand imports the
+modules it needs when it runs, so `query` and `report` never load pandas,
+Arrow or the HTTP clients.
+
+Usage:
+    python src/cli.py fetch 2024-01 [--to 2024-03]
+    python src/cli.py process 2024-01 [--profiling-mode stats]
+    python src/cli.py load 2024-01 [--backend duckdb]
+    python src/cli.py query genre_count [--format csv]
+    python src/cli.py query "SELECT COUNT(*) AS n FROM airings WHERE airdate >= ?" --param 2024-01-15
+    python src/cli.py report [RUN]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+
+try:
+    from .db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND, DEFAULT_DB_NAMES, resolve_backend
+    from .db_schema import ANALYTICS_BASE_QUERIES, ANALYTICS_QUERIES
+    from .raw_storage import RAW_FORMATS
+except ImportError:
+    from db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND, DEFAULT_DB_NAMES, resolve_backend
+    from db_schema import ANALYTICS_BASE_QUERIES, ANALYTICS_QUERIES
+    from raw_storage import RAW_FORMATS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_FORMATS = ("table", "csv", "json")
+PROFILING_MODES = ("full", "minimal", "sampled", "stats", "off")  # TVMazeDataProfiler.MODES
+# Engines for the clean and normalize steps: pandas classes, or data_lazy.TVMazeLazyEngine (needs polars)
+ENGINES = ("pandas", "polars")
+# Named statements each backend can run: SQLite reads its summary tables
+NAMED_QUERIES = {"sqlite": ANALYTICS_QUERIES, "duckdb": ANALYTICS_BASE_QUERIES}
+# Databases written before the summary tables existed fall back to scanning the base tables
+SUMMARY_CHECK_SQL = "SELECT 1 FROM summary_runtime"
+
+def _year_month(value):
+    try:
+        datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid month '{value}'. Use YYYY-MM")
+    return value
+
+def _instrumentation(command, year_month, args):
+    try:
+        from .instrumentation import Instrumentation
+    except ImportError:
+        from instrumentation import Instrumentation
+    run_name = f"cli_{command}_{year_month}_{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+    return Instrumentation(run_name, report_dir=args.report_dir, profiler=args.profile)
+
+def _print_rows(columns, rows, output_format="table"):
+    """Prints rows as an aligned table, CSV or a JSON list of objects."""
+    if output_format == "csv":
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+    elif output_format == "json":
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=1, default=str))
+    else:
+        cells = [[str(column) for column in columns]] + [["" if value is None else str(value) for value in row] for row in rows]
+        widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+        for index, row in enumerate(cells):
+            print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+            if index == 0:
+                print("  ".join("-" * width for width in widths))
+
+def fetch(args):
+    try:
+        from .data_ingestion import TVMazeDataFetcher
+    except ImportError:
+        from data_ingestion import TVMazeDataFetcher
+    fetcher = TVMazeDataFetcher(json_dir=args.json_dir, raw_format=args.raw_format, split_shows=args.split_shows)
+    failed = fetcher.backfill(args.year_month, args.to or args.year_month, revalidate=args.revalidate)
+    if failed:
+        print(f"\n\nCould not fetch {len(failed)} days: {', '.join(failed)}")
+        return 1
+    return 0
+
+def process(args):
+    try:
+        from .data_processing import TVMazeDataProcessor
+        from .data_cleaning import TVMazeDataCleaner
+        from .data_export import ParquetExporter
+    except ImportError:
+        from data_processing import TVMazeDataProcessor
+        from data_cleaning import TVMazeDataCleaner
+        from data_export import ParquetExporter
+
+    instrumentation = _instrumentation("process", args.year_month, args)
+    try:
+        processor = TVMazeDataProcessor(args.json_dir)
+        if args.engine == "polars":
+            try:
+                from .data_lazy import TVMazeLazyEngine
+            except ImportError:
+                from data_lazy import TVMazeLazyEngine
+            json_files = processor.get_json_files(args.year_month)
+            if not json_files:
+                print(f"No JSON files found for date substring '{args.year_month}'")
+                return 1
+            # The lazy engine cleans the Arrow shows directly; pandas only sees the result
+            instrumentation.wrap(processor, "tv_shows_and_airings_to_tables")
+            shows, airings = processor.tv_shows_and_airings_to_tables(json_files, workers=args.workers)
+            cleaned_df = instrumentation.wrap(TVMazeLazyEngine(), "clean_data").clean_data(shows)
+            airings_df = airings.to_pandas()
+            processed_df = processor._table_to_dataframe(shows) if args.profiling_mode != "off" else None
+        else:
+            instrumentation.wrap(processor, "process_tv_shows_and_airings")
+            processed_df, airings_df = processor.process_tv_shows_and_airings(args.year_month, workers=args.workers)
+            if processed_df is None:
+                return 1
+        if args.profiling_mode != "off":
+            try:
+                from .data_profiling import TVMazeDataProfiler
+            except ImportError:
+                from data_profiling import TVMazeDataProfiler
+            profiling_dir = os.path.join(args.project_root, "profiling") if args.project_root else None
+            profiler = TVMazeDataProfiler(profiling_dir=profiling_dir, mode=args.profiling_mode)
+            instrumentation.wrap(profiler, "generate_profile_report").generate_profile_report(processed_df)
+        if args.engine == "pandas":
+            cleaned_df = instrumentation.wrap(TVMazeDataCleaner(processed_df), "clean_data").clean_data()
+        exporter = ParquetExporter(args.project_root)
+        instrumentation.wrap(exporter, "export_to_dataset")
+        instrumentation.wrap(exporter, "export_airings")
+        exporter.export_to_dataset(cleaned_df, args.year_month)
+        exporter.export_airings(airings_df, args.year_month)
+    finally:
+        instrumentation.write_report()
+        instrumentation.close()
+    return 0
+
+def load(args):
+    try:
+        from .data_export import ParquetExporter
+        from .data_normalization import TVMazeDataNormalizer
+        from .db_backend import get_backend
+    except ImportError:
+        from data_export import ParquetExporter
+        from data_normalization import TVMazeDataNormalizer
+        from db_backend import get_backend
+
+    exporter = ParquetExporter(args.project_root)
+    year, month = (int(part) for part in args.year_month.split("-"))
+    partition = [("year", "=", year), ("month", "=", month)]
+    if not os.path.isdir(exporter.dataset_path()):
+        print(f"No exported dataset in {exporter.dataset_path()}. Run 'process {args.year_month}' first")
+        return 1
+    if args.engine == "pandas":
+        cleaned_df = exporter.read_dataset(filters=partition).drop(columns=list(exporter.PARTITIONING))
+        shows_count = len(cleaned_df)
+    else:
+        try:
+            from .data_lazy import TVMazeLazyEngine
+        except ImportError:
+            from data_lazy import TVMazeLazyEngine
+        # Only the month's partition is scanned, and only when the plan runs
+        cleaned_df = TVMazeLazyEngine().scan(exporter.dataset_path(), partition={"year": year, "month": month})
+        shows_count = cleaned_df.select("tvmaze_id").collect().height
+    if not shows_count:
+        print(f"No exported shows for {args.year_month}. Run 'process {args.year_month}' first")
+        return 1
+    airings_df = None
+    if os.path.isdir(exporter.dataset_path(exporter.AIRINGS_DATASET_NAME)):
+        airings_df = exporter.read_dataset(filters=partition, dataset_name=exporter.AIRINGS_DATASET_NAME)
+        airings_df = airings_df.drop(columns=list(exporter.PARTITIONING))
+
+    instrumentation = _instrumentation("load", args.year_month, args)
+    db = get_backend(args.backend, args.db_name)
+    try:
+        if args.engine == "pandas":
+            normalizer = TVMazeDataNormalizer(cleaned_df, lookups=db.fetch_lookups())
+            normalized_data = instrumentation.wrap(normalizer, "transform").transform()
+        else:
+            engine = instrumentation.wrap(TVMazeLazyEngine(lookups=db.fetch_lookups()), "transform")
+            normalized_data = engine.transform(cleaned_df, cleaned=True)
+        instrumentation.wrap(db, "load_incremental").load_incremental(normalized_data)
+        if airings_df is not None and not airings_df.empty:
+            instrumentation.wrap(db, "load_airings").load_airings(airings_df)
+    finally:
+        db.close_connection()
+        instrumentation.write_report()
+        instrumentation.close()
+    return 0
+
+def _database_error(backend):
+    """The base exception of the backend's driver."""
+    if backend == "duckdb":
+        import duckdb
+        return duckdb.Error
+    import sqlite3
+    return sqlite3.Error
+
+def _connect_read_only(backend, db_path):
+    """Opens the database read-only, without the pipeline modules."""
+    if backend == "duckdb":
+        import duckdb
+        return duckdb.connect(db_path, read_only=True)
+    import sqlite3
+    from urllib.parse import quote
+    return sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True)
+
+def _named_queries(backend, conn):
+    """The named statements for this database: the base-table queries when SQLite has no summary tables yet."""
+    if backend != "sqlite":
+        return NAMED_QUERIES[backend]
+    try:
+        if conn.execute(SUMMARY_CHECK_SQL).fetchone() is not None:
+            return NAMED_QUERIES[backend]
+    except _database_error(backend):
+        pass
+    return ANALYTICS_BASE_QUERIES
+
+def query(args):
+    backend = resolve_backend(args.backend)
+    named = NAMED_QUERIES[backend]
+    if args.list or not args.statement:
+        _print_rows(["name", "sql"], [(name, " ".join(sql.split())) for name, sql in named.items()], args.format)
+        return 0
+
+    db_path = os.path.join(PROJECT_ROOT, "db", args.db_name or DEFAULT_DB_NAMES[backend])
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        return 1
+    conn = _connect_read_only(backend, db_path)
+    try:
+        if args.statement in named:
+            named = _named_queries(backend, conn)
+        cursor = conn.execute(named.get(args.statement, args.statement), args.param)
+        columns = [column[0] for column in cursor.description or []]
+        rows = cursor.fetchall() if columns else []
+    except _database_error(backend) as e:
+        print(f"Query failed: {e}")
+        return 1
+    finally:
+        conn.close()
+    _print_rows(columns, rows, args.format)
+    return 0
+
+def report(args):
+    report_dir = args.report_dir or os.path.join(PROJECT_ROOT, "reports")
+    if args.run:
+        report_path = os.path.join(report_dir, args.run if args.run.endswith(".json") else f"{args.run}.json")
+    else:
+        reports = [os.path.join(report_dir, f) for f in os.listdir(report_dir) if f.endswith(".json")] \
+            if os.path.isdir(report_dir) else []
+        if not reports:
+            print(f"No run reports in {report_dir}")
+            return 1
+        report_path = max(reports, key=os.path.getmtime)
+    with open(report_path, encoding="utf-8") as f:
+        run = json.load(f)
+
+    if args.format == "table":
+        print(f"Run {run['run']} started {run['started_at']}, {run['total_wall_seconds']}s in total\n")
+    columns = ["stage", "status", "wall_seconds", "cpu_seconds", "rows_in", "rows_out", "peak_rss_mb", "read_mb", "written_mb"]
+    rows = []
+    for stage in run["stages"]:
+        rows.append([
+            stage["stage"], stage.get("status"), stage.get("wall_seconds"), stage.get("cpu_seconds"),
+            stage.get("rows_in"), stage.get("rows_out"),
+            *(round(stage[key] / 2**20, 1) if stage.get(key) is not None else None
+              for key in ("peak_rss_bytes", "bytes_read", "bytes_written")),
+        ])
+    _print_rows(columns, rows, args.format)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("year_month", type=_year_month, help="Month to work on, as YYYY-MM")
+        command.add_argument("--report-dir", default=None, help="Run reports directory (default: reports/)")
+        command.add_argument("--profile", choices=("cprofile", "pyinstrument"), default=None,
+                             help="Profile every stage and save the output next to the report")
+
+    def add_database(command):
+        command.add_argument("--backend", choices=BACKENDS, default=None,
+                             help=f"Database backend (default: ${BACKEND_ENV_VAR}, then {DEFAULT_BACKEND})")
+        command.add_argument("--db-name", default=None,
+                             help="Database in the 'db' folder (default: tvmaze.db or tvmaze.duckdb)")
+
+    fetch_parser = commands.add_parser("fetch", help="Download raw schedules from the API")
+    fetch_parser.add_argument("year_month", type=_year_month, help="First month to fetch, as YYYY-MM")
+    fetch_parser.add_argument("--to", type=_year_month, default=None, help="Last month to fetch (default: year_month)")
+    fetch_parser.add_argument("--json-dir", default=None, help="Directory for the raw files")
+    fetch_parser.add_argument("--raw-format", default="json", choices=RAW_FORMATS,
+                              help="Landing format of the raw files")
+    fetch_parser.add_argument("--split-shows", action="store_true",
+                              help="Store each show version once and reference it from the daily files")
+    fetch_parser.add_argument("--revalidate", action="store_true",
+                              help="Conditionally re-request days that are already settled")
+    fetch_parser.set_defaults(func=fetch)
+
+    process_parser = commands.add_parser("process", help="Process, clean and export a month of raw files")
+    add_common(process_parser)
+    process_parser.add_argument("--json-dir", default=None, help="Directory of the raw files")
+    process_parser.add_argument("--project-root", default=None, help="Root of the 'data' and 'profiling' outputs")
+    process_parser.add_argument("--profiling-mode", default="off", choices=PROFILING_MODES)
+    process_parser.add_argument("--workers", type=int, default=None, help="Parse raw files across processes")
+    process_parser.add_argument("--engine", choices=ENGINES, default="pandas", help="Engine of the clean step")
+    process_parser.set_defaults(func=process)
+
+    load_parser = commands.add_parser("load", help="Load an exported month into the database")
+    add_common(load_parser)
+    add_database(load_parser)
+    load_parser.add_argument("--project-root", default=None, help="Root of the 'data' folder to read")
+    load_parser.add_argument("--engine", choices=ENGINES, default="pandas", help="Engine of the normalize step")
+    load_parser.set_defaults(func=load)
+
+    query_parser = commands.add_parser("query", help="Run a named query or SQL, read-only")
+    query_parser.add_argument("statement", nargs="?", help="Name from --list, or SQL with ? placeholders")
+    query_parser.add_argument("--param", action="append", default=[], help="Statement parameter (repeatable)")
+    query_parser.add_argument("--list", action="store_true", help="List the named queries")
+    query_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="table")
+    add_database(query_parser)
+    query_parser.set_defaults(func=query)
+
+    report_parser = commands.add_parser("report", help="Print the stage report of a run")
+    report_parser.add_argument("run", nargs="?", help="Run name (default: the latest report)")
+    report_parser.add_argument("--report-dir", default=None, help="Run reports directory (default: reports/)")
+    report_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="table")
+    report_parser.set_defaults(func=report)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
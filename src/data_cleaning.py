@@ -1,4 +1,87 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STRING = pd.StringDtype("pyarrow")
+
+COLUMNS_TO_DROP = [
+    'runtime', 'dvdCountry', 'schedule.time', 'rating.average',
+    'externals.tvrage', 'externals.thetvdb', '_links.self.href', '_links.previousepisode.href',
+    '_links.previousepisode.name', '_links.nextepisode.href', '_links.nextepisode.name',
+    'network', 'network.country.code', 'network.country.name', 'network.country.timezone',
+    'network.id', 'network.name', 'network.officialSite', 'webChannel', 'webChannel.country',
+    'webChannel.country.code', 'webChannel.country.name', 'webChannel.country.timezone',
+    'webChannel.id', 'webChannel.name', 'webChannel.officialSite', 'dvdCountry',
+    'dvdCountry.code', 'dvdCountry.name', 'dvdCountry.timezone', 'image'
+]
+
+COLUMNS_TO_RENAME = {
+    'id': 'tvmaze_id',
+    'url': 'tvmaze_url',
+    'officialSite': 'official_site_url',
+    'name': 'show_name',
+    'type': 'show_type',
+    'language': 'show_language',
+    'genres': 'show_genres',
+    'status': 'show_status',
+    'averageRuntime': 'average_runtime_minutes',
+    'premiered': 'premiere_date',
+    'ended': 'end_date',
+    'weight': 'show_tvmaze_weight',
+    'summary': 'show_summary',
+    'updated': 'last_updated_utc',
+    'schedule.days': 'show_schedule_days',
+    'externals.imdb': 'imdb_id',
+    'image.medium': 'image_medium_url',
+    'image.original': 'image_original_url',
+}
+
+# Per renamed column: the value that replaces missing entries (empty lists for list
+# columns) and the target type. Types are pandas dtypes or one of the conversions
+# 'date' (YYYY-MM-DD strings), 'epoch' (Unix seconds to naive UTC) and 'list'.
+COLUMN_SPEC = {
+    'tvmaze_id': {'dtype': 'Int64'},
+    'tvmaze_url': {'dtype': STRING},
+    'official_site_url': {'fill': 'Not Available', 'dtype': STRING},
+    'show_name': {'dtype': STRING},
+    'show_type': {'dtype': 'category'},
+    'show_language': {'fill': 'Other', 'dtype': 'category'},
+    'show_genres': {'fill': ['Undefined'], 'dtype': 'list'},
+    'show_status': {'dtype': 'category'},
+    'average_runtime_minutes': {'dtype': 'Int64'},
+    'premiere_date': {'dtype': 'date'},
+    'end_date': {'dtype': 'date'},
+    'show_tvmaze_weight': {'dtype': 'Int64'},
+    'show_summary': {'dtype': STRING},
+    'last_updated_utc': {'dtype': 'epoch'},
+    'show_schedule_days': {'fill': ['Unknown'], 'dtype': 'list'},
+    'imdb_id': {'dtype': STRING},
+    'image_medium_url': {'dtype': STRING},
+    'image_original_url': {'dtype': STRING},
+}
+
+def _fill_empty_lists(series, fill):
+    """Replaces missing values and empty lists with `fill`, without a per-row Python call."""
+    # Arrow measures the cells in C, whether they hold lists or numpy arrays (e.g. from read_parquet)
+    lengths = pc.list_value_length(pa.array(series, from_pandas=True))
+    empty = pc.fill_null(pc.equal(lengths, 0), True).to_numpy(zero_copy_only=False)
+    if not empty.any():
+        return series
+    filler = pd.Series([fill] * int(empty.sum()), index=series.index[empty], dtype=object)
+    return series.where(~empty, filler)
+
+def _convert(series, dtype):
+    """Casts one column to a COLUMN_SPEC type."""
+    if dtype == 'date':
+        # Arrow's strptime kernel; unparseable strings become NaT like errors='coerce'
+        dates = pc.strptime(pa.array(series, type=pa.string(), from_pandas=True),
+                            format='%Y-%m-%d', unit='s', error_is_null=True)
+        return pd.Series(dates.to_numpy(zero_copy_only=False), index=series.index, name=series.name)
+    if dtype == 'epoch':
+        return pd.to_datetime(pd.to_numeric(series, errors='coerce'), unit='s')
+    if dtype == 'Int64':
+        return pd.to_numeric(series, errors='coerce').round().astype('Int64')
+    return series.astype(dtype)
 
 class TVMazeDataCleaner:
     def __init__(self, df):
@@ -18,51 +101,28 @@ class TVMazeDataCleaner:
         - Handling missing values
         - Converting data types
 
+        Everything is driven by COLUMNS_TO_DROP, COLUMNS_TO_RENAME and
+        COLUMN_SPEC. The input DataFrame is left untouched: kept columns that
+        need no conversion are shared with it, the rest are rebuilt.
+
         Returns:
             pd.DataFrame: The cleaned DataFrame
         """
-        columns_to_drop = [
-            'runtime', 'dvdCountry', 'schedule.time', 'rating.average',
-            'externals.tvrage', 'externals.thetvdb', '_links.self.href', '_links.previousepisode.href',
-            '_links.previousepisode.name', '_links.nextepisode.href', '_links.nextepisode.name',
-            'network', 'network.country.code', 'network.country.name', 'network.country.timezone',
-            'network.id', 'network.name', 'network.officialSite', 'webChannel', 'webChannel.country',
-            'webChannel.country.code', 'webChannel.country.name', 'webChannel.country.timezone',
-            'webChannel.id', 'webChannel.name', 'webChannel.officialSite', 'dvdCountry',
-            'dvdCountry.code', 'dvdCountry.name', 'dvdCountry.timezone', 'image'
-        ]
-
-        self.df.drop(columns=columns_to_drop, errors='ignore', inplace=True)
-
-        self.df.rename(columns={
-            'id': 'tvmaze_id',
-            'url': 'tvmaze_url',
-            'officialSite': 'official_site_url',
-            'name': 'show_name',
-            'type': 'show_type',
-            'language': 'show_language',
-            'genres': 'show_genres',
-            'status': 'show_status',
-            'averageRuntime': 'average_runtime_minutes',
-            'premiered': 'premiere_date',
-            'ended': 'end_date',
-            'weight': 'show_tvmaze_weight',
-            'summary': 'show_summary',
-            'updated': 'last_updated_utc',
-            'schedule.days': 'show_schedule_days',
-            'externals.imdb': 'imdb_id',
-            'image.medium': 'image_medium_url',
-            'image.original': 'image_original_url',
-        }, inplace=True)
-
-        # Handle missing values and type conversions
-        self.df["official_site_url"] = self.df["official_site_url"].fillna("Not Available")
-        self.df["show_language"] = self.df["show_language"].fillna("Other")
-        self.df["last_updated_utc"] = pd.to_datetime(self.df["last_updated_utc"], unit='s', utc=True).dt.tz_localize(None)
-        self.df["premiere_date"] = pd.to_datetime(self.df["premiere_date"], errors='coerce')
-        self.df["end_date"] = pd.to_datetime(self.df["end_date"], errors='coerce')
-        self.df["average_runtime_minutes"] = pd.to_numeric(self.df["average_runtime_minutes"], errors='coerce')
-        self.df['show_schedule_days'] = self.df['show_schedule_days'].apply(lambda x: ['Unknown'] if not x else x)
-        self.df['show_genres'] = self.df['show_genres'].apply(lambda x: ['Undefined'] if not x else x)
+        drop = set(COLUMNS_TO_DROP)
+        cleaned = {}
+        for column in self.df.columns:
+            if column in drop:
+                continue
+            name = COLUMNS_TO_RENAME.get(column, column)
+            series = self.df[column]
+            spec = COLUMN_SPEC.get(name)
+            if spec is not None:
+                if spec['dtype'] == 'list':
+                    series = _fill_empty_lists(series, spec['fill'])
+                else:
+                    if 'fill' in spec:
+                        series = series.fillna(spec['fill'])
+                    series = _convert(series, spec['dtype'])
+            cleaned[name] = series.rename(name)
 
-        return self.df
+        return pd.DataFrame(cleaned, index=self.df.index, copy=False)
@@ -1,7 +1,24 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import glob
 import os
+import shutil
+import tempfile
+
+# Low-cardinality columns stored with Parquet dictionary encoding in the dataset
+DICTIONARY_COLUMNS = [
+    'show_type', 'show_language', 'show_status',
+    'show_genres.list.element', 'show_schedule_days.list.element',
+]
 
 class ParquetExporter:
+    DATASET_NAME = "tvmaze_dataset"
+    AIRINGS_DATASET_NAME = "tvmaze_airings"
+    PARTITIONING = ("year", "month")
+    ROW_GROUP_SIZE = 64_000  # Rows per Parquet row group in the dataset
+
     def __init__(self, project_root=None):
         """
         Initializes the ParquetExporter with the project root directory.
@@ -31,3 +48,115 @@ class ParquetExporter:
 
         print(f"Data exported to {file_path}")
         return file_path
+
+    def dataset_path(self, dataset_name=None):
+        """Returns the directory of a Parquet dataset in the data folder."""
+        return os.path.join(self.data_dir, dataset_name or self.DATASET_NAME)
+
+    def export_to_dataset(self, df, year_month, partitioning=None, row_group_size=None, dataset_name=None,
+                          sort_by="tvmaze_id"):
+        """
+        Exports one month of cleaned shows into a hive-partitioned Parquet dataset.
+
+        Rows get `year` and `month` columns from `year_month`, are sorted by
+        `sort_by` and written with zstd, dictionary encoding on DICTIONARY_COLUMNS
+        and column statistics, so readers can prune partitions and row groups.
+        `year` and `month` are always partition keys, nested under any other
+        `partitioning` columns (e.g. show_status=Ended/year=2024/month=1). The
+        month is written to a staging directory next to the dataset first, and
+        only once that succeeded are its existing partitions swapped for the new
+        ones; the rest of the dataset is left untouched, so months can be
+        appended or re-exported whatever the layout, and a failed export keeps
+        the previous data.
+
+        Args:
+            df (pd.DataFrame): The cleaned DataFrame to export.
+            year_month (str): The month of the data, as YYYY-MM.
+            partitioning (tuple, optional): Columns to partition on; `year` and `month`
+                                            are added when missing. Defaults to PARTITIONING.
+            row_group_size (int, optional): Rows per row group. Defaults to ROW_GROUP_SIZE.
+            dataset_name (str, optional): Dataset directory in the data folder. Defaults to DATASET_NAME.
+            sort_by (str or list, optional): Sort columns. Defaults to "tvmaze_id".
+
+        Returns:
+            str: The directory of the dataset.
+        """
+        partitioning = list(partitioning or self.PARTITIONING)
+        partitioning += [column for column in self.PARTITIONING if column not in partitioning]
+        row_group_size = row_group_size or self.ROW_GROUP_SIZE
+        year, month = (int(part) for part in year_month.split("-"))
+
+        table = pa.Table.from_pandas(df.sort_values(by=sort_by), preserve_index=False)
+        table = table.append_column("year", pa.array([year] * len(table), pa.int16()))
+        table = table.append_column("month", pa.array([month] * len(table), pa.int8()))
+
+        file_options = ds.ParquetFileFormat().make_write_options(
+            compression="zstd",
+            use_dictionary=[column for column in DICTIONARY_COLUMNS if column.split('.')[0] in table.column_names],
+        )
+        dataset_dir = self.dataset_path(dataset_name)
+        month_values = {"year": year, "month": month}
+        month_dirs = os.path.join(*(f"{column}={month_values[column]}" if column in month_values else "*"
+                                    for column in partitioning))
+        staging_dir = tempfile.mkdtemp(dir=self.data_dir, prefix=f".{os.path.basename(dataset_dir)}-")
+        try:
+            ds.write_dataset(
+                table,
+                staging_dir,
+                format="parquet",
+                partitioning=partitioning,
+                partitioning_flavor="hive",
+                file_options=file_options,
+                basename_template="part-{i}.parquet",
+                min_rows_per_group=row_group_size,
+                max_rows_per_group=row_group_size,
+                preserve_order=True,
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            # Every partition of this month goes, including values the new rows no longer have
+            replaced_dir = os.path.join(staging_dir, ".replaced")
+            os.makedirs(replaced_dir)
+            for index, partition_dir in enumerate(glob.glob(os.path.join(dataset_dir, month_dirs))):
+                os.replace(partition_dir, os.path.join(replaced_dir, str(index)))
+            for staged_dir in glob.glob(os.path.join(staging_dir, month_dirs)):
+                partition_dir = os.path.join(dataset_dir, os.path.relpath(staged_dir, staging_dir))
+                os.makedirs(os.path.dirname(partition_dir), exist_ok=True)
+                os.replace(staged_dir, partition_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        print(f"Data exported to {dataset_dir}")
+        return dataset_dir
+
+    def export_airings(self, airings, year_month):
+        """
+        Exports one month of airings (see TVMazeDataProcessor.process_tv_shows_and_airings)
+        into the AIRINGS_DATASET_NAME dataset, sorted by air time so date-range
+        reads only touch the matching row groups.
+
+        Args:
+            airings (pd.DataFrame): Rows following data_processing.AIRING_SCHEMA.
+            year_month (str): The month of the data, as YYYY-MM.
+
+        Returns:
+            str: The directory of the dataset.
+        """
+        return self.export_to_dataset(airings, year_month, dataset_name=self.AIRINGS_DATASET_NAME,
+                                      sort_by=["airdate", "airstamp", "episode_id"])
+
+    def read_dataset(self, columns=None, filters=None, dataset_name=None):
+        """
+        Reads a Parquet dataset, loading only the requested columns and the
+        partitions and row groups that can match `filters`.
+
+        Args:
+            columns (list, optional): Columns to read. Defaults to None (all columns).
+            filters (list or pyarrow.compute.Expression, optional): Row filters, e.g.
+                [("year", "=", 2024), ("month", "=", 1)]. Defaults to None.
+            dataset_name (str, optional): Dataset directory in the data folder. Defaults to DATASET_NAME.
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        table = pq.read_table(self.dataset_path(dataset_name), columns=columns, filters=filters, partitioning="hive")
+        return table.to_pandas()
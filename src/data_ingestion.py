@@ -1,10 +1,127 @@
 #%%
 import requests
-from datetime import datetime, timedelta
+import aiohttp
+import asyncio
+import hashlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import time
 import calendar
 import json
 import os
+
+try:
+    from .raw_storage import RAW_FORMATS, ShowStore, raw_path, write_raw
+except ImportError:
+    from raw_storage import RAW_FORMATS, ShowStore, raw_path, write_raw
+#%%
+class SlidingWindowLimiter:
+    """
+    An asyncio sliding-window rate limiter, used as `async with limiter:` around a request.
+
+    At most `max_requests` requests are in flight or finished within the last
+    `window` seconds. A slot is counted from when its request finished, which
+    is never before the server saw it, so however long requests wait in the
+    connection pool the server cannot see more than `max_requests` in any
+    window. The full budget stays usable: a burst up front, then one request
+    as each slot frees up.
+    """
+
+    def __init__(self, max_requests, window):
+        self.max_requests = max_requests
+        self.window = window
+        self.in_flight = 0
+        self.finished = deque()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()
+
+    def block_for(self, seconds):
+        """Stops letting requests through for the given number of seconds, e.g. after a 429."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def __aenter__(self):
+        """Waits until a request fits in the window and takes its slot."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self.finished and now - self.finished[0] >= self.window:
+                    self.finished.popleft()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                elif self.in_flight + len(self.finished) < self.max_requests:
+                    self.in_flight += 1
+                    return self
+                elif self.finished:
+                    await asyncio.sleep(self.finished[0] + self.window - now)
+                else:
+                    # Every slot is in flight: wait for one to finish
+                    self._released.clear()
+                    await self._released.wait()
+
+    async def __aexit__(self, *exc_info):
+        """Marks the request finished; its slot frees up `window` seconds from now."""
+        self.in_flight -= 1
+        self.finished.append(time.monotonic())
+        self._released.set()
+#%%
+class FetchManifest:
+    """
+    An append-only record of the days already fetched, kept next to the JSON files.
+
+    Each line of the manifest is a JSON object with the date, the ETag and
+    Last-Modified headers of the response, the SHA-256 of its body and when it
+    was fetched. The last line for a date wins, so a crash can at worst lose
+    the line being written.
+    """
+    FILENAME = "_manifest.jsonl"
+
+    def __init__(self, json_dir):
+        self.path = os.path.join(json_dir, self.FILENAME)
+        self.entries = self._load()
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from an interrupted run
+                entries[entry["date"]] = entry
+        return entries
+
+    def get(self, date_str):
+        return self.entries.get(date_str)
+
+    def record(self, date_str, etag=None, last_modified=None, sha256=None):
+        """Appends an entry for a freshly fetched or revalidated day."""
+        entry = {
+            "date": date_str,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": sha256,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.entries[date_str] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_settled(self, date_str, settle_days):
+        """
+        Tells whether a day was last fetched at least `settle_days` after it aired.
+        Schedules keep changing around their air date, so earlier fetches are stale.
+        """
+        entry = self.get(date_str)
+        if entry is None:
+            return False
+        fetched_at = datetime.fromisoformat(entry["fetched_at"]).replace(tzinfo=None)
+        return fetched_at >= datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=settle_days)
 #%%
 class TVMazeDataFetcher:
     """
@@ -13,11 +130,26 @@ class TVMazeDataFetcher:
     BASE_URL = "http://api.tvmaze.com/schedule/web"
     BATCH_SIZE = 20   # Max requests per rate limit window
     DELAY = 10        # Rate limit window in seconds
+    MAX_IN_FLIGHT = 5  # Concurrent requests in the async fetch mode
+    MAX_RETRIES = 5   # Attempts per day before giving up in the async fetch mode
+    SETTLE_DAYS = 7   # Days after airing before a fetched schedule is considered final
 
-    def __init__(self, json_dir=None):
+    def __init__(self, json_dir=None, base_url=None, raw_format="json", split_shows=False):
+        """
+        Args:
+            json_dir (str, optional): Directory for the raw files. Defaults to a 'json' folder in the project root.
+            base_url (str, optional): Schedule endpoint. Defaults to BASE_URL.
+            raw_format (str, optional): Landing format from raw_storage.RAW_FORMATS, e.g. 'ndjson.gz'.
+                                        Defaults to 'json' (pretty-printed, one array per day).
+            split_shows (bool, optional): Land each show version once in a raw_storage.ShowStore
+                                          and keep only references in the daily files. Defaults to False.
+        """
+        self.base_url = base_url or self.BASE_URL
+        self.raw_format = raw_format
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.json_dir = json_dir or os.path.join(self.project_root, "json")
         os.makedirs(self.json_dir, exist_ok=True)
+        self.show_store = ShowStore(self.json_dir, raw_format) if split_shows else None
 
     def fetch_data(self, year_month):
         """
@@ -26,27 +158,18 @@ class TVMazeDataFetcher:
         Args:
             year_month (str): Format "YYYY-MM" (e.g., "2024-12")
         """
-        try:
-            year, month = map(int, year_month.split('-'))
-        except ValueError:
-            raise ValueError("Invalid year-month format. Please use 'YYYY-MM'")
-
-        _, num_days = calendar.monthrange(year, month)
-        start_date = datetime(year, month, 1)
+        dates = self._month_dates(year_month)
         request_count = 0
 
-        print(f"\nFetching shows for {year_month} ({num_days} days)...")
+        print(f"\nFetching shows for {year_month} ({len(dates)} days)...")
         
-        for day in range(num_days):
-            current_date = start_date + timedelta(days=day)
-            date_str = current_date.strftime("%Y-%m-%d")
-            
+        for date_str in dates:
             try:
-                response = requests.get(f"{self.BASE_URL}?date={date_str}", timeout=10)
+                response = requests.get(f"{self.base_url}?date={date_str}", timeout=10)
                 response.raise_for_status()
                 schedule_data = response.json()
                 
-                self._save_to_json(date_str, schedule_data)
+                self._save_raw(date_str, schedule_data)
                 print(f"{date_str}", end=' ', flush=True)
                 
                 request_count += 1
@@ -58,19 +181,214 @@ class TVMazeDataFetcher:
                 print(f"\nError fetching data for {date_str}: {e}")
                 time.sleep(self.DELAY)
                 continue
+
+    def fetch_data_concurrent(self, year_month, max_in_flight=None):
+        """
+        Fetches a month like `fetch_data`, but keeps several days in flight at once
+        over a pooled keep-alive session.
+
+        Requests are paced by a sliding window over the TVmaze budget of
+        BATCH_SIZE requests per DELAY seconds. A 429 response pauses the whole
+        limiter for the duration given in its Retry-After header.
+
+        Args:
+            year_month (str): Format "YYYY-MM" (e.g., "2024-12")
+            max_in_flight (int, optional): Maximum concurrent requests. Defaults to MAX_IN_FLIGHT.
+
+        Returns:
+            list: Dates that could not be fetched after MAX_RETRIES attempts.
+        """
+        dates = self._month_dates(year_month)
+        print(f"\nFetching shows for {year_month} ({len(dates)} days, concurrent)...")
+        return asyncio.run(self._fetch_dates_async(dates, max_in_flight or self.MAX_IN_FLIGHT))
+
+    def backfill(self, start, end, revalidate=False, max_in_flight=None):
+        """
+        Fetches every day between two months (or dates), resuming from the fetch manifest.
+
+        Days whose file exists and whose manifest entry is settled are skipped.
+        Unsettled days, and every recorded day when `revalidate` is set, are
+        re-requested with If-None-Match/If-Modified-Since so unchanged days cost
+        a 304 and no rewrite. Progress is recorded per day, so an interrupted
+        backfill picks up where it stopped.
+
+        Args:
+            start (str): First month "YYYY-MM" or day "YYYY-MM-DD".
+            end (str): Last month "YYYY-MM" or day "YYYY-MM-DD", inclusive.
+            revalidate (bool, optional): Conditionally re-request settled days too.
+            max_in_flight (int, optional): Maximum concurrent requests. Defaults to MAX_IN_FLIGHT.
+
+        Returns:
+            list: Dates that could not be fetched after MAX_RETRIES attempts.
+        """
+        manifest = FetchManifest(self.json_dir)
+        dates = [
+            date_str for date_str in self._range_dates(start, end)
+            if revalidate
+            or not self._json_exists(date_str)
+            or not manifest.is_settled(date_str, self.SETTLE_DAYS)
+        ]
+        print(f"\nBackfilling {start}..{end}: {len(dates)} days to request...")
+        if not dates:
+            return []
+        return asyncio.run(self._fetch_dates_async(dates, max_in_flight or self.MAX_IN_FLIGHT, manifest))
+
+    def _json_exists(self, date_str):
+        # Days landed before a format change still count, whatever their format
+        return any(os.path.exists(raw_path(self.json_dir, date_str, raw_format)) for raw_format in RAW_FORMATS)
+
+    def _make_rate_limiter(self):
+        """Builds the rate limiter of the async fetch mode: BATCH_SIZE requests in any DELAY seconds."""
+        return SlidingWindowLimiter(self.BATCH_SIZE, self.DELAY)
+
+    async def _fetch_dates_async(self, dates, max_in_flight, manifest=None):
+        """
+        Fetches the given dates concurrently and returns the ones that failed.
+        With a manifest, requests are conditional and every success is recorded.
+        """
+        limiter = self._make_rate_limiter()
+        queue = asyncio.Queue()
+        for date_str in dates:
+            queue.put_nowait(date_str)
+        failed = []
+
+        connector = aiohttp.TCPConnector(limit=max_in_flight, keepalive_timeout=self.DELAY)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def worker():
+                while not queue.empty():
+                    date_str = queue.get_nowait()
+                    if not await self._fetch_day_async(session, limiter, date_str, manifest):
+                        failed.append(date_str)
+
+            await asyncio.gather(*(worker() for _ in range(min(max_in_flight, len(dates)))))
+
+        return sorted(failed)
+
+    async def _fetch_day_async(self, session, limiter, date_str, manifest=None):
+        """Fetches and saves one day, retrying on 429s and transient errors."""
+        headers = self._conditional_headers(date_str, manifest)
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                async with limiter, session.get(self.base_url, params={"date": date_str}, headers=headers) as response:
+                    if response.status == 429:
+                        wait = self._retry_after(response.headers.get("Retry-After"), attempt)
+                        print(f"\nRate limited on {date_str}. Waiting {wait:.1f} seconds...")
+                        limiter.block_for(wait)
+                        continue
+                    if response.status == 304:
+                        entry = manifest.get(date_str)
+                        manifest.record(date_str, entry["etag"], entry["last_modified"], entry["sha256"])
+                        print(f"{date_str} (unchanged)", end=' ', flush=True)
+                        return True
+                    response.raise_for_status()
+                    body = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"\nError fetching data for {date_str}: {e}")
+                await asyncio.sleep(min(2 ** attempt, self.DELAY))
+                continue
+
+            sha256 = hashlib.sha256(body).hexdigest()
+            entry = manifest.get(date_str) if manifest is not None else None
+            if entry is None or entry["sha256"] != sha256 or not self._json_exists(date_str):
+                await asyncio.to_thread(self._save_raw, date_str, json.loads(body))
+            if manifest is not None:
+                manifest.record(date_str, etag, last_modified, sha256)
+            print(f"{date_str}", end=' ', flush=True)
+            return True
+        return False
+
+    def _conditional_headers(self, date_str, manifest):
+        """Builds If-None-Match/If-Modified-Since headers from a day's manifest entry."""
+        entry = manifest.get(date_str) if manifest is not None else None
+        if entry is None or not self._json_exists(date_str):
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _retry_after(self, header, attempt):
+        """
+        Parses a Retry-After header (delta-seconds or HTTP-date) into seconds,
+        falling back to exponential backoff when it is missing or malformed.
+        """
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                pass
+            try:
+                retry_at = parsedate_to_datetime(header)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+        return float(min(2 ** attempt, self.DELAY))
+
+    def _month_dates(self, year_month):
+        """
+        Lists every date of a month as "YYYY-MM-DD" strings.
+
+        Args:
+            year_month (str): Format "YYYY-MM" (e.g., "2024-12")
+
+        Returns:
+            list: The dates of the month in order.
+        """
+        try:
+            year, month = map(int, year_month.split('-'))
+        except ValueError:
+            raise ValueError("Invalid year-month format. Please use 'YYYY-MM'")
+
+        _, num_days = calendar.monthrange(year, month)
+        start_date = datetime(year, month, 1)
+        return [(start_date + timedelta(days=day)).strftime("%Y-%m-%d") for day in range(num_days)]
+
+    def _range_dates(self, start, end):
+        """
+        Lists every date between two bounds as "YYYY-MM-DD" strings.
+
+        Args:
+            start (str): "YYYY-MM" (first day of that month) or "YYYY-MM-DD".
+            end (str): "YYYY-MM" (last day of that month) or "YYYY-MM-DD", inclusive.
+
+        Returns:
+            list: The dates of the range in order.
+        """
+        first = start if len(start) == 10 else self._month_dates(start)[0]
+        last = end if len(end) == 10 else self._month_dates(end)[-1]
+        try:
+            first_date = datetime.strptime(first, "%Y-%m-%d")
+            last_date = datetime.strptime(last, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Invalid date range. Please use 'YYYY-MM' or 'YYYY-MM-DD' bounds")
+        if last_date < first_date:
+            raise ValueError(f"Range end {end} is before its start {start}")
+
+        num_days = (last_date - first_date).days + 1
+        return [(first_date + timedelta(days=day)).strftime("%Y-%m-%d") for day in range(num_days)]
     
-    def _save_to_json(self, date_str, data):
+    def _save_raw(self, date_str, data):
         """
-        Save the fetched data to a JSON file.
+        Atomically save the fetched data in the configured raw format.
 
         Args:
             date_str (str): The date string used as the filename.
-            data (dict or list): The data to be saved in JSON format.
+            data (dict or list): The schedule data to save.
 
         Saves:
-            A JSON file named '<date_str>.json' in the specified directory.
+            A file named '<date_str>.<raw_format>' in the specified directory, and
+            the shows it references in the show store when `split_shows` is set.
+            Copies of the day in other formats are removed once it is in place,
+            so readers never pick up the stale one.
         """
-        file_path = os.path.join(self.json_dir, f"{date_str}.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_raw(raw_path(self.json_dir, date_str, self.raw_format), data, show_store=self.show_store)
+        for raw_format in RAW_FORMATS:
+            stale_path = raw_path(self.json_dir, date_str, raw_format)
+            if raw_format != self.raw_format and os.path.exists(stale_path):
+                os.remove(stale_path)
 # %%
@@ -0,0 +1,278 @@
+import os
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    from .data_cleaning import COLUMNS_TO_DROP, COLUMNS_TO_RENAME, COLUMN_SPEC, STRING
+    from .data_normalization import DAY_ORDER
+    from .data_processing import TVMazeDataProcessor
+except ImportError:
+    from data_cleaning import COLUMNS_TO_DROP, COLUMNS_TO_RENAME, COLUMN_SPEC, STRING
+    from data_normalization import DAY_ORDER
+    from data_processing import TVMazeDataProcessor
+
+# Same dimensions as TVMazeDataNormalizer.transform: (lookup table, cleaned column, value column, foreign key)
+SCALAR_DIMENSIONS = (
+    ('languages', 'show_language', 'language', 'language_id'),
+    ('show_types', 'show_type', 'show_type', 'show_type_id'),
+    ('statuses', 'show_status', 'status', 'status_id'),
+)
+# (lookup table, cleaned list column, value column, junction table, foreign key, value order)
+LIST_DIMENSIONS = (
+    ('genres', 'show_genres', 'genre', 'show_genres', 'genre_id', None),
+    ('schedule_days', 'show_schedule_days', 'day_name', 'show_schedule_days', 'day_id', DAY_ORDER),
+)
+SHOW_COLUMNS = [
+    'tvmaze_id', 'show_name', 'tvmaze_url', 'official_site_url', 'average_runtime_minutes', 'premiere_date',
+    'end_date', 'show_tvmaze_weight', 'show_summary', 'last_updated_utc',
+    'imdb_id', 'image_medium_url', 'image_original_url',
+]
+
+def _require_polars():
+    if pl is None:
+        raise ImportError("The lazy engine needs the 'polars' package")
+
+class TVMazeLazyEngine:
+    """
+    Runs the clean and normalize steps as one lazy Polars query plan over Arrow data.
+
+    It is an alternative to TVMazeDataCleaner followed by TVMazeDataNormalizer,
+    driven by the same COLUMNS_TO_DROP, COLUMNS_TO_RENAME and COLUMN_SPEC, and
+    gives the same DataFrames. Nothing is materialized until the plan is
+    collected: projection pushdown means dropped columns (`network.*`,
+    `webChannel.*`, ...) are never read from Parquet or copied from Arrow, and
+    the cleaned shows feeding every normalized table are computed once. Polars
+    runs the plan on all cores (POLARS_MAX_THREADS caps them).
+
+    Sources can be raw files (read with TVMazeDataProcessor's streaming scan,
+    which only extracts SHOW_SCHEMA fields), an Arrow table, a pandas or Polars
+    frame, or the path of a Parquet file or dataset directory.
+
+    Attributes:
+        lookups (dict): Lookup tables already stored, keyed by table name (see SQLiteDB.fetch_lookups).
+        workers (int): Processes for the raw file scan, None for serial.
+    """
+
+    def __init__(self, lookups=None, workers=None):
+        """
+        Args:
+            lookups (dict, optional): Lookup tables already stored; known values keep their ids
+                                      and only new values get new ones. Defaults to None.
+            workers (int, optional): Parse raw files across this many processes. Defaults to None (serial).
+        """
+        _require_polars()
+        self.lookups = lookups or {}
+        self.workers = workers
+
+    def scan(self, source, partition=None):
+        """
+        Wraps a source in a LazyFrame without copying or reading it.
+
+        Args:
+            source (list, str, pa.Table, pd.DataFrame, pl.DataFrame or pl.LazyFrame): Raw file paths,
+                a Parquet file or dataset directory (hive partitions become columns), or frames.
+            partition (dict, optional): Partition values of a dataset directory to keep, e.g.
+                                        {"year": 2024, "month": 1}. Other partitions are not read
+                                        and the partition columns are dropped. Defaults to None.
+
+        Returns:
+            pl.LazyFrame: The source rows.
+        """
+        if isinstance(source, pl.LazyFrame):
+            return source
+        if isinstance(source, (list, tuple)):
+            source = TVMazeDataProcessor().tv_shows_to_table(list(source), workers=self.workers)
+        if isinstance(source, str):
+            if not os.path.isdir(source):
+                return pl.scan_parquet(source)
+            dataset = pl.scan_parquet(os.path.join(source, "**", "*.parquet"), hive_partitioning=True)
+            if partition:
+                dataset = dataset.filter(**partition).drop(list(partition))
+            return dataset
+        if isinstance(source, pd.DataFrame):
+            return pl.from_pandas(source).lazy()
+        return pl.from_arrow(source).lazy() if isinstance(source, pa.Table) else source.lazy()
+
+    def clean(self, source):
+        """
+        Plans TVMazeDataCleaner.clean_data: drops, renames, fills and casts each column.
+
+        Category columns stay strings in the plan; `clean_data` turns them into
+        pandas categories on the way out.
+
+        Returns:
+            pl.LazyFrame: The cleaned shows.
+        """
+        shows = self.scan(source)
+        drop = set(COLUMNS_TO_DROP)
+        columns = []
+        for column in shows.collect_schema().names():
+            if column in drop:
+                continue
+            name = COLUMNS_TO_RENAME.get(column, column)
+            spec = COLUMN_SPEC.get(name)
+            columns.append((self._clean_expr(pl.col(column), spec) if spec else pl.col(column)).alias(name))
+        return shows.select(columns)
+
+    @staticmethod
+    def _clean_expr(column, spec):
+        """Builds the expression for one COLUMN_SPEC entry."""
+        dtype = spec['dtype']
+        if dtype == 'list':
+            fill = pl.lit(spec['fill'], dtype=pl.List(pl.String))
+            return pl.when(column.is_null() | (column.list.len() == 0)).then(fill).otherwise(column)
+        if 'fill' in spec:
+            column = column.fill_null(spec['fill'])
+        if dtype == 'date':
+            return column.cast(pl.String).str.to_date('%Y-%m-%d', strict=False)
+        if dtype == 'epoch':
+            return pl.from_epoch(column.cast(pl.Float64, strict=False).cast(pl.Int64), time_unit='s')
+        if dtype == 'Int64':
+            return column.cast(pl.Float64, strict=False).round().cast(pl.Int64)
+        return column.cast(pl.String)
+
+    def _lookup(self, table_name, value_column, values, order=None):
+        """
+        Plans one lookup table like TVMazeDataNormalizer._encode_dimension.
+
+        Values are sorted by `order` (others last, alphabetically) or alphabetically;
+        stored values keep their id and new ones are numbered after the highest stored id.
+        """
+        uniques = values.select(pl.col(value_column)).drop_nulls().unique()
+        if order is None:
+            uniques = uniques.sort(value_column)
+        else:
+            rank = pl.col(value_column).replace_strict(order, range(len(order)), default=len(order),
+                                                       return_dtype=pl.Int64)
+            uniques = uniques.sort(rank, pl.col(value_column))
+
+        existing = self.lookups.get(table_name)
+        if existing is None or existing.empty:
+            return uniques.with_row_index('id', offset=1).select(pl.col('id').cast(pl.Int64), value_column)
+        stored = pl.from_pandas(existing[['id', value_column]].astype({value_column: object}),
+                                schema_overrides={'id': pl.Int64, value_column: pl.String}).lazy()
+        is_new = pl.col('id').is_null()
+        return uniques.join(stored, on=value_column, how='left', maintain_order='left').select(
+            pl.when(is_new).then(int(existing['id'].max()) + is_new.cast(pl.Int64).cum_sum())
+              .otherwise(pl.col('id')).alias('id'),
+            value_column,
+        )
+
+    def normalize(self, cleaned):
+        """
+        Plans TVMazeDataNormalizer.transform on cleaned shows.
+
+        Args:
+            cleaned (pl.LazyFrame or any `scan` source): Cleaned shows.
+
+        Returns:
+            dict: LazyFrames keyed by table name, in TVMazeDataNormalizer.transform order.
+        """
+        cleaned = self.scan(cleaned)
+        plans = {}
+        # Dimension columns come back from Parquet as categoricals; join on their strings
+        shows = cleaned.select(SHOW_COLUMNS + [pl.col(column).cast(pl.String) for _, column, _, _ in SCALAR_DIMENSIONS])
+        for table_name, column, value_column, fk_column in SCALAR_DIMENSIONS:
+            values = cleaned.select(pl.col(column).cast(pl.String).alias(value_column))
+            plans[table_name] = lookup = self._lookup(table_name, value_column, values)
+            shows = shows.join(lookup.rename({'id': fk_column, value_column: column}),
+                               on=column, how='left', maintain_order='left')
+
+        junctions = {}
+        for table_name, column, value_column, junction_name, fk_column, order in LIST_DIMENSIONS:
+            exploded = (cleaned.select(pl.col('tvmaze_id').alias('show_id'), pl.col(column).alias(value_column))
+                        .explode(value_column).drop_nulls())
+            plans[table_name] = lookup = self._lookup(table_name, value_column, exploded, order)
+            junctions[junction_name] = (exploded.join(lookup, on=value_column, how='left', maintain_order='left')
+                                        .select('show_id', pl.col('id').alias(fk_column)))
+
+        plans['shows'] = (shows.select(SHOW_COLUMNS + [fk for _, _, _, fk in SCALAR_DIMENSIONS])
+                          .sort('tvmaze_id', nulls_last=True))
+        plans.update(junctions)
+        return plans
+
+    def clean_data(self, source):
+        """
+        Cleans shows; the result equals TVMazeDataCleaner(df).clean_data() for the same shows.
+
+        Returns:
+            pd.DataFrame: The cleaned DataFrame
+        """
+        return self._cleaned_to_pandas(self.clean(source).collect())
+
+    def transform(self, source, cleaned=False):
+        """
+        Normalizes shows; the result equals TVMazeDataNormalizer(cleaned_df).transform().
+
+        Args:
+            source: Any `scan` source, raw shows unless `cleaned` is set.
+            cleaned (bool, optional): The source already holds cleaned shows, e.g. the
+                                      ParquetExporter dataset. Defaults to False.
+
+        Returns:
+            dict: DataFrames keyed by table name.
+        """
+        plans = self.normalize(self.scan(source) if cleaned else self.clean(source))
+        return self._normalized_to_pandas(dict(zip(plans, pl.collect_all(plans.values()))))
+
+    def run(self, source):
+        """
+        Cleans and normalizes shows in a single plan, computing the cleaned shows once.
+
+        Returns:
+            tuple: (cleaned pd.DataFrame, dict of normalized DataFrames).
+        """
+        cleaned = self.clean(source).cache()
+        plans = self.normalize(cleaned)
+        frames = pl.collect_all([cleaned, *plans.values()])
+        return self._cleaned_to_pandas(frames[0]), self._normalized_to_pandas(dict(zip(plans, frames[1:])))
+
+    @staticmethod
+    def _to_pandas(frame, categories=()):
+        """
+        Converts a collected frame like the pandas path types it: nullable Int64, Arrow-backed
+        strings, lists as Python lists and `categories` as pandas categories.
+        """
+        table = frame.to_arrow()
+        special = {field.name for field in table.schema
+                   if pa.types.is_list(field.type) or pa.types.is_large_list(field.type) or field.name in categories}
+        mapping = {pa.int64(): pd.Int64Dtype(), pa.large_string(): STRING, pa.string(): STRING,
+                   pa.string_view(): STRING}
+        df = table.drop_columns(list(special)).to_pandas(types_mapper=mapping.get)
+        columns = {}
+        for name in table.column_names:
+            if name in categories:
+                columns[name] = table.column(name).to_pandas().astype('category')
+            elif name in special:
+                columns[name] = pd.Series(table.column(name).to_pylist(), dtype=object)
+            else:
+                columns[name] = df[name]
+        return pd.DataFrame(columns, copy=False)
+
+    def _cleaned_to_pandas(self, frame):
+        categories = [name for name, spec in COLUMN_SPEC.items() if spec['dtype'] == 'category']
+        df = self._to_pandas(frame, categories)
+        for name in df.columns:
+            if COLUMN_SPEC.get(name, {}).get('dtype') in ('date', 'epoch'):
+                df[name] = df[name].astype('datetime64[s]')
+        return df
+
+    def _normalized_to_pandas(self, frames):
+        normalized = {}
+        for table_name, frame in frames.items():
+            df = self._to_pandas(frame)
+            if 'id' in df.columns:
+                # Lookup tables: plain int64 ids and str values, as factorized by pandas
+                df = df.astype({'id': 'int64', df.columns[1]: 'str'})
+            elif 'show_id' in df.columns:
+                df['show_id'] = df['show_id'].astype('int64')
+            else:
+                for name in ('premiere_date', 'end_date', 'last_updated_utc'):
+                    df[name] = df[name].astype('datetime64[s]')
+            normalized[table_name] = df
+        return normalized
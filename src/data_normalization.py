@@ -1,16 +1,33 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+DAY_ORDER = ['Unknown', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 class TVMazeDataNormalizer:
-    def __init__(self, parquet_file_path):
+    def __init__(self, source, lookups=None):
         """
-        Initializes the transformer with the path to the Parquet file.
+        Initializes the transformer with the cleaned data, in memory or on disk.
         
         Args:
-            parquet_file_path (str): Path to the Parquet file to process.
+            source (pd.DataFrame, pa.Table or str): The cleaned data, or the path to a
+                                                    Parquet file to read it from when
+                                                    the normalizer runs standalone.
+            lookups (dict, optional): Lookup tables already stored, keyed by table name
+                                      (see SQLiteDB.fetch_lookups). Known values keep their
+                                      ids and only new values get new ones. Defaults to None.
         """
-        self.parquet_file_path = parquet_file_path
-        self.df = self._read_parquet_file()
+        self.lookups = lookups or {}
         self.transformed_data = {}
+        if isinstance(source, pd.DataFrame):
+            self.parquet_file_path = None
+            self.df = source
+        elif isinstance(source, pa.Table):
+            self.parquet_file_path = None
+            self.df = source.to_pandas()
+        else:
+            self.parquet_file_path = source
+            self.df = self._read_parquet_file()
 
     def _read_parquet_file(self, engine="pyarrow"):
         """Reads a Parquet file into a Pandas DataFrame."""
@@ -26,62 +43,105 @@ class TVMazeDataNormalizer:
             print(f"Unexpected error: {e}")
         return None
 
-    def _create_lookup_table(self, column_name, rename_map=None, sort_column=None, explode_column=False):
-        """Creates a lookup table with unique values from a DataFrame column."""
-        df_lookup = self.df[[column_name]].drop_duplicates().dropna()
-        if explode_column:
-            df_lookup = df_lookup.explode(column_name).dropna().drop_duplicates()
-        if rename_map:
-            df_lookup.rename(columns=rename_map, inplace=True)
-        if sort_column:
-            df_lookup = df_lookup.sort_values(by=sort_column)
-
-        df_lookup = df_lookup.reset_index(drop=True)
-        df_lookup.insert(0, 'id', range(1, len(df_lookup) + 1))
-        return df_lookup
-
-    def _explode_and_map(self, column_name, lookup_df, lookup_key, new_column_name):
-        """Explodes a list column and maps it to an ID from a lookup DataFrame."""
-        lookup_map = lookup_df.set_index(lookup_key)["id"]
-        exploded_df = self.df[['tvmaze_id', column_name]].explode(column_name).dropna()
-        exploded_df.rename(columns={'tvmaze_id': 'show_id'}, inplace=True)
-        exploded_df[new_column_name] = exploded_df[column_name].map(lookup_map)
-        return exploded_df[['show_id', new_column_name]]
+    @staticmethod
+    def _factorize(values, order=None):
+        """
+        Encodes values as integer codes, with the uniques sorted by `order` (values
+        not in it go last, alphabetically) or alphabetically when no order is given.
+
+        Returns:
+            tuple: (codes, uniques); missing values get code -1.
+        """
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Index(uniques).astype(object)
+        if order is not None:
+            rank = {value: position for position, value in enumerate(order)}
+            sort_keys = [(rank.get(value, len(order)), value) for value in uniques]
+        else:
+            sort_keys = list(uniques)
+        permutation = np.array(sorted(range(len(uniques)), key=sort_keys.__getitem__), dtype=np.intp)
+        new_code = np.empty(len(uniques), dtype=np.intp)
+        new_code[permutation] = np.arange(len(uniques))
+        codes = np.where(codes >= 0, new_code[np.maximum(codes, 0)], -1)
+        return codes, uniques[permutation]
+
+    @staticmethod
+    def _assign_ids(uniques, existing=None):
+        """
+        Assigns lookup ids, reusing the id of every value found in `existing` and
+        numbering new values after the highest existing id, in `uniques` order.
+
+        Returns:
+            np.ndarray: The id of each unique value.
+        """
+        if existing is None or existing.empty:
+            return np.arange(1, len(uniques) + 1)
+
+        value_column = existing.columns.drop('id')[0]
+        positions = pd.Index(existing[value_column].astype(object)).get_indexer(uniques)
+        ids = np.where(positions >= 0, existing['id'].to_numpy()[np.maximum(positions, 0)], 0)
+        is_new = positions < 0
+        ids[is_new] = int(existing['id'].max()) + np.arange(1, is_new.sum() + 1)
+        return ids.astype(np.int64)
+
+    def _encode_dimension(self, table_name, value_column, values, order=None):
+        """
+        Factorizes one dimension and builds its lookup table.
+
+        Returns:
+            tuple: (lookup DataFrame, pd.arrays.IntegerArray of ids aligned with `values`).
+        """
+        codes, uniques = self._factorize(values, order)
+        ids = self._assign_ids(uniques, self.lookups.get(table_name))
+        lookup = pd.DataFrame({'id': ids, value_column: uniques.to_numpy()})
+        foreign_keys = pd.array(ids[np.maximum(codes, 0)], dtype="Int64")
+        foreign_keys[codes < 0] = pd.NA
+        return lookup, foreign_keys
 
     def transform(self):
-        """Performs data normalization and transformation."""
+        """
+        Performs data normalization and transformation.
+
+        Every dimension is factorized once into integer codes; its lookup table,
+        the foreign keys on `shows` and the junction tables all come from those
+        codes. List columns are exploded a single time.
+        """
         if self.df is None:
             return None
 
-        # Lookup tables
-        self.transformed_data['show_types'] = self._create_lookup_table("show_type", sort_column="show_type")
-        self.transformed_data['languages'] = self._create_lookup_table("show_language", {"show_language": "language"}, "language")
-        self.transformed_data['genres'] = self._create_lookup_table("show_genres", {"show_genres": "genre"}, 'genre', explode_column=True)
-        self.transformed_data['statuses'] = self._create_lookup_table("show_status", {"show_status": "status"}, "status")
-
-        # Schedule days lookup
-        day_order = ['Unknown', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        schedule_days = self.df[["show_schedule_days"]].explode("show_schedule_days").dropna().drop_duplicates()
-        schedule_days['show_schedule_days'] = pd.Categorical(schedule_days['show_schedule_days'], categories=day_order, ordered=True)
-        schedule_days.rename(columns={"show_schedule_days": "day_name"}, inplace=True)
-        self.transformed_data['schedule_days'] = schedule_days.reset_index(drop=True)
-        self.transformed_data['schedule_days'].insert(0, 'id', range(1, len(self.transformed_data['schedule_days']) + 1))
-
-        # Add ID mappings to main DataFrame
-        self.df["language_id"] = self.df["show_language"].map(self.transformed_data['languages'].set_index("language")["id"])
-        self.df["show_type_id"] = self.df["show_type"].map(self.transformed_data['show_types'].set_index("show_type")["id"])
-        self.df["status_id"] = self.df["show_status"].map(self.transformed_data['statuses'].set_index("status")["id"])
+        # Scalar dimensions: lookup tables and foreign keys on shows
+        foreign_keys = {}
+        for table_name, column, value_column, fk_column in (
+            ('languages', 'show_language', 'language', 'language_id'),
+            ('show_types', 'show_type', 'show_type', 'show_type_id'),
+            ('statuses', 'show_status', 'status', 'status_id'),
+        ):
+            lookup, foreign_keys[fk_column] = self._encode_dimension(table_name, value_column, self.df[column])
+            self.transformed_data[table_name] = lookup
+
+        # List dimensions: lookup tables and junction tables from one explode each
+        junctions = {}
+        for table_name, column, value_column, junction_name, fk_column, order in (
+            ('genres', 'show_genres', 'genre', 'show_genres', 'genre_id', None),
+            ('schedule_days', 'show_schedule_days', 'day_name', 'show_schedule_days', 'day_id', DAY_ORDER),
+        ):
+            exploded = self.df[['tvmaze_id', column]].explode(column).dropna()
+            lookup, ids = self._encode_dimension(table_name, value_column, exploded[column], order)
+            self.transformed_data[table_name] = lookup
+            junctions[junction_name] = pd.DataFrame({
+                'show_id': exploded['tvmaze_id'].to_numpy(),
+                fk_column: ids,
+            })
 
         # Process main 'shows' DataFrame
-        self.transformed_data['shows'] = self.df[[
+        shows = self.df[[
             'tvmaze_id', 'show_name', 'tvmaze_url', 'official_site_url', 'average_runtime_minutes', 'premiere_date',
             'end_date', 'show_tvmaze_weight', 'show_summary', 'last_updated_utc',
-            'imdb_id', 'image_medium_url', 'image_original_url', 'language_id',
-            'show_type_id', 'status_id'
-        ]].sort_values(by="tvmaze_id").reset_index(drop=True)
+            'imdb_id', 'image_medium_url', 'image_original_url',
+        ]].assign(**foreign_keys)
+        self.transformed_data['shows'] = shows.sort_values(by="tvmaze_id").reset_index(drop=True)
 
         # Junction tables
-        self.transformed_data['show_genres'] = self._explode_and_map("show_genres", self.transformed_data['genres'], "genre", "genre_id")
-        self.transformed_data['show_schedule_days'] = self._explode_and_map("show_schedule_days", self.transformed_data['schedule_days'], "day_name", "day_id")
+        self.transformed_data.update(junctions)
 
         return self.transformed_data
@@ -1,8 +1,146 @@
-import json
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    from .raw_storage import ShowStore, is_show_ref, raw_format_of, read_raw
+except ImportError:
+    from raw_storage import ShowStore, is_show_ref, raw_format_of, read_raw
+
+# Flattened `_embedded.show` fields read by the streaming path, with their Arrow types.
+# Names follow `pd.json_normalize`, so both paths feed TVMazeDataCleaner the same columns.
+SHOW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('url', pa.string()),
+    ('name', pa.string()),
+    ('type', pa.string()),
+    ('language', pa.string()),
+    ('genres', pa.list_(pa.string())),
+    ('status', pa.string()),
+    ('averageRuntime', pa.int64()),
+    ('premiered', pa.string()),
+    ('ended', pa.string()),
+    ('officialSite', pa.string()),
+    ('weight', pa.int64()),
+    ('summary', pa.string()),
+    ('updated', pa.int64()),
+    ('schedule.days', pa.list_(pa.string())),
+    ('externals.imdb', pa.string()),
+    ('image.medium', pa.string()),
+    ('image.original', pa.string()),
+])
+SHOW_FIELD_PATHS = [tuple(name.split('.')) for name in SHOW_SCHEMA.names]
+
+# One row per schedule entry (an airing of an episode), with the raw field it comes from.
+# Dates arrive as ISO strings and are typed once per batch (see _airing_batch).
+AIRING_FIELDS = [
+    ('episode_id', ('id',), pa.int64()),
+    ('show_id', ('_embedded', 'show', 'id'), pa.int64()),
+    ('season', ('season',), pa.int64()),
+    ('number', ('number',), pa.int64()),
+    ('episode_type', ('type',), pa.string()),
+    ('airdate', ('airdate',), pa.string()),
+    ('airtime', ('airtime',), pa.string()),
+    ('airstamp', ('airstamp',), pa.string()),
+    ('runtime', ('runtime',), pa.int64()),
+]
+AIRING_FIELD_PATHS = [path for _, path, _ in AIRING_FIELDS]
+AIRING_SCHEMA = pa.schema([
+    ('episode_id', pa.int64()),
+    ('show_id', pa.int64()),
+    ('season', pa.int64()),
+    ('number', pa.int64()),
+    ('episode_type', pa.string()),
+    ('airdate', pa.date32()),
+    ('airtime', pa.string()),
+    ('airstamp', pa.timestamp('s', tz='UTC')),
+    ('runtime', pa.int64()),
+])
+
+def _get_path(record, path):
+    """Follows a tuple of keys into nested dicts, returning None on any missing level."""
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+def _append_show(columns, show_data):
+    """Appends the SHOW_SCHEMA fields of one show to per-field column lists."""
+    for column, path in zip(columns, SHOW_FIELD_PATHS):
+        column.append(_get_path(show_data, path))
+
+def _append_airing(columns, episode):
+    """Appends the AIRING_FIELDS of one schedule entry to per-field column lists."""
+    for column, path in zip(columns, AIRING_FIELD_PATHS):
+        column.append(_get_path(episode, path))
+
+def _airing_batch(columns):
+    """Builds an AIRING_SCHEMA batch: parses the dates and turns empty airtimes into nulls."""
+    arrays = [pa.array(column, type=field_type) for column, (_, _, field_type) in zip(columns, AIRING_FIELDS)]
+    arrays = [array.cast(field.type) for array, field in zip(arrays, AIRING_SCHEMA)]
+    airtime = AIRING_SCHEMA.get_field_index('airtime')
+    arrays[airtime] = pc.if_else(pc.equal(arrays[airtime], ''), pa.scalar(None, pa.string()), arrays[airtime])
+    return pa.RecordBatch.from_arrays(arrays, schema=AIRING_SCHEMA)
+
+def _scan_files(file_paths, batch_size=None, airings=False):
+    """
+    Reads raw files once, yielding ("shows", batch) for shows not seen before and,
+    with `airings`, ("airings", batch) for every schedule entry.
+
+    Batches hold up to `batch_size` rows; without one, each kind comes as a single
+    batch at the end. Shows landed in a ShowStore are read from it only the first
+    time their id comes up, so each show is parsed once however many days it airs.
+    """
+    show_columns = [[] for _ in SHOW_FIELD_PATHS]
+    airing_columns = [[] for _ in AIRING_FIELD_PATHS]
+    series_ids = set()
+    show_stores = {}
+    for file_path in file_paths:
+        for episode in read_raw(file_path, resolve_shows=False):
+            if airings:
+                _append_airing(airing_columns, episode)
+                if batch_size and len(airing_columns[0]) >= batch_size:
+                    yield 'airings', _airing_batch(airing_columns)
+                    airing_columns = [[] for _ in AIRING_FIELD_PATHS]
+
+            show_data = _get_path(episode, ('_embedded', 'show'))
+            if show_data is None or show_data.get('id') in series_ids:
+                continue
+            series_ids.add(show_data['id'])
+            if is_show_ref(show_data):
+                json_dir = os.path.dirname(file_path)
+                if json_dir not in show_stores:
+                    show_stores[json_dir] = ShowStore(json_dir)
+                show_data = show_stores[json_dir].get(show_data)
+            _append_show(show_columns, show_data)
+            if batch_size and len(show_columns[0]) >= batch_size:
+                yield 'shows', pa.RecordBatch.from_arrays(show_columns, schema=SHOW_SCHEMA)
+                show_columns = [[] for _ in SHOW_FIELD_PATHS]
+
+    if show_columns[0] or not batch_size:
+        yield 'shows', pa.RecordBatch.from_arrays(show_columns, schema=SHOW_SCHEMA)
+    if airings and (airing_columns[0] or not batch_size):
+        yield 'airings', _airing_batch(airing_columns)
+
+def _files_batches(file_paths, airings=False):
+    """
+    Extracts the unique shows (and the airings) of a run of files as one record
+    batch each. Runs in pool workers, so only compact Arrow buffers travel back
+    to the parent process.
+
+    Returns:
+        dict: Record batches keyed by kind ("shows", "airings").
+    """
+    return dict(_scan_files(file_paths, airings=airings))
 
 class TVMazeDataProcessor:
+    STREAM_BATCH_SIZE = 10_000  # Shows per Arrow record batch in the streaming path
+
     def __init__(self, json_dir=None):
         """
         Initializes the TVMazeDataProcessor class.
@@ -19,52 +157,181 @@ class TVMazeDataProcessor:
 
     def get_json_files(self, substring):
         """
-        Retrieves JSON files containing TV show data that match a given substring.
+        Retrieves raw files containing TV show data that match a given substring.
+
+        Any format from raw_storage.RAW_FORMATS is accepted. When a day exists in
+        several formats (e.g. a migration kept the JSON files and the day was
+        fetched again since) the most recently written file is used, and the
+        compressed one when they were written at the same time.
         
         Args:
             substring (str): Substring to match in file names.
         
         Returns:
-            list: List of matching JSON file paths.
+            list: List of matching file paths, sorted so the earliest day comes first.
         """
-        return [
-            os.path.join(self.json_dir, f) 
-            for f in os.listdir(self.json_dir) 
-            if f.endswith('.json') and substring in f
-        ]
+        files_by_day = {}
+        for f in os.listdir(self.json_dir):
+            raw_format = raw_format_of(f)
+            if raw_format is None or substring not in f:
+                continue
+            file_path = os.path.join(self.json_dir, f)
+            rank = (os.stat(file_path).st_mtime_ns, raw_format != 'json')
+            day = f[:-len(raw_format) - 1]
+            if day not in files_by_day or rank > files_by_day[day][0]:
+                files_by_day[day] = (rank, file_path)
+        return [files_by_day[day][1] for day in sorted(files_by_day)]
 
-    def tv_shows_to_dataframe(self, json_files):
+    def tv_shows_to_dataframe(self, json_files, streaming=False, workers=None):
         """
         Processes multiple JSON files containing TV show data and extracts relevant information.
         
         Args:
             json_files (list): List of JSON file paths to process.
+            streaming (bool, optional): Use the bounded-memory Arrow path, which only
+                                        extracts the SHOW_SCHEMA fields. Defaults to False.
+            workers (int, optional): Parse files across this many processes. Implies the
+                                     streaming field selection. Defaults to None (serial).
         
         Returns:
             pd.DataFrame: DataFrame containing the extracted TV show data.
         """
+        if streaming or workers:
+            return self._table_to_dataframe(self.tv_shows_to_table(json_files, workers=workers))
+
         all_series = []
         series_ids = set() 
+        show_stores = {}
         
         for file_path in json_files:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
+            # Like _scan_files: one ShowStore per directory, and a show is only resolved the first time it comes up
+            data = read_raw(file_path, resolve_shows=False)
 
             for show in data:
                 if '_embedded' in show and 'show' in show['_embedded']:
                     show_data = show['_embedded']['show']
                     if show_data.get('id') not in series_ids:
+                        if is_show_ref(show_data):
+                            json_dir = os.path.dirname(file_path)
+                            if json_dir not in show_stores:
+                                show_stores[json_dir] = ShowStore(json_dir)
+                            show_data = show_stores[json_dir].get(show_data)
                         all_series.append(show_data)
                         series_ids.add(show_data['id'])
         
         return pd.json_normalize(all_series)
 
-    def process_tv_shows(self, substring):
+    def iter_show_batches(self, json_files, batch_size=None):
+        """
+        Streams the unique shows of the given files as Arrow record batches.
+
+        Files are parsed one at a time and only the SHOW_SCHEMA fields of each
+        `_embedded.show` are kept, so memory is bounded by one file plus one
+        batch of columns and the set of ids already seen.
+
+        Args:
+            json_files (list): List of JSON file paths to process.
+            batch_size (int, optional): Shows per batch. Defaults to STREAM_BATCH_SIZE.
+
+        Yields:
+            pa.RecordBatch: Batches of flattened shows following SHOW_SCHEMA.
+        """
+        for _, batch in _scan_files(json_files, batch_size or self.STREAM_BATCH_SIZE):
+            yield batch
+
+    def iter_batches(self, json_files, batch_size=None):
+        """
+        Streams the unique shows and every airing of the given files in a single pass.
+
+        Airings are the schedule entries themselves: one row per episode airing,
+        with AIRING_SCHEMA fields (airdate, airtime, airstamp, runtime,
+        season/number and the show id). Memory is bounded like `iter_show_batches`.
+
+        Args:
+            json_files (list): List of JSON file paths to process.
+            batch_size (int, optional): Rows per batch. Defaults to STREAM_BATCH_SIZE.
+
+        Yields:
+            tuple: ("shows", batch following SHOW_SCHEMA) or ("airings", batch following AIRING_SCHEMA).
+        """
+        yield from _scan_files(json_files, batch_size or self.STREAM_BATCH_SIZE, airings=True)
+
+    def tv_shows_to_table(self, json_files, batch_size=None, workers=None):
+        """
+        Collects the streamed show batches into one Arrow table.
+
+        Args:
+            json_files (list): List of JSON file paths to process.
+            batch_size (int, optional): Shows per batch. Defaults to STREAM_BATCH_SIZE.
+            workers (int, optional): Parse files across this many processes. Defaults to None (serial).
+
+        Returns:
+            pa.Table: Table of unique shows following SHOW_SCHEMA.
+        """
+        if workers:
+            return self._tables_parallel(json_files, workers)["shows"]
+        return pa.Table.from_batches(self.iter_show_batches(json_files, batch_size), schema=SHOW_SCHEMA)
+
+    def tv_shows_and_airings_to_tables(self, json_files, batch_size=None, workers=None):
+        """
+        Collects the unique shows and all airings of the given files, reading each file once.
+
+        Args:
+            json_files (list): List of JSON file paths to process.
+            batch_size (int, optional): Rows per batch. Defaults to STREAM_BATCH_SIZE.
+            workers (int, optional): Parse files across this many processes. Defaults to None (serial).
+
+        Returns:
+            tuple: (shows pa.Table following SHOW_SCHEMA, airings pa.Table following AIRING_SCHEMA).
+        """
+        if workers:
+            tables = self._tables_parallel(json_files, workers, airings=True)
+            return tables["shows"], tables["airings"]
+        batches = {"shows": [], "airings": []}
+        for kind, batch in self.iter_batches(json_files, batch_size):
+            batches[kind].append(batch)
+        return (pa.Table.from_batches(batches["shows"], schema=SHOW_SCHEMA),
+                pa.Table.from_batches(batches["airings"], schema=AIRING_SCHEMA))
+
+    def _tables_parallel(self, json_files, workers, airings=False):
+        """
+        Parses contiguous runs of files in a process pool and merges their batches.
+
+        Batches are concatenated in `json_files` order. Shows are deduplicated on
+        `id` keeping the first occurrence, so a show seen on several days resolves
+        to the same record as the serial path on every run.
+
+        Returns:
+            dict: "shows" (and "airings") tables.
+        """
+        run_length = max(1, -(-len(json_files) // (workers * 4)))
+        runs = [json_files[i:i + run_length] for i in range(0, len(json_files), run_length)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(partial(_files_batches, airings=airings), runs))
+
+        table = pa.Table.from_batches([result["shows"] for result in results], schema=SHOW_SCHEMA)
+        _, first_index = np.unique(table.column('id').to_numpy(), return_index=True)
+        tables = {"shows": table.take(np.sort(first_index))}
+        if airings:
+            tables["airings"] = pa.Table.from_batches([result["airings"] for result in results], schema=AIRING_SCHEMA)
+        return tables
+
+    @staticmethod
+    def _table_to_dataframe(table):
+        """Converts a show table to pandas, keeping list columns as Python lists like `json_normalize`."""
+        df = table.to_pandas()
+        for field in table.schema:
+            if pa.types.is_list(field.type):
+                df[field.name] = table.column(field.name).to_pylist()
+        return df
+
+    def process_tv_shows(self, substring, streaming=False):
         """
         Main function to find and process JSON files containing TV show data.
         
         Args:
             substring (str): Substring to filter JSON files.
+            streaming (bool, optional): Use the bounded-memory Arrow path. Defaults to False.
         
         Returns:
             pd.DataFrame: DataFrame containing TV show data.
@@ -75,4 +342,26 @@ class TVMazeDataProcessor:
             print(f"No JSON files found for date substring '{substring}'")
             return None
 
-        return self.tv_shows_to_dataframe(json_files)
+        return self.tv_shows_to_dataframe(json_files, streaming=streaming)
+
+    def process_tv_shows_and_airings(self, substring, workers=None):
+        """
+        Finds the raw files matching `substring` and extracts shows and airings in one pass.
+
+        Shows come from the streaming path, ready for TVMazeDataCleaner.
+
+        Args:
+            substring (str): Substring to filter JSON files.
+            workers (int, optional): Parse files across this many processes. Defaults to None (serial).
+
+        Returns:
+            tuple: (shows pd.DataFrame, airings pd.DataFrame), or (None, None) when no file matches.
+        """
+        json_files = self.get_json_files(substring)
+
+        if not json_files:
+            print(f"No JSON files found for date substring '{substring}'")
+            return None, None
+
+        shows, airings = self.tv_shows_and_airings_to_tables(json_files, workers=workers)
+        return self._table_to_dataframe(shows), airings.to_pandas()
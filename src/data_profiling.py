@@ -1,6 +1,6 @@
 import pandas as pd
+import json
 import os
-from ydata_profiling import ProfileReport
 
 class TVMazeDataProfiler:
     """
@@ -9,14 +9,32 @@ class TVMazeDataProfiler:
     This class creates and stores profiling reports for a given dataset,
     helping to analyze and understand the structure and quality of the data.
 
+    Profiling modes:
+        - "full": complete `ydata_profiling` report, including correlations and interactions.
+        - "minimal": `ydata_profiling` report with its expensive computations turned off.
+        - "sampled": complete report over a fixed-seed sample of `sample_size` rows.
+        - "stats": built-in single-pass stats (null rates, cardinalities, numeric
+          quantiles) written as compact JSON, without `ydata_profiling`.
+        - "off": no profiling.
+
     Attributes:
         project_root (str): The root directory of the project.
         profiling_dir (str): The directory where profiling reports will be saved.
+        mode (str): One of MODES.
+        sample_size (int): Rows profiled in "sampled" mode.
+        seed (int): Random seed for the "sampled" mode.
     """
+    MODES = ("full", "minimal", "sampled", "stats", "off")
+    QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
 
-    def __init__(self, profiling_dir=None):
+    def __init__(self, profiling_dir=None, mode="full", sample_size=10_000, seed=42):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}'. Use one of {', '.join(self.MODES)}")
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.profiling_dir = profiling_dir or os.path.join(self.project_root, "profiling")
+        self.mode = mode
+        self.sample_size = sample_size
+        self.seed = seed
         os.makedirs(self.profiling_dir, exist_ok=True)
 
     def generate_profile_report(self, df_to_profile):
@@ -24,22 +42,93 @@ class TVMazeDataProfiler:
         Generate a data profiling report for the given DataFrame.
 
         This method generates an HTML report summarizing the dataset's structure,
-        missing values, statistics, and other key insights.
+        missing values, statistics, and other key insights, or a JSON stats file
+        in "stats" mode.
 
         Args:
             df_to_profile (pd.DataFrame): The pandas DataFrame to be profiled.
 
         Returns:
-            str: The file path where the profiling report is saved.
+            str: The file path where the profiling report is saved, or None in "off" mode.
 
         Saves:
-            A file named 'data_profile_report.html' in the profiling directory.
+            A file named 'data_profile_report.html' ('data_profile_stats.json' in
+            "stats" mode) in the profiling directory.
         """
-        profile = ProfileReport(df_to_profile, title="Data Profiling Report")
+        if self.mode == "off":
+            return None
+        if self.mode == "stats":
+            return self.generate_stats_report(df_to_profile)
+
+        from ydata_profiling import ProfileReport
+
+        if self.mode == "sampled" and len(df_to_profile) > self.sample_size:
+            df_to_profile = df_to_profile.sample(n=self.sample_size, random_state=self.seed)
+        profile = ProfileReport(df_to_profile, title="Data Profiling Report", minimal=self.mode == "minimal")
         output_path = os.path.join(self.profiling_dir, "data_profile_report.html")
         profile.to_file(output_path)
         print(f"\nReport saved to: {output_path}")
         return output_path
 
+    def generate_stats_report(self, df_to_profile):
+        """
+        Write the built-in stats of a DataFrame as JSON.
+
+        Args:
+            df_to_profile (pd.DataFrame): The pandas DataFrame to be profiled.
+
+        Returns:
+            str: The file path where the stats are saved.
+        """
+        output_path = os.path.join(self.profiling_dir, "data_profile_stats.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.compute_stats(df_to_profile), f, indent=1, default=str)
+        print(f"\nStats saved to: {output_path}")
+        return output_path
+
+    @staticmethod
+    def _is_list_column(series):
+        """Tells whether an object column holds lists, judging by its first non-null value."""
+        if series.dtype != object:
+            return False
+        first_valid = series.first_valid_index()
+        return first_valid is not None and isinstance(series[first_valid], list)
+
+    def compute_stats(self, df):
+        """
+        Compute lightweight column stats with whole-frame vectorized calls.
+
+        List columns (genres, schedule days) are profiled on their exploded
+        values, so their cardinality counts distinct elements.
+
+        Args:
+            df (pd.DataFrame): The pandas DataFrame to be profiled.
+
+        Returns:
+            dict: Row count and, per column, dtype, null rate, distinct count and
+                  numeric quantiles.
+        """
+        null_rates = df.isna().mean()
+        list_columns = [column for column in df.columns if self._is_list_column(df[column])]
+        scalar_columns = df.columns.difference(list_columns, sort=False)
+        distinct = df[scalar_columns].nunique()
+        for column in list_columns:
+            distinct[column] = df[column].explode().nunique()
+
+        numeric = df.select_dtypes("number")
+        quantiles = numeric.quantile(list(self.QUANTILES)) if not numeric.empty else pd.DataFrame()
 
-    
\ No newline at end of file
+        columns = {}
+        for column in df.columns:
+            stats = {
+                "dtype": str(df[column].dtype),
+                "null_rate": round(float(null_rates[column]), 6),
+                "distinct": int(distinct[column]),
+            }
+            if column in quantiles.columns:
+                stats["quantiles"] = {
+                    str(q): (None if pd.isna(value) else float(value))
+                    for q, value in quantiles[column].items()
+                }
+            columns[column] = stats
+        return {"rows": len(df), "columns": columns}
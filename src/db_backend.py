@@ -0,0 +1,127 @@
+#%%
+import os
+
+try:
+    from .db_schema import FOREIGN_KEYS
+except ImportError:
+    from db_schema import FOREIGN_KEYS
+
+BACKENDS = ("sqlite", "duckdb")
+DEFAULT_BACKEND = "sqlite"
+# Database file in the 'db' folder of each backend when no name is given
+DEFAULT_DB_NAMES = {"sqlite": "tvmaze.db", "duckdb": "tvmaze.duckdb"}
+# Environment variable that selects the backend when none is configured
+BACKEND_ENV_VAR = "TVMAZE_DB_BACKEND"
+
+class StorageBackend:
+    """
+    Interface shared by the database backends (SQLiteDB, DuckDBBackend).
+
+    Backends create the tables of db_schema.TABLES and load the output of
+    TVMazeDataNormalizer.transform(). The analytics queries each backend runs
+    after a load are in `analytics_queries`, keyed like db_loader.ANALYTICS_QUERIES.
+
+    Attributes:
+        name (str): Backend name, one of BACKENDS.
+        default_db_name (str): Database file in the 'db' folder when none is given.
+        analytics_queries (dict): SQL of the analytics queries, keyed by name.
+        db_path (str): Path of the database file.
+    """
+    name = None
+    default_db_name = None
+    analytics_queries = {}
+
+    def insert_dataframe(self, df, table_name):
+        """Appends a DataFrame to a table."""
+        raise NotImplementedError
+
+    def bulk_load(self, normalized_data: dict):
+        """Appends all normalized tables in one transaction."""
+        raise NotImplementedError
+
+    def load_incremental(self, normalized_data: dict):
+        """Upserts one batch of normalized tables and returns the 'inserted', 'updated' and 'unchanged' counts."""
+        raise NotImplementedError
+
+    def load_airings(self, airings):
+        """Upserts airings keyed by `episode_id` and returns the rows written."""
+        raise NotImplementedError
+
+    def load_batches(self, batches):
+        """
+        Loads (normalized_data, airings) pairs in order and returns the counts of each.
+
+        This default runs one `load_incremental` and `load_airings` per batch;
+        backends that can merge several batches in one transaction override it.
+        """
+        results = []
+        for normalized_data, airings in batches:
+            counts = self.load_incremental(normalized_data)
+            counts["airings"] = 0 if airings is None else self.load_airings(airings)
+            results.append(counts)
+        return results
+
+    def fetch_lookups(self):
+        """Reads every stored lookup table, keyed by table name."""
+        raise NotImplementedError
+
+    def run_query(self, query: str, params: tuple = ()):
+        """Runs a statement; returns a DataFrame when it returns rows, otherwise None."""
+        raise NotImplementedError
+
+    def close_connection(self):
+        """Closes the database connection."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _remap_foreign_keys(normalized_data, id_maps):
+        """
+        Rewrites the foreign keys of the shows and junction tables to stored lookup ids.
+
+        Args:
+            normalized_data (dict): Tables from TVMazeDataNormalizer.transform().
+            id_maps (dict): Stored id indexed by the batch's id, per lookup table.
+
+        Returns:
+            dict: Copies of the referencing tables with remapped ids.
+        """
+        remapped = {}
+        for table, references in FOREIGN_KEYS.items():
+            df = normalized_data[table].copy()
+            for column, lookup in references.items():
+                df[column] = df[column].map(id_maps[lookup])
+            remapped[table] = df
+        return remapped
+
+def resolve_backend(name=None):
+    """The backend to use: `name`, else the TVMAZE_DB_BACKEND environment variable, else DEFAULT_BACKEND."""
+    return (name or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND).lower()
+
+def get_backend(name=None, db_name=None):
+    """
+    Opens a database with the configured backend.
+
+    Args:
+        name (str, optional): "sqlite" or "duckdb". Defaults to the TVMAZE_DB_BACKEND
+            environment variable, then DEFAULT_BACKEND.
+        db_name (str, optional): Database file in the 'db' folder (or an absolute path).
+            Defaults to the backend's `default_db_name`.
+
+    Returns:
+        StorageBackend: The open database.
+    """
+    name = resolve_backend(name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend '{name}'. Use one of {', '.join(BACKENDS)}")
+    # Backends are imported on demand so DuckDB is only needed when it is selected
+    if name == "duckdb":
+        try:
+            from .db_duckdb import DuckDBBackend as backend
+        except ImportError:
+            from db_duckdb import DuckDBBackend as backend
+    else:
+        try:
+            from .db_loader import SQLiteDB as backend
+        except ImportError:
+            from db_loader import SQLiteDB as backend
+    return backend(db_name or backend.default_db_name)
@@ -0,0 +1,307 @@
+#%%
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    from .db_backend import DEFAULT_DB_NAMES, StorageBackend
+    from .db_schema import (ANALYTICS_BASE_QUERIES, TABLES, LOOKUP_TABLES, JUNCTION_TABLES, LOAD_ORDER,
+                            auto_id_column, create_table_sql)
+except ImportError:
+    from db_backend import DEFAULT_DB_NAMES, StorageBackend
+    from db_schema import (ANALYTICS_BASE_QUERIES, TABLES, LOOKUP_TABLES, JUNCTION_TABLES, LOAD_ORDER,
+                           auto_id_column, create_table_sql)
+
+# Columnar scans skip row groups by their min/max, so only point and date-range
+# lookups on the airings get an index.
+INDEXES = {
+    "idx_airings_airdate": "airings (airdate)",
+}
+
+class DuckDBBackend(StorageBackend):
+    """
+    Columnar storage backend on DuckDB with the same tables as SQLiteDB.
+
+    DataFrames and Arrow tables are scanned in place by DuckDB instead of being
+    converted to rows, and Parquet files (e.g. the dataset written by
+    ParquetExporter in 'data/') are read with `read_parquet`, either ingested
+    into a table or queried through a view without a copy. The analytics
+    queries scan the base tables directly (ANALYTICS_BASE_QUERIES): a columnar
+    scan is fast enough that no summary tables are kept.
+
+    Lookup and junction ids, which SQLite assigns itself, are assigned by the
+    backend as the highest stored id plus the row number.
+    Connections are single-writer, like the pipeline's load stage.
+
+    Attributes:
+        db_path (str): Path of the DuckDB database file.
+        conn (duckdb.DuckDBPyConnection): The connection.
+    """
+    name = "duckdb"
+    default_db_name = DEFAULT_DB_NAMES["duckdb"]
+    analytics_queries = ANALYTICS_BASE_QUERIES
+
+    def __init__(self, db_name="tvmaze.duckdb"):
+        if duckdb is None:
+            raise ImportError("The DuckDB backend needs the 'duckdb' package")
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.db_path = os.path.join(project_root, "db", db_name)
+        self.conn = duckdb.connect(self.db_path)
+        self._create_tables()
+
+    def _create_tables(self):
+        """Creates the db_schema tables and INDEXES if they do not already exist."""
+        for table_name in TABLES:
+            self.conn.execute(create_table_sql(table_name, "duckdb"))
+            print(f"Table '{table_name}' checked/created successfully.")
+        for index_name, target in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}")
+
+    def _insert(self, table_name, source, where=""):
+        """
+        Appends the rows of a registered relation (or a `read_parquet(...)` call) by column name.
+
+        Missing ids of lookup and junction tables are assigned after the highest stored id.
+        """
+        id_column = auto_id_column(table_name)
+        columns = [column[0] for column in self.conn.execute(f"SELECT * FROM {source} LIMIT 0").description]
+        select = "*"
+        if id_column and id_column not in columns:
+            select = (f"(SELECT COALESCE(MAX({id_column}), 0) FROM {table_name}) "
+                      f"+ row_number() OVER () AS {id_column}, *")
+        self.conn.execute(f"INSERT INTO {table_name} BY NAME SELECT {select} FROM {source} {where}")
+
+    def _register(self, view_name, data):
+        """Exposes a DataFrame or Arrow table to SQL under `view_name` without copying it."""
+        self.conn.register(view_name, data)
+
+    def insert_dataframe(self, df: pd.DataFrame, table_name: str):
+        """
+        Inserts a DataFrame (or Arrow table) into a given table.
+
+        Args:
+            df (pd.DataFrame or pa.Table): The rows to insert.
+            table_name (str): The name of the target table.
+        """
+        try:
+            self._register("incoming", df)
+            self._insert(table_name, "incoming")
+            print(f"Inserted {len(df)} records into {table_name}.")
+        except Exception as e:
+            print(f"Error inserting data into {table_name}: {e}")
+        finally:
+            self.conn.unregister("incoming")
+
+    def ingest_parquet(self, table_name, path):
+        """
+        Appends Parquet files straight into a table; DuckDB reads them without going through pandas.
+
+        Args:
+            table_name (str): The target table.
+            path (str): A Parquet file, a directory of them or a glob.
+
+        Returns:
+            int: Rows in the table afterwards.
+        """
+        self._insert(table_name, self._read_parquet_sql(path))
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+    def attach_parquet(self, view_name, path):
+        """
+        Creates (or replaces) a view over Parquet files, e.g. the ParquetExporter dataset.
+
+        Queries on the view read the files in place; hive partition columns
+        (year=/month=) become columns and filters on them skip whole partitions.
+
+        Args:
+            view_name (str): Name of the view.
+            path (str): A Parquet file, a directory of them or a glob.
+        """
+        self.conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM {self._read_parquet_sql(path)}")
+
+    @staticmethod
+    def _read_parquet_sql(path):
+        if os.path.isdir(path):
+            path = os.path.join(path, "**", "*.parquet")
+        path = path.replace("'", "''")
+        return f"read_parquet('{path}', hive_partitioning = true, union_by_name = true)"
+
+    def bulk_load(self, normalized_data: dict):
+        """
+        Appends all normalized tables in one atomic transaction.
+
+        Each DataFrame is scanned in place by DuckDB. Rows are appended like
+        `insert_dataframe`; use `load_incremental` to merge existing shows.
+
+        Args:
+            normalized_data (dict): Tables from TVMazeDataNormalizer.transform().
+        """
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            for table_name in LOAD_ORDER:
+                if table_name not in normalized_data:
+                    continue
+                self._register("incoming", normalized_data[table_name])
+                self._insert(table_name, "incoming")
+                print(f"Inserted {len(normalized_data[table_name])} records into {table_name}.")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self.conn.unregister("incoming")
+
+    def load_incremental(self, normalized_data: dict):
+        """
+        Upserts one batch of normalized tables, touching only shows that changed.
+
+        Same rules as SQLiteDB.load_incremental: lookup values are added if
+        missing and foreign keys remapped to the stored ids; a show is inserted
+        when its `tvmaze_id` is new and replaced when its `last_updated_utc` is
+        newer, and only those shows get their junction rows replaced.
+        Everything runs in a single transaction.
+
+        Args:
+            normalized_data (dict): Tables from TVMazeDataNormalizer.transform().
+
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' shows.
+        """
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            id_maps = {
+                table: self._sync_lookup(table, normalized_data[table])
+                for table in LOOKUP_TABLES if table in normalized_data
+            }
+            remapped = self._remap_foreign_keys(normalized_data, id_maps)
+
+            self._register("incoming", remapped["shows"])
+            self.conn.execute(
+                "CREATE OR REPLACE TEMP TABLE changed_ids AS "
+                "SELECT i.tvmaze_id, s.tvmaze_id IS NULL AS is_new FROM incoming i "
+                "LEFT JOIN shows s USING (tvmaze_id) "
+                "WHERE s.tvmaze_id IS NULL OR i.last_updated_utc > s.last_updated_utc "
+                "OR (s.last_updated_utc IS NULL AND i.last_updated_utc IS NOT NULL)"
+            )
+            inserted, updated = self.conn.execute(
+                "SELECT COUNT(*) FILTER (WHERE is_new), COUNT(*) FILTER (WHERE NOT is_new) FROM changed_ids"
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO shows BY NAME SELECT * FROM incoming "
+                "WHERE tvmaze_id IN (SELECT tvmaze_id FROM changed_ids)"
+            )
+            for table_name in JUNCTION_TABLES:
+                self.conn.execute(f"DELETE FROM {table_name} WHERE show_id IN (SELECT tvmaze_id FROM changed_ids)")
+                self._register("incoming", remapped[table_name])
+                self._insert(table_name, "incoming", "WHERE show_id IN (SELECT tvmaze_id FROM changed_ids)")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self.conn.unregister("incoming")
+
+        counts = {
+            "inserted": int(inserted),
+            "updated": int(updated),
+            "unchanged": int(len(normalized_data["shows"]) - inserted - updated),
+        }
+        print(f"Shows inserted: {counts['inserted']}, updated: {counts['updated']}, unchanged: {counts['unchanged']}.")
+        return counts
+
+    def load_airings(self, airings):
+        """
+        Upserts airings from TVMazeDataProcessor.process_tv_shows_and_airings, keyed by `episode_id`.
+
+        Args:
+            airings (pd.DataFrame or pa.Table): Rows following data_processing.AIRING_SCHEMA.
+
+        Returns:
+            int: Rows written.
+        """
+        if isinstance(airings, pd.DataFrame):
+            # Through Arrow, so the date objects arrive as a DATE column
+            airings = pa.Table.from_pandas(airings, preserve_index=False)
+        self._register("incoming", airings)
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO airings BY NAME SELECT * FROM incoming")
+        finally:
+            self.conn.unregister("incoming")
+        print(f"Loaded {len(airings)} airings.")
+        return len(airings)
+
+    def _sync_lookup(self, table_name, lookup_df):
+        """
+        Inserts missing lookup values and maps the batch's ids to the stored ids.
+
+        Values keep the batch's id when it is free; the others get an id after
+        the highest stored one.
+
+        Returns:
+            pd.Series: Stored id indexed by the batch's id.
+        """
+        value_column = LOOKUP_TABLES[table_name]
+        self._register("lookup", lookup_df[["id", value_column]])
+        try:
+            self.conn.execute(
+                f"INSERT INTO {table_name} (id, {value_column}) SELECT id, {value_column} FROM lookup "
+                f"WHERE {value_column} NOT IN (SELECT {value_column} FROM {table_name}) "
+                f"AND id NOT IN (SELECT id FROM {table_name})"
+            )
+            self.conn.execute(
+                f"INSERT INTO {table_name} (id, {value_column}) "
+                f"SELECT (SELECT COALESCE(MAX(id), 0) FROM {table_name}) + row_number() OVER (ORDER BY id), {value_column} "
+                f"FROM lookup WHERE {value_column} NOT IN (SELECT {value_column} FROM {table_name})"
+            )
+            rows = self.conn.execute(
+                f"SELECT l.id, t.id FROM lookup l JOIN {table_name} t USING ({value_column})"
+            ).fetchall()
+        finally:
+            self.conn.unregister("lookup")
+        stored = dict(rows)
+        return pd.Series([stored[batch_id] for batch_id in lookup_df["id"].tolist()], index=lookup_df["id"].tolist())
+
+    def fetch_lookups(self):
+        """
+        Reads every stored lookup table, to pass to TVMazeDataNormalizer so ids stay stable across runs.
+
+        Returns:
+            dict: DataFrames with 'id' and value columns, keyed by table name.
+        """
+        return {
+            table_name: self.conn.execute(f"SELECT id, {value_column} FROM {table_name} ORDER BY id").fetchdf()
+            for table_name, value_column in LOOKUP_TABLES.items()
+        }
+
+    def run_query(self, query: str, params: tuple = ()):
+        """
+        Executes a given SQL query with optional parameters (`?` placeholders, like SQLite).
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple): A tuple of parameters to pass to the query.
+
+        Returns:
+            pd.DataFrame if the statement returns rows, otherwise None.
+        """
+        try:
+            statement = self.conn.extract_statements(query)[-1]
+            result = self.conn.execute(query, params or None)
+            # Writes also report a row count; only statements that can do nothing but return rows give a frame
+            if statement.expected_result_type == [duckdb.ExpectedResultType.QUERY_RESULT]:
+                return result.fetchdf()
+            print("Query executed successfully.")
+            return None
+        except Exception as e:
+            print(f"Error executing query: {e}")
+
+    def close_connection(self):
+        """Closes the database connection."""
+        self.conn.close()
+        print("Database connection closed.")
@@ -2,7 +2,74 @@ import sqlite3
 import os
 import pandas as pd
 
-class SQLiteDB:
+try:
+    from .db_backend import DEFAULT_DB_NAMES, StorageBackend
+    from .db_schema import (TABLES, LOOKUP_TABLES, JUNCTION_TABLES, LOAD_ORDER, ANALYTICS_QUERIES,
+                            ANALYTICS_BASE_QUERIES, create_table_sql)
+except ImportError:
+    from db_backend import DEFAULT_DB_NAMES, StorageBackend
+    from db_schema import (TABLES, LOOKUP_TABLES, JUNCTION_TABLES, LOAD_ORDER, ANALYTICS_QUERIES,
+                           ANALYTICS_BASE_QUERIES, create_table_sql)
+
+# Secondary indexes: covering indexes for the junction-table joins and the columns
+# the analytics queries filter, group or aggregate on.
+INDEXES = {
+    "idx_show_genres_show_id_genre_id": "show_genres (show_id, genre_id)",
+    "idx_show_genres_genre_id_show_id": "show_genres (genre_id, show_id)",
+    "idx_show_schedule_days_show_id_day_id": "show_schedule_days (show_id, day_id)",
+    "idx_show_schedule_days_day_id_show_id": "show_schedule_days (day_id, show_id)",
+    "idx_shows_official_site_url": "shows (official_site_url)",
+    "idx_shows_average_runtime_minutes": "shows (average_runtime_minutes)",
+    "idx_shows_status_id": "shows (status_id)",
+    "idx_shows_language_id": "shows (language_id)",
+    "idx_shows_show_type_id": "shows (show_type_id)",
+    "idx_airings_airdate_show_id": "airings (airdate, show_id)",
+    "idx_airings_show_id_airdate": "airings (show_id, airdate)",
+}
+
+# Summary tables kept up to date by every load: show counts per value of each
+# dimension, with the table, show key and value column the counts come from.
+SUMMARY_DIMENSIONS = {
+    "show_type": ("shows", "tvmaze_id", "show_type_id"),
+    "language": ("shows", "tvmaze_id", "language_id"),
+    "status": ("shows", "tvmaze_id", "status_id"),
+    "genre": ("show_genres", "show_id", "genre_id"),
+    "day": ("show_schedule_days", "show_id", "day_id"),
+}
+# Show id column of every table the summaries are computed from
+SUMMARY_KEYS = {table_name: key for table_name, key, _ in SUMMARY_DIMENSIONS.values()}
+
+# Connection settings for bulk loads: WAL with relaxed fsyncs, a 256 MiB page cache,
+# in-memory temp storage and ANALYZE sampling about 1000 rows per index.
+BULK_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256 * 1024,
+    "temp_store": "MEMORY",
+    "analysis_limit": 1000,
+}
+
+def _to_records(df):
+    """Converts a DataFrame to tuples of SQLite-ready values, formatting datetimes like `to_sql` and dates as ISO."""
+    columns = []
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) == "date":
+            values = pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+        if not values.hasnans:
+            columns.append(values.tolist())
+            continue
+        values = values.astype(object)
+        columns.append(values.where(values.notna(), None).tolist())
+    return list(zip(*columns))
+
+class SQLiteDB(StorageBackend):
+    name = "sqlite"
+    default_db_name = DEFAULT_DB_NAMES["sqlite"]
+    analytics_queries = ANALYTICS_QUERIES
+
     def __init__(self, db_name="tvmaze.db"):
         """
         Initializes the SQLite database connection and ensures all required tables exist.
@@ -15,120 +82,443 @@ class SQLiteDB:
 
     def _create_tables(self):
         """Creates necessary tables if they do not already exist."""
-        tables = {
-            "show_types": """
-                CREATE TABLE IF NOT EXISTS show_types (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    show_type TEXT UNIQUE NOT NULL
-                )
-            """,
-            "languages": """
-                CREATE TABLE IF NOT EXISTS languages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    language TEXT UNIQUE NOT NULL
-                )
-            """,
-            "genres": """
-                CREATE TABLE IF NOT EXISTS genres (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    genre TEXT UNIQUE NOT NULL
-                )
-            """,
-            "statuses": """
-                CREATE TABLE IF NOT EXISTS statuses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    status TEXT UNIQUE NOT NULL
+        # The shared tables come from db_schema; the version and summary tables are SQLite's own
+        tables = {table_name: create_table_sql(table_name, "sqlite") for table_name in TABLES}
+        tables.update({
+            "data_version": """
+                CREATE TABLE IF NOT EXISTS data_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
                 )
             """,
-            "schedule_days": """
-                CREATE TABLE IF NOT EXISTS schedule_days (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    day_name TEXT UNIQUE NOT NULL
-                )
-            """,
-            "shows": """
-                CREATE TABLE IF NOT EXISTS shows (
-                    tvmaze_id INTEGER PRIMARY KEY,
-                    tvmaze_url TEXT,
-                    official_site_url TEXT,
-                    show_name TEXT NOT NULL,
-                    show_type_id INTEGER,
-                    language_id INTEGER,
-                    status_id INTEGER,
-                    average_runtime_minutes INTEGER,
-                    premiere_date TEXT,
-                    end_date TEXT,
-                    show_tvmaze_weight INTEGER,
-                    show_summary TEXT,
-                    last_updated_utc TEXT,
-                    imdb_id TEXT,
-                    image_medium_url TEXT,
-                    image_original_url TEXT,
-                    FOREIGN KEY (show_type_id) REFERENCES show_types(id),
-                    FOREIGN KEY (language_id) REFERENCES languages(id),
-                    FOREIGN KEY (status_id) REFERENCES statuses(id)
-                )
+            "summary_counts": """
+                CREATE TABLE IF NOT EXISTS summary_counts (
+                    dimension TEXT NOT NULL,
+                    value_id INTEGER NOT NULL,
+                    show_count INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, value_id)
+                ) WITHOUT ROWID
             """,
-            "show_genres": """
-                CREATE TABLE IF NOT EXISTS show_genres (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    show_id INTEGER,
-                    genre_id INTEGER,
-                    FOREIGN KEY (show_id) REFERENCES shows(tvmaze_id),
-                    FOREIGN KEY (genre_id) REFERENCES genres(id)
-                )
+            "summary_sites": """
+                CREATE TABLE IF NOT EXISTS summary_sites (
+                    official_site_url TEXT PRIMARY KEY,
+                    show_count INTEGER NOT NULL
+                ) WITHOUT ROWID
             """,
-            "show_schedule_days": """
-                CREATE TABLE IF NOT EXISTS show_schedule_days (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    show_id INTEGER,
-                    day_id INTEGER,
-                    FOREIGN KEY (show_id) REFERENCES shows(tvmaze_id),
-                    FOREIGN KEY (day_id) REFERENCES schedule_days(id)
+            "summary_runtime": """
+                CREATE TABLE IF NOT EXISTS summary_runtime (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    show_count INTEGER NOT NULL,
+                    runtime_count INTEGER NOT NULL,
+                    runtime_sum REAL NOT NULL,
+                    runtime_sum_sq REAL NOT NULL,
+                    runtime_min INTEGER,
+                    runtime_max INTEGER
                 )
             """
-        }
+        })
 
         for table_name, create_query in tables.items():
             self.cursor.execute(create_query)
             print(f"Table '{table_name}' checked/created successfully.")
 
+        self.create_indexes()
+        if self.cursor.execute("SELECT 1 FROM summary_runtime").fetchone() is None:
+            # New database, or one created before the summary tables existed
+            self.rebuild_summaries()
         self.conn.commit()
 
+    def create_indexes(self):
+        """Creates any missing INDEXES, which also migrates databases created before they existed."""
+        for index_name, target in INDEXES.items():
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}")
+
+    def drop_indexes(self):
+        """Drops the INDEXES, e.g. before a bulk load."""
+        for index_name in INDEXES:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    def rebuild_summaries(self):
+        """Recomputes the summary tables from the base tables, e.g. for a database loaded before they existed."""
+        self.cursor.execute("DELETE FROM summary_counts")
+        self.cursor.execute("DELETE FROM summary_sites")
+        self.cursor.execute("DELETE FROM summary_runtime")
+        self.cursor.execute("INSERT INTO summary_runtime VALUES (1, 0, 0, 0, 0, NULL, NULL)")
+        self._apply_summary_delta(1, changed_only=False)
+        self._refresh_summary_bounds()
+
+    def _apply_summary_delta(self, sign, changed_only=True):
+        """
+        Adds (sign=1) or removes (sign=-1) the contribution of shows to the summary tables.
+
+        With `changed_only`, only the shows in the `changed_ids` temp table are
+        counted, so the work is proportional to the delta, not to the database.
+        """
+        def scope(key):
+            return f"WHERE {key} IN (SELECT tvmaze_id FROM temp.changed_ids)" if changed_only else "WHERE true"
+
+        # Grouping on the bare column walks its index in order; NULL forms one group, stored as value 0
+        for dimension, (table_name, key, column) in SUMMARY_DIMENSIONS.items():
+            self.cursor.execute(
+                f"INSERT INTO summary_counts (dimension, value_id, show_count) "
+                f"SELECT ?, IFNULL({column}, 0), ? * COUNT(*) FROM {table_name} {scope(key)} "
+                f"GROUP BY {column} "
+                f"ON CONFLICT(dimension, value_id) DO UPDATE SET show_count = show_count + excluded.show_count",
+                (dimension, sign),
+            )
+        self.cursor.execute(
+            f"INSERT INTO summary_sites (official_site_url, show_count) "
+            f"SELECT official_site_url, ? * COUNT(*) FROM shows {scope('tvmaze_id')} AND official_site_url IS NOT NULL "
+            f"GROUP BY official_site_url "
+            f"ON CONFLICT(official_site_url) DO UPDATE SET show_count = show_count + excluded.show_count",
+            (sign,),
+        )
+        self.cursor.execute(
+            f"UPDATE summary_runtime SET "
+            f"show_count = show_count + ? * d.n, runtime_count = runtime_count + ? * d.c, "
+            f"runtime_sum = runtime_sum + ? * d.s, runtime_sum_sq = runtime_sum_sq + ? * d.q "
+            f"FROM (SELECT COUNT(*) AS n, COUNT(average_runtime_minutes) AS c, TOTAL(average_runtime_minutes) AS s, "
+            f"TOTAL(average_runtime_minutes * average_runtime_minutes) AS q FROM shows {scope('tvmaze_id')}) AS d "
+            f"WHERE id = 1",
+            (sign,) * 4,
+        )
+
+    def _refresh_summary_bounds(self):
+        """Drops emptied summary rows and reads the runtime bounds off the runtime index."""
+        self.cursor.execute("DELETE FROM summary_counts WHERE show_count = 0")
+        self.cursor.execute("DELETE FROM summary_sites WHERE show_count = 0")
+        self.cursor.execute(
+            "UPDATE summary_runtime SET "
+            "runtime_min = (SELECT MIN(average_runtime_minutes) FROM shows), "
+            "runtime_max = (SELECT MAX(average_runtime_minutes) FROM shows) "
+            "WHERE id = 1"
+        )
+
+    def data_version(self):
+        """Returns the data version, which every load bumps (0 before the first load)."""
+        row = self.cursor.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def bump_data_version(self):
+        """Increments the data version, telling cached readers (see QueryEngine) that the data changed."""
+        self.cursor.execute(
+            "INSERT INTO data_version (id, version) VALUES (1, 1) "
+            "ON CONFLICT(id) DO UPDATE SET version = version + 1"
+        )
+
     def insert_dataframe(self, df: pd.DataFrame, table_name: str):
         """
         Inserts a DataFrame into a given table.
+
+        Rows of the shows or junction tables update the summary tables like a load:
+        the affected shows are taken out of the summaries before the insert and
+        added back after it.
         
         Args:
             df (pd.DataFrame): The DataFrame to insert.
             table_name (str): The name of the target SQLite table.
         """
+        key = SUMMARY_KEYS.get(table_name)
+        changed_ids = df[key].dropna().unique().tolist() if key in df.columns else []
         try:
+            if changed_ids:
+                self._fill_temp_ids("changed_ids", changed_ids)
+                self._apply_summary_delta(-1)
+            # to_sql commits the insert with the delta above, or rolls both back
             df.to_sql(table_name, self.conn, if_exists="append", index=False)
+            with self.conn:
+                if changed_ids:
+                    self._apply_summary_delta(1)
+                    self._refresh_summary_bounds()
+                self.bump_data_version()
             print(f"Inserted {len(df)} records into {table_name}.")
         except Exception as e:
             print(f"Error inserting data into {table_name}: {e}")
 
+    def apply_bulk_pragmas(self):
+        """
+        Switches the connection to the BULK_PRAGMAS settings and returns the previous ones.
+
+        The WAL journal mode is stored in the database file, so it stays on for
+        every later connection; readers then no longer block the writer. The
+        other settings only last for this connection until `restore_pragmas`.
+
+        Returns:
+            dict: The previous value of each pragma.
+        """
+        previous = {pragma: self.cursor.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in BULK_PRAGMAS}
+        for pragma, value in BULK_PRAGMAS.items():
+            self.cursor.execute(f"PRAGMA {pragma} = {value}")
+        return previous
+
+    def restore_pragmas(self, settings):
+        """Restores the connection settings returned by `apply_bulk_pragmas`, keeping the WAL journal mode."""
+        for pragma, value in settings.items():
+            if pragma != "journal_mode":
+                self.cursor.execute(f"PRAGMA {pragma} = {value}")
+
+    def bulk_load(self, normalized_data: dict):
+        """
+        Appends all normalized tables in one atomic transaction using `executemany`.
+
+        This is the fast path for loading into an empty database, e.g. a full
+        reload or a first backfill. Rows are appended like `insert_dataframe`,
+        so existing shows are not merged; use `load_incremental` for that. Any
+        error rolls back every table.
+
+        Secondary indexes are dropped before the inserts and rebuilt once at the
+        end, inside the same transaction, followed by the summary tables and
+        ANALYZE for the planner. The load runs under BULK_PRAGMAS, and the
+        connection gets its previous settings back afterwards (the database
+        stays in WAL mode, see `apply_bulk_pragmas`).
+
+        Args:
+            normalized_data (dict): Tables from TVMazeDataNormalizer.transform().
+        """
+        previous = self.apply_bulk_pragmas()
+        try:
+            self._bulk_insert(normalized_data)
+        finally:
+            self.restore_pragmas(previous)
+
+    def _bulk_insert(self, normalized_data):
+        """Runs the single transaction of `bulk_load`."""
+        with self.conn:
+            self.cursor.execute("BEGIN")
+            # Summaries of a first load are built in one pass over the new tables
+            was_empty = self.cursor.execute("SELECT 1 FROM shows LIMIT 1").fetchone() is None
+            self.drop_indexes()
+            for table_name in LOAD_ORDER:
+                if table_name not in normalized_data:
+                    continue
+                df = normalized_data[table_name]
+                columns = list(df.columns)
+                self.cursor.executemany(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    _to_records(df),
+                )
+                print(f"Inserted {len(df)} records into {table_name}.")
+            self.create_indexes()
+            if was_empty:
+                self.rebuild_summaries()
+            elif "shows" in normalized_data:
+                self._fill_temp_ids("changed_ids", normalized_data["shows"]["tvmaze_id"].tolist())
+                self._apply_summary_delta(1)
+                self._refresh_summary_bounds()
+            self.bump_data_version()
+            self.cursor.execute("ANALYZE")
+
+    def load_incremental(self, normalized_data: dict):
+        """
+        Upserts one batch of normalized tables, touching only shows that changed.
+
+        Lookup values are inserted if missing and foreign keys are remapped to
+        the ids already stored in the database. A show is inserted when its
+        `tvmaze_id` is new and updated when its `last_updated_utc` is newer than
+        the stored one; only those shows get their junction rows replaced and
+        their contribution to the summary tables updated. Older versions, e.g.
+        from reloading an earlier month, count as unchanged. Everything runs in
+        a single transaction.
+
+        Args:
+            normalized_data (dict): Tables from TVMazeDataNormalizer.transform().
+
+        Returns:
+            dict: Counts of 'inserted', 'updated' and 'unchanged' shows.
+        """
+        with self.conn:
+            counts = self._merge_shows(normalized_data)
+            self.bump_data_version()
+        return counts
+
+    def load_batches(self, batches):
+        """
+        Loads several batches of normalized tables and airings in one transaction.
+
+        Batches are merged in order with the rules of `load_incremental` and
+        `load_airings`, so the result equals loading them one by one, but the
+        database is locked and synced once and the data version bumped once.
+        Any error rolls back every batch. See multi_month.py, whose single
+        writer groups months this way.
+
+        Args:
+            batches (list): (normalized_data, airings) pairs; airings may be None.
+
+        Returns:
+            list: The `load_incremental` counts of each batch, with the airings written under 'airings'.
+        """
+        results = []
+        with self.conn:
+            for normalized_data, airings in batches:
+                counts = self._merge_shows(normalized_data)
+                if airings is not None:
+                    self._upsert("airings", airings, key="episode_id")
+                    print(f"Loaded {len(airings)} airings.")
+                counts["airings"] = 0 if airings is None else len(airings)
+                results.append(counts)
+            self.bump_data_version()
+        return results
+
+    def _merge_shows(self, normalized_data):
+        """Runs the statements of `load_incremental` in the current transaction and returns its counts."""
+        id_maps = {
+            table: self._sync_lookup(table, normalized_data[table])
+            for table in LOOKUP_TABLES if table in normalized_data
+        }
+        remapped = self._remap_foreign_keys(normalized_data, id_maps)
+
+        shows = remapped["shows"]
+        stored = self._stored_versions(shows["tvmaze_id"].tolist())
+        incoming = shows["last_updated_utc"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        is_new = ~shows["tvmaze_id"].isin(list(stored))
+        # Only newer versions are applied, so reloading an older month cannot undo a newer one.
+        # The stored text sorts like the timestamps; a stored NULL is older than any version.
+        stored_versions = shows["tvmaze_id"].map(stored).fillna("").astype(str)
+        is_changed = ~is_new & (incoming > stored_versions).fillna(False).astype(bool)
+        delta = shows[is_new | is_changed]
+
+        # Summaries follow the delta: the stored versions of changed shows are
+        # taken out before the upsert and the new versions added after it
+        changed_ids = delta["tvmaze_id"].tolist()
+        if changed_ids:
+            self._fill_temp_ids("changed_ids", changed_ids)
+            self._apply_summary_delta(-1)
+        self._upsert("shows", delta, key="tvmaze_id")
+        for table in JUNCTION_TABLES:
+            self._replace_junction_rows(table, remapped[table], changed_ids)
+        if changed_ids:
+            self._apply_summary_delta(1)
+            self._refresh_summary_bounds()
+
+        counts = {
+            "inserted": int(is_new.sum()),
+            "updated": int(is_changed.sum()),
+            "unchanged": int(len(shows) - is_new.sum() - is_changed.sum()),
+        }
+        print(f"Shows inserted: {counts['inserted']}, updated: {counts['updated']}, unchanged: {counts['unchanged']}.")
+        return counts
+
+    def load_airings(self, airings: pd.DataFrame):
+        """
+        Upserts airings from TVMazeDataProcessor.process_tv_shows_and_airings, keyed by `episode_id`.
+
+        Reloading a month replaces its rows, and an episode moved to another day
+        keeps a single row. Date and show lookups use the airings indexes.
+
+        Args:
+            airings (pd.DataFrame): Rows following data_processing.AIRING_SCHEMA.
+
+        Returns:
+            int: Rows written.
+        """
+        with self.conn:
+            self._upsert("airings", airings, key="episode_id")
+            self.bump_data_version()
+        print(f"Loaded {len(airings)} airings.")
+        return len(airings)
+
+    def fetch_lookups(self):
+        """
+        Reads every stored lookup table, to pass to TVMazeDataNormalizer so ids stay stable across runs.
+
+        Returns:
+            dict: DataFrames with 'id' and value columns, keyed by table name.
+        """
+        return {
+            table_name: pd.read_sql(f"SELECT id, {value_column} FROM {table_name}", self.conn)
+            for table_name, value_column in LOOKUP_TABLES.items()
+        }
+
+    def _sync_lookup(self, table_name, lookup_df):
+        """
+        Inserts missing lookup values and maps the batch's ids to the stored ids.
+
+        Values are inserted with the batch's id when that id is free, so ids
+        allocated by the normalizer are kept. Values whose id is already taken
+        by another value get a fresh id from SQLite and are remapped.
+
+        Returns:
+            pd.Series: Stored id indexed by the batch's id.
+        """
+        value_column = LOOKUP_TABLES[table_name]
+        values = lookup_df[value_column].astype(str).tolist()
+        self.cursor.executemany(
+            f"INSERT OR IGNORE INTO {table_name} (id, {value_column}) VALUES (?, ?)",
+            zip(lookup_df["id"].astype(int).tolist(), values),
+        )
+        self.cursor.executemany(
+            f"INSERT OR IGNORE INTO {table_name} ({value_column}) VALUES (?)", [(value,) for value in values]
+        )
+        stored = dict(self.cursor.execute(f"SELECT {value_column}, id FROM {table_name}").fetchall())
+        return pd.Series([stored[value] for value in values], index=lookup_df["id"].tolist())
+
+    def _fill_temp_ids(self, temp_table, ids):
+        """(Re)fills a temporary single-column id table used to join against a batch of shows."""
+        self.cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {temp_table} (tvmaze_id INTEGER PRIMARY KEY)")
+        self.cursor.execute(f"DELETE FROM {temp_table}")
+        self.cursor.executemany(f"INSERT OR IGNORE INTO {temp_table} VALUES (?)", [(int(i),) for i in ids])
+
+    def _stored_versions(self, tvmaze_ids):
+        """Returns the stored `last_updated_utc` of the given shows, keyed by `tvmaze_id`."""
+        self._fill_temp_ids("incoming_ids", tvmaze_ids)
+        rows = self.cursor.execute(
+            "SELECT s.tvmaze_id, s.last_updated_utc FROM shows s JOIN temp.incoming_ids i USING (tvmaze_id)"
+        ).fetchall()
+        return dict(rows)
+
+    def _upsert(self, table_name, df, key):
+        """Inserts rows, overwriting every column of rows whose `key` already exists."""
+        if df.empty:
+            return
+        columns = list(df.columns)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+        self.cursor.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}",
+            _to_records(df),
+        )
+
+    def _replace_junction_rows(self, table_name, df, show_ids):
+        """
+        Deletes the junction rows of the given shows and inserts their rows from `df`.
+        The ids must already be in the `changed_ids` temp table.
+        """
+        if not show_ids:
+            return
+        self.cursor.execute(f"DELETE FROM {table_name} WHERE show_id IN (SELECT tvmaze_id FROM temp.changed_ids)")
+        rows = df[df["show_id"].isin(show_ids)]
+        columns = list(rows.columns)
+        self.cursor.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            _to_records(rows),
+        )
+
     def run_query(self, query: str, params: tuple = ()):
         """
         Executes a given SQL query with optional parameters.
+
+        Statements that return rows (SELECT, WITH, PRAGMA, ...) give a DataFrame;
+        anything else is committed with the summary tables rebuilt from the base
+        tables, since the rows it touched are unknown, and bumps the data version.
+        For repeated or concurrent reads use QueryEngine, which caches results.
         
         Args:
             query (str): The SQL query to execute.
             params (tuple): A tuple of parameters to pass to the query.
 
         Returns:
-            pd.DataFrame if the query is a SELECT statement, otherwise None.
+            pd.DataFrame if the statement returns rows, otherwise None.
         """
         try:
-            if query.strip().upper().startswith("SELECT"):
-                df = pd.read_sql(query, self.conn, params=params)
-                return df
-            else:
-                self.cursor.execute(query, params)
-                self.conn.commit()
-                print("Query executed successfully.")
-                return None
+            cursor = self.conn.execute(query, params)
+            if cursor.description is not None:
+                columns = [column[0] for column in cursor.description]
+                return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+            self.rebuild_summaries()
+            self.bump_data_version()
+            self.conn.commit()
+            print("Query executed successfully.")
+            return None
         except Exception as e:
             print(f"Error executing query: {e}")
             
@@ -0,0 +1,206 @@
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+
+class ReadOnlyPool:
+    """
+    A fixed pool of read-only SQLite connections for concurrent readers.
+
+    Connections are opened with `mode=ro`, so any statement that would write
+    fails with `sqlite3.OperationalError`. Each connection keeps its own
+    prepared-statement cache (`cached_statements`), so repeated SQL is not
+    parsed again. Readers run concurrently with each other and, when the
+    database is in WAL mode, with a writer.
+
+    Attributes:
+        db_path (str): Path of the SQLite database.
+        size (int): Number of connections.
+    """
+    def __init__(self, db_path, size=4, cached_statements=256):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Database not found at {db_path}")
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.Queue()
+        self._connections = []
+        uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=cached_statements)
+            self._connections.append(conn)
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrows a connection, waiting up to `timeout` seconds for one to be free."""
+        conn = self._idle.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Closes every connection."""
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+class QueryEngine:
+    """
+    Read-only query API over a SQLite database with cached results.
+
+    Statements are always parameterized; named statements can be registered
+    once with `prepare` and run by name. Results of `query` go into an LRU
+    cache keyed by statement and parameters. Every cached result belongs to a
+    data version (see SQLiteDB.bump_data_version, bumped by each load), and the
+    cache is dropped as soon as the stored version moves, so a load is never
+    hidden by a stale result. Large results can be streamed as row batches or
+    Arrow record batches instead of one DataFrame.
+
+    Attributes:
+        pool (ReadOnlyPool): The reader connections.
+        cache_size (int): Results kept in the LRU cache.
+        statements (dict): Registered statements, keyed by name.
+    """
+    def __init__(self, db_path, pool_size=4, cache_size=128):
+        self.pool = ReadOnlyPool(db_path, size=pool_size)
+        self.cache_size = cache_size
+        self.statements = {}
+        self._cache = OrderedDict()
+        self._cache_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, name, sql=None):
+        """
+        Registers named statements, e.g. `prepare(ANALYTICS_QUERIES)` or `prepare("by_id", "... ?")`.
+
+        Each statement is compiled once against the database, so syntax errors
+        and unknown tables or columns are reported here rather than on first use.
+
+        Args:
+            name (str or dict): Statement name, or a dict of names to SQL.
+            sql (str, optional): The SQL when `name` is a single name.
+        """
+        statements = name if isinstance(name, dict) else {name: sql}
+        with self.pool.connection() as conn:
+            for statement_name, statement_sql in statements.items():
+                # EXPLAIN compiles the statement without running it; missing
+                # parameters are only reported after compilation succeeded
+                try:
+                    conn.execute(f"EXPLAIN {statement_sql}")
+                except sqlite3.ProgrammingError:
+                    pass
+                self.statements[statement_name] = statement_sql
+
+    def _sql(self, statement):
+        return self.statements.get(statement, statement)
+
+    def data_version(self):
+        """Returns the stored data version (0 before the first load)."""
+        with self.pool.connection() as conn:
+            try:
+                row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+            except sqlite3.OperationalError:
+                return 0
+        return row[0] if row else 0
+
+    def query(self, statement, params=(), cache=True):
+        """
+        Runs a read-only statement and returns its rows as a DataFrame.
+
+        Args:
+            statement (str): A registered statement name or SQL.
+            params (tuple or dict, optional): Statement parameters.
+            cache (bool, optional): Serve and store the result in the LRU cache. Defaults to True.
+
+        Returns:
+            pd.DataFrame: The result. Cached results are shared, so treat them as read-only.
+        """
+        sql = self._sql(statement)
+        if not cache:
+            return self._fetch_dataframe(sql, params)
+
+        version = self.data_version()
+        key = (sql, tuple(sorted(params.items())) if isinstance(params, dict) else tuple(params))
+        with self._lock:
+            if self._cache_version != version:
+                self._cache.clear()
+                self._cache_version = version
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        df = self._fetch_dataframe(sql, params)
+        with self._lock:
+            if self._cache_version == version:
+                self._cache[key] = df
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return df
+
+    def _fetch_dataframe(self, sql, params):
+        with self.pool.connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+    def iter_rows(self, statement, params=(), batch_size=10_000):
+        """
+        Streams the rows of a statement in lists of up to `batch_size` tuples.
+
+        The pooled connection stays borrowed until the generator is exhausted or closed.
+
+        Yields:
+            list: Row tuples.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute(self._sql(statement), params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    def iter_arrow_batches(self, statement, params=(), batch_size=10_000, schema=None):
+        """
+        Streams the rows of a statement as Arrow record batches.
+
+        Column types are inferred from the first batch unless `schema` is given,
+        and later batches are cast to them. Pass `schema` when a column may be
+        NULL throughout the first batch.
+
+        Yields:
+            pa.RecordBatch: Up to `batch_size` rows each.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute(self._sql(statement), params)
+            names = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                if schema is None:
+                    arrays = [pa.array(column) for column in columns]
+                    schema = pa.schema([pa.field(name, array.type) for name, array in zip(names, arrays)])
+                else:
+                    arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.pool.close()
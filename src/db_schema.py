@@ -0,0 +1,196 @@
+#%%
+# Table definitions shared by the storage backends. Every table is a list of
+# (column, type, constraints) plus its foreign keys. Types are portable names
+# that each dialect maps to its own, so SQLite keeps its TEXT timestamps while
+# DuckDB stores real TIMESTAMP columns.
+
+DIALECTS = ("sqlite", "duckdb")
+
+COLUMN_TYPES = {
+    "sqlite": {"INTEGER": "INTEGER", "REAL": "REAL", "TEXT": "TEXT", "DATE": "TEXT", "TIMESTAMP": "TEXT"},
+    "duckdb": {"INTEGER": "BIGINT", "REAL": "DOUBLE", "TEXT": "VARCHAR", "DATE": "DATE", "TIMESTAMP": "TIMESTAMP"},
+}
+
+# Tables whose `auto_id` column is assigned by the database when a row leaves it out.
+# Lookup ids are referenced by other tables, so SQLite never reuses them (AUTOINCREMENT);
+# junction ids are referenced nowhere and use the plain rowid, which skips the
+# sqlite_sequence bookkeeping on every insert.
+def _lookup(value_column):
+    return {
+        "columns": [("id", "INTEGER", "PRIMARY KEY AUTOINCREMENT"), (value_column, "TEXT", "UNIQUE NOT NULL")],
+        "foreign_keys": {},
+        "auto_id": "id",
+    }
+
+def _junction(value_column, lookup_table):
+    return {
+        "columns": [("id", "INTEGER", "PRIMARY KEY"), ("show_id", "INTEGER", ""),
+                    (value_column, "INTEGER", "")],
+        "foreign_keys": {"show_id": "shows(tvmaze_id)", value_column: f"{lookup_table}(id)"},
+        "auto_id": "id",
+    }
+
+# The normalized tables and the airings fact table, in the order they are created and loaded
+TABLES = {
+    "show_types": _lookup("show_type"),
+    "languages": _lookup("language"),
+    "genres": _lookup("genre"),
+    "statuses": _lookup("status"),
+    "schedule_days": _lookup("day_name"),
+    "shows": {
+        "columns": [
+            ("tvmaze_id", "INTEGER", "PRIMARY KEY"),
+            ("tvmaze_url", "TEXT", ""),
+            ("official_site_url", "TEXT", ""),
+            ("show_name", "TEXT", "NOT NULL"),
+            ("show_type_id", "INTEGER", ""),
+            ("language_id", "INTEGER", ""),
+            ("status_id", "INTEGER", ""),
+            ("average_runtime_minutes", "INTEGER", ""),
+            ("premiere_date", "TIMESTAMP", ""),
+            ("end_date", "TIMESTAMP", ""),
+            ("show_tvmaze_weight", "INTEGER", ""),
+            ("show_summary", "TEXT", ""),
+            ("last_updated_utc", "TIMESTAMP", ""),
+            ("imdb_id", "TEXT", ""),
+            ("image_medium_url", "TEXT", ""),
+            ("image_original_url", "TEXT", ""),
+        ],
+        "foreign_keys": {"show_type_id": "show_types(id)", "language_id": "languages(id)", "status_id": "statuses(id)"},
+    },
+    "show_genres": _junction("genre_id", "genres"),
+    "show_schedule_days": _junction("day_id", "schedule_days"),
+    # One row per episode airing, from the schedule entries (see TVMazeDataProcessor.iter_batches)
+    "airings": {
+        "columns": [
+            ("episode_id", "INTEGER", "PRIMARY KEY"),
+            ("show_id", "INTEGER", ""),
+            ("season", "INTEGER", ""),
+            ("number", "INTEGER", ""),
+            ("episode_type", "TEXT", ""),
+            ("airdate", "DATE", ""),
+            ("airtime", "TEXT", ""),
+            ("airstamp", "TIMESTAMP", ""),
+            ("runtime", "INTEGER", ""),
+        ],
+        "foreign_keys": {"show_id": "shows(tvmaze_id)"},
+    },
+}
+
+# Lookup tables with the value column they are keyed on, and the foreign keys that reference them.
+LOOKUP_TABLES = {
+    "show_types": "show_type",
+    "languages": "language",
+    "genres": "genre",
+    "statuses": "status",
+    "schedule_days": "day_name",
+}
+FOREIGN_KEYS = {
+    "shows": {"show_type_id": "show_types", "language_id": "languages", "status_id": "statuses"},
+    "show_genres": {"genre_id": "genres"},
+    "show_schedule_days": {"day_id": "schedule_days"},
+}
+JUNCTION_TABLES = ("show_genres", "show_schedule_days")
+
+# Load order that keeps referenced rows ahead of the rows pointing at them.
+LOAD_ORDER = tuple(TABLES)
+
+# Analytics queries run after each load. They read SQLiteDB's summary tables, so
+# they answer in constant time however many months are loaded. They live here, with
+# no heavy imports, so the command line can list and run them quickly.
+ANALYTICS_QUERIES = {
+    "avg_runtime": "SELECT ROUND(runtime_sum / runtime_count, 2) AS avg_runtime FROM summary_runtime",
+    "genre_count": """
+SELECT
+    g.genre,
+    c.show_count
+FROM summary_counts c
+JOIN genres g ON c.value_id = g.id
+WHERE c.dimension = 'genre'
+ORDER BY c.show_count DESC
+""",
+    "unique_domains": "SELECT official_site_url FROM summary_sites",
+    "language_count": """
+SELECT l.language, c.show_count
+FROM summary_counts c
+JOIN languages l ON c.value_id = l.id
+WHERE c.dimension = 'language'
+ORDER BY c.show_count DESC
+""",
+    "status_count": """
+SELECT st.status, c.show_count
+FROM summary_counts c
+JOIN statuses st ON c.value_id = st.id
+WHERE c.dimension = 'status'
+ORDER BY c.show_count DESC
+""",
+    "day_count": """
+SELECT d.day_name, c.show_count
+FROM summary_counts c
+JOIN schedule_days d ON c.value_id = d.id
+WHERE c.dimension = 'day'
+ORDER BY d.id
+""",
+    "runtime_stats": """
+SELECT
+    runtime_count,
+    ROUND(runtime_sum / runtime_count, 2) AS avg_runtime,
+    ROUND(SQRT(MAX(runtime_sum_sq / runtime_count - (runtime_sum / runtime_count) * (runtime_sum / runtime_count), 0)), 2) AS stddev_runtime,
+    runtime_min,
+    runtime_max
+FROM summary_runtime
+""",
+}
+
+# The same analytics computed from the base tables, to check the summaries against.
+ANALYTICS_BASE_QUERIES = {
+    "avg_runtime": "SELECT ROUND(AVG(average_runtime_minutes),2) AS avg_runtime FROM shows",
+    "genre_count": """
+SELECT 
+    g.genre,
+    COUNT(sg.show_id) AS show_count
+FROM shows s
+LEFT JOIN show_genres sg ON s.tvmaze_id = sg.show_id
+LEFT JOIN genres g ON sg.genre_id = g.id
+GROUP BY g.genre
+ORDER BY show_count DESC
+""",
+    "unique_domains": "SELECT DISTINCT(official_site_url) AS official_site_url FROM shows",
+}
+
+def column_names(table_name):
+    """Column names of a table, in definition order."""
+    return [name for name, _, _ in TABLES[table_name]["columns"]]
+
+def auto_id_column(table_name):
+    """The column whose values the database assigns when they are missing, or None."""
+    return TABLES[table_name].get("auto_id")
+
+def create_table_sql(table_name, dialect="sqlite"):
+    """
+    Builds the CREATE TABLE IF NOT EXISTS statement of a table for a dialect.
+
+    DuckDB has no AUTOINCREMENT (the backend assigns those ids itself) and does
+    not let referenced rows be replaced, which upserts rely on, so foreign keys
+    are only declared for SQLite.
+
+    Args:
+        table_name (str): A key of TABLES.
+        dialect (str, optional): "sqlite" or "duckdb". Defaults to "sqlite".
+
+    Returns:
+        str: The DDL statement.
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown dialect '{dialect}'. Use one of {', '.join(DIALECTS)}")
+    table = TABLES[table_name]
+    types = COLUMN_TYPES[dialect]
+    definitions = []
+    for name, column_type, constraints in table["columns"]:
+        if dialect == "duckdb":
+            constraints = constraints.replace("AUTOINCREMENT", "").strip()
+        definitions.append(f"{name} {types[column_type]} {constraints}".strip())
+    if dialect == "sqlite":
+        definitions += [f"FOREIGN KEY ({column}) REFERENCES {target}" for column, target in table["foreign_keys"].items()]
+    body = ",\n    ".join(definitions)
+    return f"CREATE TABLE IF NOT EXISTS {table_name} (\n    {body}\n)"
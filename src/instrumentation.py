@@ -0,0 +1,247 @@
+#%%
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import psutil
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+def count_rows(value):
+    """Rows in a DataFrame, Arrow table or dict or tuple of them (summed); None for anything else."""
+    if isinstance(value, (dict, tuple)):
+        counts = [count_rows(item) for item in (value.values() if isinstance(value, dict) else value)]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    if isinstance(value, pd.DataFrame) or hasattr(value, "num_rows"):
+        return len(value)
+    return None
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        event = {"time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+                 "event": record.getMessage()}
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
+
+class _RssSampler(threading.Thread):
+    """Polls the process RSS in the background and keeps the highest value seen."""
+    def __init__(self, process, interval):
+        super().__init__(daemon=True)
+        self.process = process
+        self.interval = interval
+        self.peak = process.memory_info().rss
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return self.peak
+
+class Instrumentation:
+    """
+    Records wall time, CPU time, peak memory, rows in/out and I/O bytes per stage.
+
+    Each stage becomes a record in a JSON run report and two events (start, end)
+    in a JSON-lines log. Peak RSS is sampled in a background thread; Python-level
+    peak allocations are added when `trace_memory` is set (tracemalloc slows the
+    run down noticeably). Bytes read and written are the process' read/write
+    syscall totals, so stages running concurrently share them.
+
+    Attributes:
+        run_name (str): Name of the run, used for the report file names.
+        report_dir (str): Directory for the report, the log and profiler output.
+        profiler (str): None, "cprofile" or "pyinstrument".
+        trace_memory (bool): Also record tracemalloc peaks.
+        stages (list): One dict of metrics per finished stage.
+    """
+    RSS_INTERVAL = 0.05  # Seconds between RSS samples
+
+    def __init__(self, run_name, report_dir=None, profiler=None, trace_memory=False):
+        if profiler not in (None,) + PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'. Use one of {', '.join(PROFILERS)}")
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.run_name = run_name
+        self.report_dir = report_dir or os.path.join(project_root, "reports")
+        self.profiler = profiler
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        os.makedirs(self.report_dir, exist_ok=True)
+
+        self.log_path = os.path.join(self.report_dir, f"{run_name}.log.jsonl")
+        self.logger = logging.getLogger(f"tvmaze.instrumentation.{run_name}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = logging.FileHandler(self.log_path, encoding="utf-8")
+            handler.setFormatter(_JsonFormatter())
+            self.logger.addHandler(handler)
+
+    def _io_counters(self):
+        counters = self._process.io_counters()
+        # read_chars/write_chars include page-cache hits; read_bytes only counts disk I/O
+        return (getattr(counters, "read_chars", counters.read_bytes),
+                getattr(counters, "write_chars", counters.write_bytes))
+
+    @contextmanager
+    def _profile(self, name):
+        if self.profiler is None:
+            yield
+            return
+        if self.profiler == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.report_dir, f"{self.run_name}.{name}.prof"))
+            return
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("The 'pyinstrument' profiler needs `pip install pyinstrument`") from e
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(os.path.join(self.report_dir, f"{self.run_name}.{name}.html"), "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures the code run inside the block as one stage.
+
+        Args:
+            name (str): Stage name.
+            rows_in (int, optional): Rows the stage receives.
+
+        Yields:
+            dict: The stage record; set "rows_out" (or any extra field) on it.
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        self.logger.info("stage_start", extra={"fields": {"stage": name, "rows_in": rows_in}})
+
+        # The profiler wraps the measurements, so writing its output is not counted
+        with self._profile(name):
+            if self.trace_memory:
+                with self._lock:
+                    if not tracemalloc.is_tracing():
+                        tracemalloc.start()
+                        self._started_tracemalloc = True
+                    tracemalloc.reset_peak()
+            sampler = _RssSampler(self._process, self.RSS_INTERVAL)
+            sampler.start()
+            read_before, written_before = self._io_counters()
+            cpu_before = time.thread_time()
+            process_cpu_before = time.process_time()
+            wall_before = time.perf_counter()
+            status = "ok"
+            try:
+                yield record
+            except BaseException as e:
+                status = "failed"
+                record["error"] = repr(e)
+                raise
+            finally:
+                read_after, written_after = self._io_counters()
+                record.update({
+                    "status": status,
+                    "wall_seconds": round(time.perf_counter() - wall_before, 4),
+                    "cpu_seconds": round(time.thread_time() - cpu_before, 4),
+                    "process_cpu_seconds": round(time.process_time() - process_cpu_before, 4),
+                    "peak_rss_bytes": sampler.stop(),
+                    "bytes_read": read_after - read_before,
+                    "bytes_written": written_after - written_before,
+                })
+                if self.trace_memory:
+                    record["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+                with self._lock:
+                    self.stages.append(record)
+                self.logger.info("stage_end", extra={"fields": record})
+
+    def wrap(self, obj, method_name, stage_name=None):
+        """
+        Instruments a method of a stage object in place (e.g. `TVMazeDataCleaner.clean_data`).
+
+        Rows in are counted from the first DataFrame-like argument (or the object's
+        `df`), rows out from the return value.
+
+        Args:
+            obj (object): The stage instance.
+            method_name (str): Name of the method to wrap.
+            stage_name (str, optional): Stage name in the report. Defaults to "Class.method".
+
+        Returns:
+            object: `obj`, for chaining.
+        """
+        method = getattr(obj, method_name)
+        stage_name = stage_name or f"{type(obj).__name__}.{method_name}"
+
+        @functools.wraps(method)
+        def instrumented(*args, **kwargs):
+            rows_in = next((count for count in map(count_rows, list(args) + list(kwargs.values())) if count is not None), None)
+            if rows_in is None:
+                rows_in = count_rows(getattr(obj, "df", None))
+            with self.stage(stage_name, rows_in=rows_in) as record:
+                result = method(*args, **kwargs)
+                record["rows_out"] = count_rows(result)
+            return result
+
+        setattr(obj, method_name, instrumented)
+        return obj
+
+    def report(self):
+        """Returns the run report as a dict."""
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "profiler": self.profiler,
+            "stages": list(self.stages),
+            "total_wall_seconds": round(sum(stage["wall_seconds"] for stage in self.stages), 4),
+        }
+
+    def write_report(self):
+        """
+        Writes the run report as JSON.
+
+        Returns:
+            str: The file path of the report.
+
+        Saves:
+            A file named '<run_name>.json' in the report directory.
+        """
+        output_path = os.path.join(self.report_dir, f"{self.run_name}.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1, default=str)
+        print(f"\nRun report saved to: {output_path}")
+        return output_path
+
+    def close(self):
+        """Closes the structured log and stops tracemalloc if this instance started it."""
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
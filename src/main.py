@@ -1,15 +1,29 @@
 #%%
+import sys
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from data_ingestion import TVMazeDataFetcher
 from data_processing import TVMazeDataProcessor
 from data_profiling import TVMazeDataProfiler
 from data_cleaning import TVMazeDataCleaner
 from data_export import ParquetExporter
 from data_normalization import TVMazeDataNormalizer
-from db_loader import SQLiteDB
+from db_backend import get_backend
+from db_query import QueryEngine
+from instrumentation import Instrumentation
+
+# Profiling mode: "full", "minimal", "sampled", "stats" or "off" (see TVMazeDataProfiler)
+PROFILING_MODE = "minimal"
+
+# Database backend: "sqlite" or "duckdb"; None uses TVMAZE_DB_BACKEND, then "sqlite"
+DB_BACKEND = None
+
+# Code profiler for every stage: None, "cprofile" or "pyinstrument" (output in reports/)
+PROFILER = None
 
 # Data ingestion
-year_month = input("Enter year and month (YYYY-MM): ").strip()
+# The month can be passed as an argument (`python src/main.py 2024-01`); see cli.py for subcommands
+year_month = sys.argv[1].strip() if len(sys.argv) > 1 else input("Enter year and month (YYYY-MM): ").strip()
 while True:
     try:
         datetime.strptime(year_month, "%Y-%m")
@@ -17,55 +31,65 @@ while True:
     except ValueError:
         year_month = input("Invalid format. Please enter as YYYY-MM: ").strip()
 
-fetcher = TVMazeDataFetcher()
+instrumentation = Instrumentation(f"main_{year_month}_{datetime.now().strftime('%Y%m%dT%H%M%S')}", profiler=PROFILER)
+
+fetcher = instrumentation.wrap(TVMazeDataFetcher(), "fetch_data")
 fetcher.fetch_data(year_month)
 print(f"\n\nFetched shows for {year_month}")
 
 # Data processing
-data_processor = TVMazeDataProcessor()
-processed_df = data_processor.process_tv_shows(year_month)
+# Shows and episode airings come out of the same pass over the raw files
+data_processor = instrumentation.wrap(TVMazeDataProcessor(), "process_tv_shows_and_airings")
+processed_df, airings_df = data_processor.process_tv_shows_and_airings(year_month)
 
 # Data profiling
-data_profiler = TVMazeDataProfiler()
+data_profiler = instrumentation.wrap(TVMazeDataProfiler(mode=PROFILING_MODE), "generate_profile_report")
 profile_path = data_profiler.generate_profile_report(processed_df)
 
 # Data cleaning
-data_cleaner = TVMazeDataCleaner(processed_df)
+data_cleaner = instrumentation.wrap(TVMazeDataCleaner(processed_df), "clean_data")
 cleaned_df = data_cleaner.clean_data()
 
-# Data export
-exporter = ParquetExporter()
-parquet_file_path = exporter.export_to_parquet(cleaned_df, filename=f"tvmaze_data_{year_month}.parquet")
+# Data export runs in the background while the cleaned frame is normalized in memory
+db = instrumentation.wrap(get_backend(DB_BACKEND), "load_incremental")
+exporter = instrumentation.wrap(ParquetExporter(), "export_to_dataset")
+with ThreadPoolExecutor(max_workers=1) as executor:
+    export_future = executor.submit(exporter.export_to_dataset, cleaned_df, year_month)
+    airings_future = executor.submit(exporter.export_airings, airings_df, year_month)
 
-# Data normalization
-data_normalizer = TVMazeDataNormalizer(parquet_file_path)
-normalized_data = data_normalizer.transform()
+    # Data normalization, reusing the lookup ids already stored in the database
+    data_normalizer = instrumentation.wrap(TVMazeDataNormalizer(cleaned_df, lookups=db.fetch_lookups()), "transform")
+    normalized_data = data_normalizer.transform()
+    dataset_path = export_future.result()
+    airings_future.result()
 
 # Upload data
-db = SQLiteDB()
-for table, df in normalized_data.items():
-    db.insert_dataframe(df, table)
-db.close_connection()
-print(f"\n\nData uploaded to SQLite database successfully.")
+db.load_incremental(normalized_data)
+db.load_airings(airings_df)
+print(f"\n\nData uploaded to {db.name} database successfully.")
 
-# Data Analysis
-df_avg_runtime = db.run_query("SELECT ROUND(AVG(average_runtime_minutes),2) AS avg_runtime FROM shows")
+# Data Analysis: SQLite answers through the cached query layer, DuckDB scans directly
+if db.name == "sqlite":
+    queries = QueryEngine(db.db_path)
+    queries.prepare(db.analytics_queries)
+    run_analytics = queries.query
+else:
+    # The exported dataset is queryable in place as `cleaned_shows`
+    db.attach_parquet("cleaned_shows", dataset_path)
+    queries = None
+    run_analytics = lambda name: db.run_query(db.analytics_queries[name])
+df_avg_runtime = run_analytics("avg_runtime")
 print(f"\n\nAverage runtime of shows: {df_avg_runtime['avg_runtime'][0]}min")
 
-query_genre_count = """
-SELECT 
-    g.genre,
-    COUNT(sg.show_id) AS show_count
-FROM shows s
-LEFT JOIN show_genres sg ON s.tvmaze_id = sg.show_id
-LEFT JOIN genres g ON sg.genre_id = g.id
-GROUP BY g.genre
-ORDER BY show_count DESC
-"""
-df_genre_count = db.run_query(query_genre_count)
+df_genre_count = run_analytics("genre_count")
 print("\n\nGenre count:")
 print(df_genre_count.to_string(index=False))
 
-df_unique_domains = db.run_query("SELECT DISTINCT(official_site_url) AS official_site_url FROM shows")
+df_unique_domains = run_analytics("unique_domains")
 print(f"\n\nUnique official sites domains:")
-print("\n".join(df_unique_domains["official_site_url"].astype(str)))
\ No newline at end of file
+print("\n".join(df_unique_domains["official_site_url"].astype(str)))
+if queries is not None:
+    queries.close()
+db.close_connection()
+instrumentation.write_report()
+instrumentation.close()
@@ -0,0 +1,295 @@
+#%%
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    from .data_processing import TVMazeDataProcessor
+    from .db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND, get_backend
+except ImportError:
+    from data_processing import TVMazeDataProcessor
+    from db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND, get_backend
+
+ENGINES = ("pandas", "polars")
+# Most months the writer merges in one transaction
+MAX_BATCH_MONTHS = 6
+# Months processed ahead of the writer, per worker; bounds the results held in memory
+MONTHS_AHEAD_PER_WORKER = 2
+
+def month_range(start, end):
+    """
+    Lists the months between two bounds as "YYYY-MM" strings.
+
+    Args:
+        start (str): First month, "YYYY-MM".
+        end (str): Last month, "YYYY-MM", inclusive.
+
+    Returns:
+        list: The months of the range in order.
+    """
+    try:
+        first = datetime.strptime(start, "%Y-%m")
+        last = datetime.strptime(end, "%Y-%m")
+    except ValueError:
+        raise ValueError("Invalid month range. Please use 'YYYY-MM' bounds")
+    if last < first:
+        raise ValueError(f"Range end {end} is before its start {start}")
+    return [f"{index // 12:04d}-{index % 12 + 1:02d}"
+            for index in range(first.year * 12 + first.month - 1, last.year * 12 + last.month)]
+
+def process_month(year_month, json_dir=None, project_root=None, lookups=None, export=True, engine="pandas"):
+    """
+    Processes, cleans, exports and normalizes one month. Runs in a worker process.
+
+    Args:
+        year_month (str): Month to process, as YYYY-MM.
+        json_dir (str, optional): Raw files directory. Defaults to the project's 'json' folder.
+        project_root (str, optional): Root of the 'data' folder the Parquet datasets go to.
+        lookups (dict, optional): Lookup tables stored when the run started, so most ids
+                                  already match the database. Defaults to None.
+        export (bool, optional): Export the cleaned shows and airings as Parquet. Defaults to True.
+        engine (str, optional): "pandas" or "polars" (data_lazy.TVMazeLazyEngine). Defaults to "pandas".
+
+    Returns:
+        tuple: (normalized tables dict, airings pd.DataFrame), or None when the month has no raw files.
+    """
+    try:
+        from .data_cleaning import TVMazeDataCleaner
+        from .data_export import ParquetExporter
+        from .data_normalization import TVMazeDataNormalizer
+    except ImportError:
+        from data_cleaning import TVMazeDataCleaner
+        from data_export import ParquetExporter
+        from data_normalization import TVMazeDataNormalizer
+
+    processor = TVMazeDataProcessor(json_dir)
+    json_files = processor.get_json_files(year_month)
+    if not json_files:
+        print(f"No JSON files found for date substring '{year_month}'")
+        return None
+    shows, airings = processor.tv_shows_and_airings_to_tables(json_files)
+    airings_df = airings.to_pandas()
+    if engine == "polars":
+        try:
+            from .data_lazy import TVMazeLazyEngine
+        except ImportError:
+            from data_lazy import TVMazeLazyEngine
+        cleaned_df, normalized_data = TVMazeLazyEngine(lookups=lookups).run(shows)
+    else:
+        cleaned_df = TVMazeDataCleaner(processor._table_to_dataframe(shows)).clean_data()
+        normalized_data = TVMazeDataNormalizer(cleaned_df, lookups=lookups).transform()
+    if export:
+        # Each month only replaces its own partitions, so workers can export side by side
+        exporter = ParquetExporter(project_root)
+        exporter.export_to_dataset(cleaned_df, year_month)
+        exporter.export_airings(airings_df, year_month)
+    return normalized_data, airings_df
+
+class SingleWriter:
+    """
+    The only connection that writes to the database during a multi-month run.
+
+    Months are queued in the order they must be loaded. A thread takes every
+    month waiting in the queue, up to `max_batch`, and merges them with
+    `load_batches` in a single transaction, so the database sees one writer
+    and one commit per batch however many workers produce months. When loads
+    keep up, each month gets its own transaction; when they fall behind, the
+    batches grow. The queue is bounded, so producers wait instead of piling
+    results up in memory.
+
+    Attributes:
+        counts (dict): Load counts of each month written, keyed by month.
+        transactions (int): Transactions committed.
+        error (Exception): The open or load failure that stopped the writer, if any.
+    """
+
+    def __init__(self, backend=None, db_name=None, max_batch=MAX_BATCH_MONTHS):
+        """
+        Args:
+            backend (str, optional): Database backend, see db_backend.get_backend.
+            db_name (str, optional): Database in the 'db' folder. Defaults to the backend's default.
+            max_batch (int, optional): Most months per transaction. Defaults to MAX_BATCH_MONTHS.
+        """
+        self.backend = backend
+        self.db_name = db_name
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=max_batch)
+        self.counts = {}
+        self.transactions = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, year_month, normalized_data, airings):
+        """Queues a month for loading, waiting while the queue is full."""
+        if self.error is not None:
+            raise self.error
+        self.queue.put((year_month, normalized_data, airings))
+
+    def close(self):
+        """Loads the months still queued and stops the writer, raising its error if a load failed."""
+        self.queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _next_batch(self):
+        """Waits for one month, then takes the months already queued behind it."""
+        batch = [self.queue.get()]
+        while batch[-1] is not None and len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        # The connection is opened in the writer thread, the only one allowed to use it
+        db = None
+        try:
+            db = get_backend(self.backend, self.db_name)
+            if db.name == "sqlite":
+                db.apply_bulk_pragmas()
+        except Exception as e:
+            self.error = e
+            print(f"Database writer could not start: {e!r}")
+        try:
+            stop = False
+            while not stop:
+                batch = self._next_batch()
+                stop = batch[-1] is None
+                months = [item for item in batch if item is not None]
+                if not months or self.error is not None:
+                    continue  # After a failure, drain the queue so producers never block
+                try:
+                    counts = db.load_batches([(normalized_data, airings) for _, normalized_data, airings in months])
+                except Exception as e:
+                    self.error = e
+                    print(f"Load of {', '.join(month for month, _, _ in months)} failed: {e!r}")
+                    continue
+                self.transactions += 1
+                self.counts.update(zip([month for month, _, _ in months], counts))
+                print(f"Loaded {', '.join(month for month, _, _ in months)} in one transaction")
+        finally:
+            if db is not None:
+                db.close_connection()
+
+def run_months(months, json_dir=None, project_root=None, backend=None, db_name=None, workers=None,
+               max_batch=MAX_BATCH_MONTHS, export=True, engine="pandas"):
+    """
+    Processes months in parallel and loads them through a SingleWriter.
+
+    Workers run process_month, so processing, cleaning, export and normalization
+    scale with the number of processes. Finished months are handed to the
+    writer in month order, which keeps the database identical to loading the
+    months one after the other: a show seen in several months ends up with its
+    latest version. Only the lookup ids of values new to the run can differ,
+    since each worker numbers them from the snapshot taken at the start and
+    the writer remaps them to the stored ids.
+
+    Args:
+        months (list): Months to process, as YYYY-MM. Duplicates are ignored and the rest sorted.
+        json_dir (str, optional): Raw files directory. Defaults to the project's 'json' folder.
+        project_root (str, optional): Root of the 'data' folder. Defaults to the project root.
+        backend (str, optional): Database backend, see db_backend.get_backend.
+        db_name (str, optional): Database in the 'db' folder. Defaults to the backend's default.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        max_batch (int, optional): Most months per transaction. Defaults to MAX_BATCH_MONTHS.
+        export (bool, optional): Export each month as Parquet too. Defaults to True.
+        engine (str, optional): "pandas" or "polars". Defaults to "pandas".
+
+    Returns:
+        dict: Load counts of each month loaded, keyed by month; months without raw files are left out.
+    """
+    months = sorted(set(months))
+    workers = workers or os.cpu_count() or 1
+    db = get_backend(backend, db_name)
+    try:
+        lookups = db.fetch_lookups()
+    finally:
+        db.close_connection()
+
+    writer = SingleWriter(backend, db_name, max_batch).start()
+    # Workers are spawned, not forked, so they never inherit the writer thread's connection or locks
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            upcoming = iter(months)
+            in_flight = deque()
+
+            def submit_next():
+                year_month = next(upcoming, None)
+                if year_month is not None:
+                    in_flight.append((year_month, executor.submit(
+                        process_month, year_month, json_dir, project_root, lookups, export, engine)))
+
+            for _ in range(workers * MONTHS_AHEAD_PER_WORKER):
+                submit_next()
+            try:
+                while in_flight:
+                    year_month, future = in_flight.popleft()
+                    result = future.result()
+                    submit_next()
+                    if result is not None:
+                        print(f"Processed {year_month}")
+                        writer.put(year_month, *result)
+            except BaseException:
+                # Fail fast: months not started yet are dropped instead of processed for nothing
+                for _, future in in_flight:
+                    future.cancel()
+                raise
+    finally:
+        writer.close()
+    print(f"\n\nLoaded {len(writer.counts)} months in {writer.transactions} transactions")
+    return writer.counts
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Process a range of months in parallel and load them through a single database writer."
+    )
+    parser.add_argument("start", help="First month 'YYYY-MM', or a 'START..END' range")
+    parser.add_argument("end", nargs="?", help="Last month 'YYYY-MM' (inclusive)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_MONTHS,
+                        help="Most months loaded in one transaction")
+    parser.add_argument("--engine", choices=ENGINES, default="pandas", help="Engine of the clean and normalize steps")
+    parser.add_argument("--no-export", action="store_true", help="Skip the Parquet datasets")
+    parser.add_argument("--json-dir", default=None, help="Directory of the raw files")
+    parser.add_argument("--project-root", default=None, help="Root of the 'data' folder")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help=f"Database backend (default: ${BACKEND_ENV_VAR}, then {DEFAULT_BACKEND})")
+    parser.add_argument("--db-name", default=None, help="Database in the 'db' folder (default: tvmaze.db or tvmaze.duckdb)")
+    args = parser.parse_args(argv)
+
+    if args.end is None:
+        args.start, _, args.end = args.start.partition("..")
+        if not args.end:
+            args.end = args.start
+    try:
+        args.months = month_range(args.start, args.end)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = run_months(args.months, json_dir=args.json_dir, project_root=args.project_root, backend=args.backend,
+                        db_name=args.db_name, workers=args.workers, max_batch=args.max_batch,
+                        export=not args.no_export, engine=args.engine)
+    missing = [year_month for year_month in args.months if year_month not in counts]
+    if missing:
+        print(f"No raw files for {', '.join(missing)}. Fetch them first with backfill.py")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
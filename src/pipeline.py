@@ -0,0 +1,440 @@
+#%%
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from .data_processing import TVMazeDataProcessor
+    from .db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND
+    from .instrumentation import PROFILERS, Instrumentation, count_rows
+except ImportError:
+    from data_processing import TVMazeDataProcessor
+    from db_backend import BACKENDS, BACKEND_ENV_VAR, DEFAULT_BACKEND
+    from instrumentation import PROFILERS, Instrumentation, count_rows
+
+# How each artifact kind is checkpointed:
+#   "frame"  - a DataFrame, saved as <name>.parquet
+#   "tables" - a dict of DataFrames, saved as <name>/<table>.parquet
+#   "files"  - a path or list of paths the stage wrote itself, hashed in place
+#   "json"   - a JSON-serializable value, saved as <name>.json
+ARTIFACT_KINDS = ("frame", "tables", "files", "json")
+
+def _hash_paths(paths):
+    """Content hash of files (directories are walked), independent of where they live."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names)
+        else:
+            files = [path]
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, os.path.dirname(path)).encode())
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_frame(path):
+    """Reads a checkpointed DataFrame, restoring list columns as Python lists."""
+    return TVMazeDataProcessor._table_to_dataframe(pq.read_table(path))
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=None, params=None, volatile=False):
+        """
+        A pipeline step with declared inputs and outputs.
+
+        Args:
+            name (str): Unique stage name.
+            func (callable): Called with the input artifacts as keyword arguments;
+                             returns a dict with one value per declared output.
+            inputs (tuple, optional): Names of artifacts produced by upstream stages.
+            outputs (dict, optional): Artifact name to kind (see ARTIFACT_KINDS).
+            params (dict, optional): JSON-serializable settings that change the result;
+                                     they are part of the cache key.
+            volatile (bool, optional): The stage reads outside state (e.g. the API), so
+                                       `run` always executes it. Defaults to False.
+        """
+        outputs = outputs or {}
+        unknown = set(outputs.values()) - set(ARTIFACT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown artifact kinds {sorted(unknown)} in stage '{name}'")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = outputs
+        self.params = params or {}
+        self.volatile = volatile
+
+class PipelineRunner:
+    """
+    Runs stages in dependency order with checkpointing and skip-if-unchanged caching.
+
+    Every output is checkpointed and content-hashed. A stage's cache key hashes
+    its name, params and the content hashes of its inputs, so a stage is skipped
+    when it already completed with the same key, and downstream stages are also
+    skipped when an upstream rerun produced identical output. Stages whose inputs
+    are ready run concurrently in a thread pool. Progress is saved to
+    `state.json` after every stage, so an interrupted run can be resumed.
+
+    Attributes:
+        stages (dict): Stage name to Stage, in declaration order.
+        checkpoint_dir (str): Directory for checkpoints and the state file.
+        max_workers (int): Stages run at the same time.
+        instrumentation (Instrumentation): Records metrics for the stages that run, if given.
+    """
+    STATE_FILE = "state.json"
+
+    def __init__(self, stages, checkpoint_dir, max_workers=2, instrumentation=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.checkpoint_dir = checkpoint_dir
+        self.max_workers = max_workers
+        self.instrumentation = instrumentation
+        self.producers = {}
+        for stage in stages:
+            for artifact in stage.outputs:
+                if artifact in self.producers:
+                    raise ValueError(f"Artifact '{artifact}' is produced by both '{self.producers[artifact]}' and '{stage.name}'")
+                self.producers[artifact] = stage.name
+        for stage in stages:
+            missing = [artifact for artifact in stage.inputs if artifact not in self.producers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs artifacts nobody produces: {', '.join(missing)}")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.state = self._load_state()
+        self._values = {}
+
+    def _load_state(self):
+        path = os.path.join(self.checkpoint_dir, self.STATE_FILE)
+        if not os.path.exists(path):
+            return {"stages": {}}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.checkpoint_dir, self.STATE_FILE))
+
+    def upstream(self, stage_name):
+        """Returns the names of the stages `stage_name` depends on, directly or not."""
+        seen = set()
+        pending = [stage_name]
+        while pending:
+            for artifact in self.stages[pending.pop()].inputs:
+                producer = self.producers[artifact]
+                if producer not in seen:
+                    seen.add(producer)
+                    pending.append(producer)
+        return seen
+
+    def _cache_key(self, stage):
+        digest = hashlib.sha256()
+        digest.update(json.dumps({"stage": stage.name, "params": stage.params}, sort_keys=True, default=str).encode())
+        for artifact in stage.inputs:
+            producer = self.state["stages"][self.producers[artifact]]
+            digest.update(f"{artifact}={producer['outputs'][artifact]['fingerprint']}".encode())
+        return digest.hexdigest()
+
+    def _is_current(self, stage, key, resume):
+        record = self.state["stages"].get(stage.name)
+        if record is None or record.get("status") != "done":
+            return False
+        if stage.volatile and not resume:
+            return False
+        if not stage.volatile and record.get("key") != key:
+            return False
+        return all(os.path.exists(path) for output in record["outputs"].values() for path in output["paths"])
+
+    def _save_artifact(self, name, kind, value):
+        """Checkpoints one output and returns its state entry."""
+        if kind == "frame":
+            paths = [os.path.join(self.checkpoint_dir, f"{name}.parquet")]
+            pq.write_table(pa.Table.from_pandas(value, preserve_index=False), paths[0])
+        elif kind == "tables":
+            table_dir = os.path.join(self.checkpoint_dir, name)
+            os.makedirs(table_dir, exist_ok=True)
+            for table_name, df in value.items():
+                pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(table_dir, f"{table_name}.parquet"))
+            paths = [table_dir]
+        elif kind == "json":
+            paths = [os.path.join(self.checkpoint_dir, f"{name}.json")]
+            with open(paths[0], "w", encoding="utf-8") as f:
+                json.dump(value, f, indent=1, default=str)
+        else:
+            paths = [value] if isinstance(value, str) else list(value or [])
+        return {"kind": kind, "paths": paths, "fingerprint": _hash_paths(paths), "is_list": not isinstance(value, str)}
+
+    def _load_artifact(self, name):
+        """Returns an artifact from this run, or reads it back from its checkpoint."""
+        if name not in self._values:
+            output = self.state["stages"][self.producers[name]]["outputs"][name]
+            kind, paths = output["kind"], output["paths"]
+            if kind == "frame":
+                value = _read_frame(paths[0])
+            elif kind == "tables":
+                value = {
+                    f[:-len(".parquet")]: _read_frame(os.path.join(paths[0], f))
+                    for f in sorted(os.listdir(paths[0])) if f.endswith(".parquet")
+                }
+            elif kind == "json":
+                with open(paths[0], encoding="utf-8") as f:
+                    value = json.load(f)
+            else:
+                value = paths if output["is_list"] else paths[0]
+            self._values[name] = value
+        return self._values[name]
+
+    def _execute(self, stage):
+        """Runs one stage and checkpoints its outputs."""
+        kwargs = {artifact: self._load_artifact(artifact) for artifact in stage.inputs}
+        if self.instrumentation is None:
+            results = stage.func(**kwargs) or {}
+        else:
+            with self.instrumentation.stage(stage.name, rows_in=count_rows(kwargs)) as record:
+                results = stage.func(**kwargs) or {}
+                record["rows_out"] = count_rows(results)
+        outputs = {}
+        for artifact, kind in stage.outputs.items():
+            outputs[artifact] = self._save_artifact(artifact, kind, results[artifact])
+            self._values[artifact] = results[artifact]
+        return outputs
+
+    def run(self, targets=None, force=(), resume=False):
+        """
+        Runs `targets` and the stages they depend on.
+
+        Args:
+            targets (list, optional): Stage names to run. Defaults to every stage.
+            force (tuple, optional): Stage names to rerun even when up to date.
+            resume (bool, optional): Keep every stage that completed before, volatile
+                                     ones included, and only run what is left. Defaults to False.
+
+        Returns:
+            dict: Stage name to "ran" or "skipped".
+
+        Raises:
+            Exception: The first stage failure, once the stages already running have finished.
+        """
+        targets = list(targets or self.stages)
+        unknown = [name for name in list(targets) + list(force) if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(unknown)}")
+        selected = set(targets)
+        for name in targets:
+            selected |= self.upstream(name)
+        pending = [name for name in self.stages if name in selected]
+
+        outcome = {}
+        failure = None
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [
+                    name for name in pending
+                    if failure is None and self.upstream(name).isdisjoint(set(pending) | set(running.values()))
+                ]
+                for name in ready:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    key = self._cache_key(stage)
+                    if name not in force and self._is_current(stage, key, resume):
+                        print(f"[{name}] up to date, skipped")
+                        outcome[name] = "skipped"
+                        continue
+                    print(f"[{name}] running")
+                    self.state["stages"][name] = {"status": "running", "key": key, "outputs": {}}
+                    running[executor.submit(self._execute, stage)] = name
+
+                if not running:
+                    if failure is not None or not ready:
+                        break
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    record = self.state["stages"][name]
+                    record["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                    try:
+                        record["outputs"] = future.result()
+                        record["status"] = "done"
+                        outcome[name] = "ran"
+                        print(f"[{name}] done")
+                    except Exception as e:
+                        record["status"] = "failed"
+                        record["error"] = repr(e)
+                        print(f"[{name}] failed: {e!r}")
+                        failure = failure or e
+                    self._save_state()
+
+        if failure is not None:
+            raise failure
+        return outcome
+
+def build_stages(year_month, json_dir=None, project_root=None, db_name=None,
+                 profiling_mode="minimal", offline=False, backend=None):
+    """
+    Models the steps of `main.py` as stages:
+
+        fetch -> process -> profile
+                         -> clean -> export
+                                  -> normalize -> load
+
+    `process` also emits the airings of the same files, which `export` and
+    `load` write next to the shows.
+
+    Args:
+        year_month (str): Month to process, as YYYY-MM.
+        json_dir (str, optional): Raw files directory. Defaults to the project's 'json' folder.
+        project_root (str, optional): Root for the 'data' and 'profiling' outputs. Defaults to the project root.
+        db_name (str, optional): Database in the 'db' folder. Defaults to the backend's default.
+        profiling_mode (str, optional): TVMazeDataProfiler mode. Defaults to "minimal".
+        offline (bool, optional): Use the raw files already on disk instead of requesting the API.
+        backend (str, optional): Database backend, see db_backend.get_backend.
+
+    Returns:
+        list: The Stage objects.
+    """
+    # Stage classes are imported here so the runner itself stays light to import
+    try:
+        from .data_ingestion import TVMazeDataFetcher
+        from .data_profiling import TVMazeDataProfiler
+        from .data_cleaning import TVMazeDataCleaner
+        from .data_export import ParquetExporter
+        from .data_normalization import TVMazeDataNormalizer
+        from .db_backend import get_backend
+    except ImportError:
+        from data_ingestion import TVMazeDataFetcher
+        from data_profiling import TVMazeDataProfiler
+        from data_cleaning import TVMazeDataCleaner
+        from data_export import ParquetExporter
+        from data_normalization import TVMazeDataNormalizer
+        from db_backend import get_backend
+
+    processor = TVMazeDataProcessor(json_dir)
+
+    def fetch():
+        if not offline:
+            TVMazeDataFetcher(json_dir=processor.json_dir).backfill(year_month, year_month)
+        raw_files = processor.get_json_files(year_month)
+        if not raw_files:
+            raise FileNotFoundError(f"No raw files found for '{year_month}' in {processor.json_dir}")
+        return {"raw_files": raw_files}
+
+    def process(raw_files):
+        shows, airings = processor.tv_shows_and_airings_to_tables(raw_files)
+        return {"processed": processor._table_to_dataframe(shows), "airings": airings.to_pandas()}
+
+    def profile(processed):
+        profiling_dir = os.path.join(project_root, "profiling") if project_root else None
+        report = TVMazeDataProfiler(profiling_dir=profiling_dir, mode=profiling_mode).generate_profile_report(processed)
+        return {"profile_report": [report] if report else []}
+
+    def clean(processed):
+        return {"cleaned": TVMazeDataCleaner(processed).clean_data()}
+
+    def export(cleaned, airings):
+        exporter = ParquetExporter(project_root)
+        year, month = (int(part) for part in year_month.split("-"))
+        dataset_dirs = [exporter.export_to_dataset(cleaned, year_month), exporter.export_airings(airings, year_month)]
+        return {"dataset_partition": [os.path.join(dataset_dir, f"year={year}", f"month={month}")
+                                      for dataset_dir in dataset_dirs]}
+
+    def normalize(cleaned):
+        db = get_backend(backend, db_name)
+        try:
+            return {"normalized": TVMazeDataNormalizer(cleaned, lookups=db.fetch_lookups()).transform()}
+        finally:
+            db.close_connection()
+
+    def load(normalized, airings):
+        db = get_backend(backend, db_name)
+        try:
+            counts = db.load_incremental(normalized)
+            counts["airings"] = db.load_airings(airings)
+            return {"load_counts": counts}
+        finally:
+            db.close_connection()
+
+    return [
+        Stage("fetch", fetch, outputs={"raw_files": "files"}, params={"year_month": year_month}, volatile=True),
+        Stage("process", process, inputs=("raw_files",), outputs={"processed": "frame", "airings": "frame"}),
+        Stage("profile", profile, inputs=("processed",), outputs={"profile_report": "files"},
+              params={"mode": profiling_mode}),
+        Stage("clean", clean, inputs=("processed",), outputs={"cleaned": "frame"}),
+        Stage("export", export, inputs=("cleaned", "airings"), outputs={"dataset_partition": "files"},
+              params={"year_month": year_month}),
+        Stage("normalize", normalize, inputs=("cleaned",), outputs={"normalized": "tables"}),
+        Stage("load", load, inputs=("normalized", "airings"), outputs={"load_counts": "json"}, params={"db_name": db_name, "backend": backend}),
+    ]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the TVmaze pipeline for one month, skipping stages whose inputs are unchanged."
+    )
+    parser.add_argument("command", choices=("run", "resume", "force"),
+                        help="'run' executes stages that are out of date, 'resume' also keeps "
+                             "every stage completed before, 'force' reruns the given stages")
+    parser.add_argument("year_month", help="Month to process, as YYYY-MM")
+    parser.add_argument("stages", nargs="*",
+                        help="Stages to run (with their dependencies). Defaults to all; required by 'force'")
+    parser.add_argument("--profiling-mode", default="minimal",
+                        choices=("full", "minimal", "sampled", "stats", "off"))
+    parser.add_argument("--db-name", default=None, help="Database in the 'db' folder (default: tvmaze.db or tvmaze.duckdb)")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help=f"Database backend (default: ${BACKEND_ENV_VAR}, then {DEFAULT_BACKEND})")
+    parser.add_argument("--json-dir", default=None, help="Directory for the raw JSON files")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Checkpoint directory. Defaults to checkpoints/YYYY-MM in the project root")
+    parser.add_argument("--workers", type=int, default=2, help="Stages run at the same time")
+    parser.add_argument("--offline", action="store_true", help="Use the raw files on disk instead of the API")
+    parser.add_argument("--profile", choices=PROFILERS, default=None,
+                        help="Profile every stage that runs and save the output in reports/")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also record tracemalloc peaks (slower)")
+    args = parser.parse_args(argv)
+
+    try:
+        datetime.strptime(args.year_month, "%Y-%m")
+    except ValueError:
+        parser.error(f"Invalid month '{args.year_month}'. Use YYYY-MM")
+    if args.command == "force" and not args.stages:
+        parser.error("'force' needs at least one stage")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    checkpoint_dir = args.checkpoint_dir or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "checkpoints", args.year_month
+    )
+    stages = build_stages(args.year_month, json_dir=args.json_dir, db_name=args.db_name,
+                          profiling_mode=args.profiling_mode, offline=args.offline, backend=args.backend)
+    run_name = f"pipeline_{args.year_month}_{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+    instrumentation = Instrumentation(run_name, profiler=args.profile, trace_memory=args.trace_memory)
+    runner = PipelineRunner(stages, checkpoint_dir, max_workers=args.workers, instrumentation=instrumentation)
+    try:
+        outcome = runner.run(
+            targets=args.stages or None,
+            force=args.stages if args.command == "force" else (),
+            resume=args.command == "resume",
+        )
+    except Exception as e:
+        print(f"\n\nPipeline stopped: {e!r}. Rerun with 'resume' to continue.")
+        return 1
+    finally:
+        instrumentation.write_report()
+        instrumentation.close()
+    print("\n\n" + ", ".join(f"{name}: {result}" for name, result in outcome.items()))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import pytest
+import os
+import sys
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from benchmarks.synthetic import generate_schedule, layout, parse_scale
+from benchmarks.run_benchmarks import compare, run_suite
+from src.data_cleaning import TVMazeDataCleaner
+from src.data_processing import TVMazeDataProcessor
+
+def test_parse_scale():
+    assert parse_scale("1k") == 1_000
+    assert parse_scale("10M") == 10_000_000
+    assert parse_scale("2.5k") == 2_500
+    assert layout(10_000_000)[0] == 200
+
+def test_generator_is_deterministic_and_shaped(tmp_path):
+    first = generate_schedule(str(tmp_path / "a"), 1_000)
+    second = generate_schedule(str(tmp_path / "b"), 1_000)
+    assert len(first) == 31
+    for a, b in zip(first, second):
+        with open(a, "rb") as fa, open(b, "rb") as fb:
+            assert fa.read() == fb.read()
+
+    processor = TVMazeDataProcessor(str(tmp_path / "a"))
+    json_files = processor.get_json_files("2024-01")
+    processed = processor.tv_shows_to_dataframe(json_files)
+    streamed = processor.tv_shows_to_dataframe(json_files, streaming=True)
+    assert len(processed) == len(streamed) == processed['id'].nunique()
+    cleaned = TVMazeDataCleaner(processed).clean_data()
+    assert cleaned['show_genres'].map(len).min() >= 1
+
+def test_suite_and_regression_check(tmp_path):
+    json_files = generate_schedule(str(tmp_path / "json"), 1_000)
+    results = run_suite(json_files, 1_000, str(tmp_path), repeat=1, only=["clean", "db_bulk_load"])
+    assert [result["benchmark"] for result in results] == ["clean", "db_bulk_load"]
+
+    history = [{"commit": "old", "scale": 1_000, **result} for result in results]
+    slower = [{**result, "seconds": result["seconds"] * 2} for result in results]
+    assert compare(results, history, "new", 1_000, threshold=0.2) == []
+    assert [r[0] for r in compare(slower, history, "new", 1_000, threshold=0.2)] == ["clean", "db_bulk_load"]
+    assert compare(slower, history, "old", 1_000, threshold=0.2) == []
@@ -0,0 +1,70 @@
+import pytest
+import json
+import os
+import subprocess
+import sys
+import time
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.cli import main
+
+CLI_PATH = os.path.join(path_to_modules, "src", "cli.py")
+# Wall time allowed for a lightweight subcommand, interpreter start included
+STARTUP_BUDGET_SECONDS = 1.5
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "requests", "aiohttp", "ydata_profiling", "duckdb", "polars")
+
+@pytest.mark.parametrize("command", [["query", "--list"], ["report"]])
+def test_lightweight_startup(tmp_path, command):
+    if command == ["report"]:
+        command = command + ["--report-dir", str(tmp_path)]
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", CLI_PATH] + command,
+                            capture_output=True, text=True, timeout=30)
+    elapsed = time.perf_counter() - start
+
+    imported = {line.split("|")[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+    assert not imported & set(HEAVY_MODULES)
+    assert elapsed < STARTUP_BUDGET_SECONDS
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_process_load_query_report(tmp_path, capsys, engine):
+    if engine == "polars":
+        pytest.importorskip("polars")
+    report_dir = str(tmp_path / "reports")
+    db_name = str(tmp_path / "cli.db")
+    assert main(["process", "2024-01", "--project-root", str(tmp_path), "--report-dir", report_dir,
+                 "--engine", engine]) == 0
+    assert main(["load", "2024-01", "--project-root", str(tmp_path), "--backend", "sqlite",
+                 "--db-name", db_name, "--report-dir", report_dir, "--engine", engine]) == 0
+
+    capsys.readouterr()
+    assert main(["query", "SELECT COUNT(*) AS n FROM airings WHERE airdate >= ?", "--param", "2024-01-01",
+                 "--backend", "sqlite", "--db-name", db_name, "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)[0]["n"] > 0
+    assert main(["query", "genre_count", "--backend", "sqlite", "--db-name", db_name, "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)
+
+    assert main(["report", "--report-dir", report_dir, "--format", "json"]) == 0
+    stages = [row["stage"] for row in json.loads(capsys.readouterr().out)]
+    assert "SQLiteDB.load_incremental" in stages
+
+    with pytest.raises(SystemExit):
+        main(["process", "January"])
+
+def test_query_without_summary_tables(tmp_path, capsys):
+    # Databases loaded before the summary tables existed still answer the named queries
+    import sqlite3
+    db_name = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE shows (id INTEGER PRIMARY KEY, average_runtime_minutes REAL)")
+    conn.executemany("INSERT INTO shows (average_runtime_minutes) VALUES (?)", [(30,), (60,)])
+    conn.commit()
+    conn.close()
+
+    capsys.readouterr()
+    assert main(["query", "avg_runtime", "--backend", "sqlite", "--db-name", db_name, "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out) == [{"avg_runtime": 45.0}]
+    assert main(["query", "SELECT * FROM summary_runtime", "--backend", "sqlite", "--db-name", db_name]) == 1
+    assert "no such table" in capsys.readouterr().out
@@ -55,3 +55,24 @@ def test_clean_data(sample_dataframe):
     assert cleaned_df.loc[0, 'show_schedule_days'] == ['Unknown']
     assert cleaned_df.loc[0, 'show_genres'] == ['Undefined']
 
+
+def test_clean_data_leaves_input_untouched(sample_dataframe):
+    before = sample_dataframe.copy()
+    cleaned_df = TVMazeDataCleaner(sample_dataframe).clean_data()
+
+    pd.testing.assert_frame_equal(sample_dataframe, before)
+    assert isinstance(cleaned_df['show_language'].dtype, pd.CategoricalDtype)
+    assert cleaned_df['average_runtime_minutes'].dtype == "Int64"
+    assert isinstance(cleaned_df['show_name'].dtype, pd.StringDtype)
+
+def test_clean_data_numpy_list_cells(sample_dataframe, tmp_path):
+    # read_parquet gives numpy arrays instead of lists in list columns
+    sample_dataframe = pd.concat([sample_dataframe] * 3, ignore_index=True)
+    sample_dataframe['genres'] = [[], ['Drama', 'Comedy'], None]
+    sample_dataframe['schedule.days'] = [['Monday'], [], None]
+    sample_dataframe.to_parquet(tmp_path / "shows.parquet")
+    raw_df = pd.read_parquet(tmp_path / "shows.parquet")
+
+    cleaned_df = TVMazeDataCleaner(raw_df).clean_data()
+    assert [list(genres) for genres in cleaned_df['show_genres']] == [['Undefined'], ['Drama', 'Comedy'], ['Undefined']]
+    assert [list(days) for days in cleaned_df['show_schedule_days']] == [['Monday'], ['Unknown'], ['Unknown']]
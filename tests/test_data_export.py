@@ -0,0 +1,78 @@
+import pytest
+import os
+import sys
+import pandas as pd
+import pyarrow.parquet as pq
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.data_export import ParquetExporter
+
+PARQUET_PATH = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+
+@pytest.fixture
+def exporter(tmp_path):
+    return ParquetExporter(project_root=str(tmp_path))
+
+def test_dataset_layout_and_round_trip(exporter):
+    df = pd.read_parquet(PARQUET_PATH)
+    dataset_dir = exporter.export_to_dataset(df, "2024-01", row_group_size=100)
+
+    part = os.path.join(dataset_dir, "year=2024", "month=1", "part-0.parquet")
+    metadata = pq.ParquetFile(part).metadata
+    assert metadata.num_row_groups == -(-len(df) // 100)
+    first_column = metadata.row_group(0).column(0)
+    assert first_column.compression == "ZSTD"
+    assert first_column.statistics.min == df['tvmaze_id'].min()
+
+    read = exporter.read_dataset(filters=[("year", "=", 2024), ("month", "=", 1)])
+    expected = df.sort_values(by="tvmaze_id").reset_index(drop=True)
+    assert read.drop(columns=["year", "month"]).equals(expected)
+
+def test_months_append_and_reexport_replaces(exporter):
+    df = pd.read_parquet(PARQUET_PATH)
+    exporter.export_to_dataset(df, "2024-01")
+    exporter.export_to_dataset(df.head(50), "2024-02")
+    exporter.export_to_dataset(df.head(10), "2024-02")
+
+    february = exporter.read_dataset(columns=["tvmaze_id", "show_status"], filters=[("month", "=", 2)])
+    assert list(february.columns) == ["tvmaze_id", "show_status"]
+    assert len(february) == 10
+    assert len(exporter.read_dataset(columns=["tvmaze_id"])) == len(df) + 10
+
+def test_partition_on_column(exporter):
+    df = pd.read_parquet(PARQUET_PATH)
+    dataset_dir = exporter.export_to_dataset(df, "2024-01", partitioning=("show_status",), dataset_name="by_status")
+    assert len(os.listdir(dataset_dir)) == df['show_status'].nunique()
+
+    ended = exporter.read_dataset(filters=[("show_status", "=", "Ended")], dataset_name="by_status")
+    assert len(ended) == (df['show_status'] == "Ended").sum()
+
+def test_failed_reexport_keeps_the_month(exporter, monkeypatch):
+    import pyarrow.dataset as ds
+
+    df = pd.read_parquet(PARQUET_PATH)
+    exporter.export_to_dataset(df, "2024-01", partitioning=("show_status",), dataset_name="by_status")
+
+    def failing_write(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ds, "write_dataset", failing_write)
+    with pytest.raises(OSError):
+        exporter.export_to_dataset(df.head(5), "2024-01", partitioning=("show_status",), dataset_name="by_status")
+    assert len(exporter.read_dataset(columns=["tvmaze_id"], dataset_name="by_status")) == len(df)
+    assert os.listdir(exporter.data_dir) == ["by_status"]
+
+def test_months_append_under_column_partitioning(exporter):
+    df = pd.read_parquet(PARQUET_PATH)
+    dataset_dir = exporter.export_to_dataset(df, "2024-01", partitioning=("show_status",), dataset_name="by_status")
+    exporter.export_to_dataset(df.head(50), "2024-02", partitioning=("show_status",), dataset_name="by_status")
+    assert len(exporter.read_dataset(columns=["tvmaze_id"], dataset_name="by_status")) == len(df) + 50
+
+    # Re-exporting a month replaces all of its rows, even under statuses it no longer has
+    ended = df[df["show_status"] == "Ended"].head(5)
+    exporter.export_to_dataset(ended, "2024-01", partitioning=("show_status",), dataset_name="by_status")
+    january = exporter.read_dataset(columns=["show_status"], filters=[("month", "=", 1)], dataset_name="by_status")
+    assert len(january) == 5 and set(january["show_status"]) == {"Ended"}
+    assert os.path.isdir(os.path.join(dataset_dir, "show_status=Ended", "year=2024", "month=1"))
@@ -15,4 +15,166 @@ def test_tvmaze_data_fetcher_init():
 def test_invalid_date_format():
     fetcher = TVMazeDataFetcher()
     with pytest.raises(ValueError):
-        fetcher.fetch_data("invalid-date")
\ No newline at end of file
+        fetcher.fetch_data("invalid-date")
+
+@pytest.fixture
+def stub_server():
+    """
+    Serves a fake TVmaze schedule endpoint that sends ETags, answers matching
+    If-None-Match with 304 and rate limits the first request for 2024-02-03.
+    Yields the URL, the dates requested and when each request arrived.
+    """
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    requests_seen = []
+    request_times = []
+    rate_limited = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            date_str = parse_qs(urlparse(self.path).query)["date"][0]
+            requests_seen.append(date_str)
+            request_times.append(time.monotonic())
+            etag = f'"{date_str}"'
+            if date_str == "2024-02-03" and not rate_limited:
+                rate_limited.append(date_str)
+                status, body, headers = 429, b"", {"Retry-After": "0.2"}
+            elif self.headers.get("If-None-Match") == etag:
+                status, body, headers = 304, b"", {"ETag": etag}
+            else:
+                status, body, headers = 200, json.dumps([{"airdate": date_str}]).encode(), {"ETag": etag}
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/schedule/web", requests_seen, request_times
+    server.shutdown()
+
+def test_fetch_data_concurrent(stub_server, tmp_path):
+    base_url, requests_seen, _ = stub_server
+    fetcher = TVMazeDataFetcher(json_dir=str(tmp_path), base_url=base_url)
+    fetcher.BATCH_SIZE, fetcher.DELAY = 40, 1
+
+    failed = fetcher.fetch_data_concurrent("2024-02")
+
+    assert failed == []
+    assert len(list(tmp_path.glob("2024-02-*.json"))) == 29
+    assert requests_seen.count("2024-02-03") == 2
+
+def test_fetch_data_concurrent_compressed(stub_server, tmp_path):
+    base_url, _, _ = stub_server
+    fetcher = TVMazeDataFetcher(json_dir=str(tmp_path), base_url=base_url, raw_format="ndjson.gz")
+    fetcher.BATCH_SIZE, fetcher.DELAY = 40, 1
+
+    assert fetcher.backfill("2024-02-10", "2024-02-11") == []
+    assert sorted(p.name for p in tmp_path.glob("2024-02-*")) == ["2024-02-10.ndjson.gz", "2024-02-11.ndjson.gz"]
+
+def test_refetch_replaces_other_formats(tmp_path):
+    # A day landed as JSON before the switch to ndjson.gz counts as fetched, and a refetch replaces it
+    (tmp_path / "2024-02-10.json").write_text("[]")
+    fetcher = TVMazeDataFetcher(json_dir=str(tmp_path), raw_format="ndjson.gz")
+
+    assert fetcher._json_exists("2024-02-10")
+    fetcher._save_raw("2024-02-10", [{"id": 1}])
+    assert sorted(p.name for p in tmp_path.glob("2024-02-10.*")) == ["2024-02-10.ndjson.gz"]
+
+def test_rate_limit_budget(stub_server, tmp_path):
+    # The real BATCH_SIZE and DELAY: the whole budget goes out at once, the rest as the window slides
+    base_url, requests_seen, request_times = stub_server
+    fetcher = TVMazeDataFetcher(json_dir=str(tmp_path), base_url=base_url)
+
+    assert fetcher.backfill("2024-02-01", "2024-02-24") == []
+    assert len(requests_seen) == 25
+    for start in request_times:
+        in_window = sum(start <= t < start + fetcher.DELAY for t in request_times)
+        assert in_window <= fetcher.BATCH_SIZE
+    # A full budget is spent in the first window, so the last requests go out right after it
+    assert sum(t < request_times[0] + fetcher.DELAY for t in request_times) == fetcher.BATCH_SIZE
+    assert request_times[-1] - request_times[0] < fetcher.DELAY + 1
+
+def test_backfill_resumes_from_manifest(stub_server, tmp_path):
+    base_url, requests_seen, _ = stub_server
+    fetcher = TVMazeDataFetcher(json_dir=str(tmp_path), base_url=base_url)
+    fetcher.BATCH_SIZE, fetcher.DELAY = 40, 1
+
+    assert fetcher.backfill("2024-02-01", "2024-02-05") == []
+    assert len(list(tmp_path.glob("2024-02-*.json"))) == 5
+
+    # Settled days already in the manifest are not requested again
+    requests_seen.clear()
+    assert fetcher.backfill("2024-02-01", "2024-02-05") == []
+    assert requests_seen == []
+
+    # Revalidation sends conditional requests that come back 304
+    (tmp_path / "2024-02-02.json").unlink()
+    assert fetcher.backfill("2024-02-01", "2024-02-05", revalidate=True) == []
+    assert len(requests_seen) == 5
+    assert (tmp_path / "2024-02-02.json").exists()
+
+def test_range_dates():
+    fetcher = TVMazeDataFetcher()
+    dates = fetcher._range_dates("2023-12", "2024-02")
+    assert dates[0] == "2023-12-01"
+    assert dates[-1] == "2024-02-29"
+    assert len(dates) == 91
+    with pytest.raises(ValueError):
+        fetcher._range_dates("2024-02", "2023-12")
+
+def test_sliding_window_limiter():
+    import asyncio
+    import time
+    from src.data_ingestion import SlidingWindowLimiter
+
+    async def take(n):
+        limiter = SlidingWindowLimiter(max_requests=5, window=0.25)
+        times = []
+        for _ in range(n):
+            async with limiter:
+                times.append(time.monotonic())
+        return times
+
+    times = asyncio.run(take(12))
+    # 5 at once, 5 more a window later, the last 2 a window after that
+    assert times[4] - times[0] < 0.1
+    assert times[5] - times[0] >= 0.25
+    assert times[10] - times[5] >= 0.25
+    assert times[-1] - times[0] < 0.7
+
+def test_sliding_window_counts_from_the_end_of_requests():
+    import asyncio
+    import time
+    from src.data_ingestion import SlidingWindowLimiter
+
+    async def run():
+        limiter = SlidingWindowLimiter(max_requests=2, window=0.2)
+        ends = []
+
+        async def request():
+            async with limiter:
+                await asyncio.sleep(0.1)
+                ends.append(time.monotonic())
+            return time.monotonic()
+
+        first = await asyncio.gather(request(), request())
+        async with limiter:
+            return time.monotonic(), max(first)
+
+    admitted, last_end = asyncio.run(run())
+    # The third request waits a full window after the slow ones finished, not after they started
+    assert admitted - last_end >= 0.19
@@ -0,0 +1,55 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+pytest.importorskip("polars")
+from src.data_cleaning import TVMazeDataCleaner
+from src.data_lazy import TVMazeLazyEngine
+from src.data_normalization import TVMazeDataNormalizer
+from src.data_processing import TVMazeDataProcessor
+
+LOOKUP_TABLES = ("languages", "show_types", "statuses", "genres", "schedule_days")
+
+@pytest.fixture(scope="module")
+def json_files():
+    return TVMazeDataProcessor().get_json_files("2024-01")
+
+def assert_tables_equal(left, right):
+    assert list(left) == list(right)
+    for table_name in right:
+        pd.testing.assert_frame_equal(left[table_name], right[table_name], obj=table_name)
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_matches_pandas_path(json_files, streaming):
+    processed = TVMazeDataProcessor().tv_shows_to_dataframe(json_files, streaming=streaming)
+    cleaned = TVMazeDataCleaner(processed).clean_data()
+    normalized = TVMazeDataNormalizer(cleaned).transform()
+
+    source = json_files if streaming else processed
+    lazy_cleaned, lazy_normalized = TVMazeLazyEngine().run(source)
+    pd.testing.assert_frame_equal(lazy_cleaned, cleaned)
+    assert_tables_equal(lazy_normalized, normalized)
+    assert_tables_equal(TVMazeLazyEngine().transform(cleaned, cleaned=True), normalized)
+
+def test_stored_lookups(json_files):
+    cleaned = TVMazeDataCleaner(TVMazeDataProcessor().tv_shows_to_dataframe(json_files, streaming=True)).clean_data()
+    half = len(cleaned) // 2
+    first = TVMazeDataNormalizer(cleaned.iloc[:half]).transform()
+    lookups = {table_name: first[table_name] for table_name in LOOKUP_TABLES}
+    second = cleaned.iloc[half:].reset_index(drop=True)
+
+    expected = TVMazeDataNormalizer(second, lookups=lookups).transform()
+    assert_tables_equal(TVMazeLazyEngine(lookups=lookups).transform(second, cleaned=True), expected)
+
+def test_dropped_columns_are_not_read(tmp_path, json_files):
+    processed = TVMazeDataProcessor().tv_shows_to_dataframe(json_files)
+    assert "network.name" in processed.columns
+    processed.to_parquet(tmp_path / "processed.parquet")
+
+    plan = TVMazeLazyEngine().clean(str(tmp_path / "processed.parquet")).explain()
+    assert f"PROJECT {len(TVMazeDataCleaner(processed.head()).clean_data().columns)}/{len(processed.columns)} COLUMNS" in plan
+    assert len(TVMazeLazyEngine().transform(str(tmp_path / "processed.parquet"))["shows"]) == len(processed)
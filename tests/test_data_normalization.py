@@ -0,0 +1,47 @@
+import pytest
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.data_normalization import TVMazeDataNormalizer
+from src.db_loader import SQLiteDB
+
+PARQUET_PATH = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+
+def test_lookup_ids_are_stable(tmp_path):
+    db = SQLiteDB(db_name=str(tmp_path / "lookups.db"))
+    db.cursor.executemany("INSERT INTO genres (id, genre) VALUES (?, ?)", [(7, "Drama"), (40, "Obsolete")])
+    db.conn.commit()
+
+    genres = TVMazeDataNormalizer(PARQUET_PATH, lookups=db.fetch_lookups()).transform()['genres']
+    genre_ids = dict(zip(genres['genre'], genres['id']))
+    assert genre_ids['Drama'] == 7
+    assert sorted(genre_ids.values())[0] == 7
+    assert min(i for g, i in genre_ids.items() if g != 'Drama') == 41
+
+def test_second_month_keeps_ids(tmp_path):
+    db = SQLiteDB(db_name=str(tmp_path / "months.db"))
+    first = TVMazeDataNormalizer(PARQUET_PATH, lookups=db.fetch_lookups()).transform()
+    db.load_incremental(first)
+
+    # Reloading with stored lookups reproduces the same ids and inserts no lookup rows
+    second = TVMazeDataNormalizer(PARQUET_PATH, lookups=db.fetch_lookups()).transform()
+    for table in ('show_types', 'languages', 'genres', 'statuses', 'schedule_days'):
+        pd.testing.assert_frame_equal(second[table], first[table])
+        assert db.run_query(f"SELECT COUNT(*) AS n FROM {table}")['n'][0] == len(first[table])
+    db.close_connection()
+
+def test_in_memory_source_matches_parquet():
+    from_disk = TVMazeDataNormalizer(PARQUET_PATH).transform()
+    df = pd.read_parquet(PARQUET_PATH)
+    from_frame = TVMazeDataNormalizer(df).transform()
+    from_table = TVMazeDataNormalizer(pa.Table.from_pandas(df, preserve_index=False)).transform()
+
+    assert set(from_frame) == set(from_disk) == set(from_table)
+    for table in from_disk:
+        pd.testing.assert_frame_equal(from_frame[table], from_disk[table])
+        pd.testing.assert_frame_equal(from_table[table], from_disk[table])
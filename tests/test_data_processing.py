@@ -12,4 +12,46 @@ def test_process_tv_shows():
     processor = TVMazeDataProcessor()
     df = processor.process_tv_shows("2024-01")
     assert isinstance(df, pd.DataFrame)
-    assert not df.empty
\ No newline at end of file
+    assert not df.empty
+
+def test_streaming_matches_json_normalize():
+    from src.data_cleaning import TVMazeDataCleaner
+
+    processor = TVMazeDataProcessor()
+    json_files = sorted(processor.get_json_files("2024-01"))
+    expected = TVMazeDataCleaner(processor.tv_shows_to_dataframe(json_files)).clean_data()
+    streamed = TVMazeDataCleaner(processor.tv_shows_to_dataframe(json_files, streaming=True)).clean_data()
+
+    assert list(streamed['tvmaze_id']) == list(expected['tvmaze_id'])
+    for column in streamed.columns:
+        pd.testing.assert_series_equal(streamed[column], expected[column], check_dtype=False)
+
+def test_iter_show_batches_chunks():
+    processor = TVMazeDataProcessor()
+    json_files = sorted(processor.get_json_files("2024-01"))
+    batches = list(processor.iter_show_batches(json_files, batch_size=100))
+    assert all(batch.num_rows == 100 for batch in batches[:-1])
+    assert sum(batch.num_rows for batch in batches) == len(processor.tv_shows_to_dataframe(json_files))
+
+def test_parallel_matches_serial():
+    processor = TVMazeDataProcessor()
+    json_files = processor.get_json_files("2024-01")
+    serial = processor.tv_shows_to_table(json_files)
+    parallel = processor.tv_shows_to_table(json_files, workers=2)
+    assert parallel.equals(serial)
+
+def test_airings_in_the_same_pass():
+    from src.data_processing import AIRING_SCHEMA
+    from src.raw_storage import read_raw
+
+    processor = TVMazeDataProcessor()
+    json_files = processor.get_json_files("2024-01")
+    shows, airings = processor.tv_shows_and_airings_to_tables(json_files, batch_size=500)
+    assert shows.equals(processor.tv_shows_to_table(json_files))
+    assert airings.schema == AIRING_SCHEMA
+    assert airings.num_rows == sum(len(read_raw(path)) for path in json_files)
+    assert str(airings.column("airdate")[0]) == os.path.basename(json_files[0])[:10]
+    assert "" not in airings.column("airtime").to_pylist()
+
+    parallel_shows, parallel_airings = processor.tv_shows_and_airings_to_tables(json_files, workers=2)
+    assert parallel_shows.equals(shows) and parallel_airings.equals(airings)
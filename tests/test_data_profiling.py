@@ -0,0 +1,40 @@
+import pytest
+import os
+import sys
+import json
+import pandas as pd
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.data_profiling import TVMazeDataProfiler
+
+@pytest.fixture
+def sample_dataframe():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'language': ['English', None, 'English', 'Dutch'],
+        'genres': [['Drama', 'Comedy'], [], ['Drama'], ['Horror']],
+        'averageRuntime': [30.0, 60.0, None, 45.0],
+    })
+
+def test_stats_mode(tmp_path, sample_dataframe):
+    profiler = TVMazeDataProfiler(profiling_dir=str(tmp_path), mode="stats")
+    output_path = profiler.generate_profile_report(sample_dataframe)
+
+    with open(output_path, encoding="utf-8") as f:
+        stats = json.load(f)
+    assert stats["rows"] == 4
+    assert stats["columns"]["language"]["null_rate"] == 0.25
+    assert stats["columns"]["language"]["distinct"] == 2
+    assert stats["columns"]["genres"]["distinct"] == 3
+    assert stats["columns"]["averageRuntime"]["quantiles"]["0.5"] == 45.0
+
+def test_off_mode(tmp_path, sample_dataframe):
+    profiler = TVMazeDataProfiler(profiling_dir=str(tmp_path), mode="off")
+    assert profiler.generate_profile_report(sample_dataframe) is None
+    assert os.listdir(tmp_path) == []
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        TVMazeDataProfiler(mode="everything")
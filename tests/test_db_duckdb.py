@@ -0,0 +1,94 @@
+import pytest
+import pandas as pd
+import os
+import sys
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+pytest.importorskip("duckdb")
+from src.db_backend import get_backend
+from src.db_duckdb import DuckDBBackend
+from src.db_loader import SQLiteDB, ANALYTICS_BASE_QUERIES
+from src.db_schema import TABLES, column_names
+
+@pytest.fixture
+def normalized():
+    from src.data_normalization import TVMazeDataNormalizer
+    return TVMazeDataNormalizer(os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")).transform()
+
+def _sorted(df):
+    return df.sort_values(by=list(df.columns)).reset_index(drop=True)
+
+def test_get_backend(tmp_path, monkeypatch):
+    db = get_backend("duckdb", str(tmp_path / "selected.duckdb"))
+    assert isinstance(db, DuckDBBackend)
+    db.close_connection()
+    monkeypatch.setenv("TVMAZE_DB_BACKEND", "sqlite")
+    db = get_backend(db_name=str(tmp_path / "selected.db"))
+    assert isinstance(db, SQLiteDB)
+    db.close_connection()
+    with pytest.raises(ValueError):
+        get_backend("postgres")
+
+def test_schema_matches_sqlite(tmp_path):
+    duck = DuckDBBackend(str(tmp_path / "schema.duckdb"))
+    lite = SQLiteDB(str(tmp_path / "schema.db"))
+    for table_name in TABLES:
+        assert list(duck.run_query(f"SELECT * FROM {table_name} LIMIT 0").columns) == column_names(table_name)
+        assert list(lite.run_query(f"SELECT * FROM {table_name} LIMIT 0").columns) == column_names(table_name)
+    duck.close_connection()
+    lite.close_connection()
+
+def test_analytics_match_sqlite(tmp_path, normalized):
+    duck = DuckDBBackend(str(tmp_path / "bulk.duckdb"))
+    lite = SQLiteDB(str(tmp_path / "bulk.db"))
+    duck.bulk_load(normalized)
+    lite.bulk_load(normalized)
+    for table_name, df in normalized.items():
+        assert duck.run_query(f"SELECT COUNT(*) AS n FROM {table_name}")["n"][0] == len(df)
+    for query in ANALYTICS_BASE_QUERIES.values():
+        pd.testing.assert_frame_equal(_sorted(duck.run_query(query)), _sorted(lite.run_query(query)))
+    duck.close_connection()
+    lite.close_connection()
+
+def test_load_incremental(tmp_path, normalized):
+    db = DuckDBBackend(str(tmp_path / "incremental.duckdb"))
+    assert db.load_incremental(normalized) == {"inserted": len(normalized["shows"]), "updated": 0, "unchanged": 0}
+    genre_rows = db.run_query("SELECT COUNT(*) AS n FROM show_genres")["n"][0]
+    assert db.load_incremental(normalized)["unchanged"] == len(normalized["shows"])
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres")["n"][0] == genre_rows
+
+    # A newer version of one show replaces its row and junction rows only
+    show_id = normalized["shows"]["tvmaze_id"][0]
+    normalized["shows"].loc[0, "last_updated_utc"] += pd.Timedelta(days=1)
+    normalized["show_genres"] = normalized["show_genres"][normalized["show_genres"]["show_id"] != show_id]
+    counts = db.load_incremental(normalized)
+    assert counts["updated"] == 1 and counts["inserted"] == 0
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres WHERE show_id = ?", (int(show_id),))["n"][0] == 0
+
+    # Reloading the older version changes nothing
+    normalized["shows"].loc[0, "last_updated_utc"] -= pd.Timedelta(days=1)
+    assert db.load_incremental(normalized)["unchanged"] == len(normalized["shows"])
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres WHERE show_id = ?", (int(show_id),))["n"][0] == 0
+
+    # Lookup values new to the database get fresh ids when the batch's id is taken
+    lookups = db.fetch_lookups()
+    genres = pd.DataFrame({"id": [1], "genre": ["Brand New Genre"]})
+    assert db._sync_lookup("genres", genres)[1] == lookups["genres"]["id"].max() + 1
+    db.close_connection()
+
+def test_parquet_dataset(tmp_path, normalized):
+    from src.data_export import ParquetExporter
+
+    cleaned = pd.read_parquet(os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet"))
+    exporter = ParquetExporter(str(tmp_path))
+    dataset_dir = exporter.export_to_dataset(cleaned[["tvmaze_id", "show_name", "show_type"]], "2024-01")
+    db = DuckDBBackend(str(tmp_path / "parquet.duckdb"))
+    db.attach_parquet("cleaned_shows", dataset_dir)
+    counts = db.run_query("SELECT year, month, COUNT(*) AS n FROM cleaned_shows GROUP BY ALL")
+    assert counts.values.tolist() == [[2024, 1, len(cleaned)]]
+
+    normalized["genres"].to_parquet(tmp_path / "genres.parquet")
+    assert db.ingest_parquet("genres", str(tmp_path / "genres.parquet")) == len(normalized["genres"])
+    db.close_connection()
@@ -6,11 +6,13 @@ import sys
 path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 if path_to_modules not in sys.path:
     sys.path.insert(0,path_to_modules)
-from src.db_loader import SQLiteDB
+from src.db_loader import SQLiteDB, ANALYTICS_QUERIES, ANALYTICS_BASE_QUERIES
 
 @pytest.fixture
-def db():
-    return SQLiteDB(db_name="test.db")
+def db(tmp_path):
+    db = SQLiteDB(db_name=str(tmp_path / "test.db"))
+    yield db
+    db.close_connection()
 
 def test_table_creation(db):
     db._create_tables()
@@ -22,4 +24,193 @@ def test_insert_data(db):
     test_df = pd.DataFrame({'genre': ['Drama', 'Comedy']})
     db.insert_dataframe(test_df, 'genres')
     result = db.run_query("SELECT * FROM genres")
-    assert len(result) == 2
\ No newline at end of file
+    assert len(result) == 2
+
+def test_load_incremental(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    normalized = TVMazeDataNormalizer(parquet_path).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "incremental.db"))
+
+    counts = db.load_incremental(normalized)
+    assert counts == {"inserted": len(normalized["shows"]), "updated": 0, "unchanged": 0}
+    genre_rows = db.run_query("SELECT COUNT(*) AS n FROM show_genres")["n"][0]
+
+    # Reloading the same month changes nothing
+    assert db.load_incremental(normalized)["unchanged"] == len(normalized["shows"])
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres")["n"][0] == genre_rows
+
+    # A newer version of one show replaces its row and junction rows only
+    show_id = normalized["shows"]["tvmaze_id"][0]
+    normalized["shows"].loc[0, "last_updated_utc"] += pd.Timedelta(days=1)
+    normalized["show_genres"] = normalized["show_genres"][normalized["show_genres"]["show_id"] != show_id]
+    counts = db.load_incremental(normalized)
+    assert counts["updated"] == 1 and counts["inserted"] == 0
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres WHERE show_id = ?", (int(show_id),))["n"][0] == 0
+    db.close_connection()
+
+def test_load_batches(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    normalized = TVMazeDataNormalizer(parquet_path).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "batches.db"))
+
+    # A failing batch rolls back the batches before it
+    broken = dict(normalized, show_genres=normalized["show_genres"].rename(columns={"genre_id": "nope"}))
+    with pytest.raises(Exception):
+        db.load_batches([(normalized, None), (broken, None)])
+    assert db.run_query("SELECT COUNT(*) AS n FROM shows")["n"][0] == 0
+
+    counts = db.load_batches([(normalized, None), (normalized, None)])
+    assert [c["inserted"] for c in counts] == [len(normalized["shows"]), 0]
+    assert counts[1]["unchanged"] == len(normalized["shows"])
+    assert db.data_version() == 1
+    db.close_connection()
+
+def test_bulk_load_is_atomic(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    normalized = TVMazeDataNormalizer(parquet_path).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "bulk.db"))
+
+    broken = dict(normalized, show_schedule_days=normalized["show_schedule_days"].rename(columns={"day_id": "nope"}))
+    with pytest.raises(Exception):
+        db.bulk_load(broken)
+    assert db.run_query("SELECT COUNT(*) AS n FROM shows")["n"][0] == 0
+
+    db.bulk_load(normalized)
+    assert db.cursor.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # Durability and memory settings go back to the connection defaults after the load
+    assert db.cursor.execute("PRAGMA synchronous").fetchone()[0] == 2
+    assert db.cursor.execute("PRAGMA temp_store").fetchone()[0] == 0
+    for table_name, df in normalized.items():
+        assert db.run_query(f"SELECT COUNT(*) AS n FROM {table_name}")["n"][0] == len(df)
+    db.close_connection()
+
+@pytest.mark.parametrize("query_name, expected_index", [
+    ("avg_runtime", "idx_shows_average_runtime_minutes"),
+    ("genre_count", "idx_show_genres_show_id_genre_id"),
+    ("unique_domains", "idx_shows_official_site_url"),
+])
+def test_analytics_queries_use_indexes(tmp_path, query_name, expected_index):
+    db = SQLiteDB(db_name=str(tmp_path / "plans.db"))
+    plan = [row[3] for row in db.cursor.execute("EXPLAIN QUERY PLAN " + ANALYTICS_BASE_QUERIES[query_name])]
+    assert any(f"COVERING INDEX {expected_index}" in step for step in plan)
+    assert not any(step in ("SCAN shows", "SCAN s", "SCAN sg") for step in plan)
+    db.close_connection()
+
+def _summaries_match_base_tables(db):
+    from src.db_loader import SUMMARY_DIMENSIONS
+    for dimension, (table_name, _, column) in SUMMARY_DIMENSIONS.items():
+        expected = db.run_query(f"SELECT IFNULL({column}, 0) AS value_id, COUNT(*) AS show_count FROM {table_name} GROUP BY 1 ORDER BY 1")
+        stored = db.run_query("SELECT value_id, show_count FROM summary_counts WHERE dimension = ? ORDER BY 1", (dimension,))
+        pd.testing.assert_frame_equal(stored, expected)
+    for name in ("avg_runtime", "unique_domains"):
+        stored = db.run_query(ANALYTICS_QUERIES[name]).sort_values(by=list(db.run_query(ANALYTICS_QUERIES[name]).columns))
+        expected = db.run_query(ANALYTICS_BASE_QUERIES[name]).sort_values(by=list(stored.columns))
+        pd.testing.assert_frame_equal(stored.reset_index(drop=True), expected.reset_index(drop=True))
+    genres = db.run_query(ANALYTICS_QUERIES["genre_count"]).set_index("genre")["show_count"].sort_index()
+    base_genres = db.run_query(ANALYTICS_BASE_QUERIES["genre_count"]).set_index("genre")["show_count"].sort_index()
+    # The base query also lists shows without genres as a NULL genre with a count of 0
+    base_genres = base_genres[base_genres > 0]
+    pd.testing.assert_series_equal(genres, base_genres)
+    stats = db.run_query(ANALYTICS_QUERIES["runtime_stats"]).iloc[0]
+    bounds = db.run_query("SELECT MIN(average_runtime_minutes) AS lo, MAX(average_runtime_minutes) AS hi FROM shows").iloc[0]
+    assert (stats["runtime_min"], stats["runtime_max"]) == (bounds["lo"], bounds["hi"])
+
+def test_insert_dataframe_and_dml_keep_summaries(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+    from src.db_loader import LOAD_ORDER
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    normalized = TVMazeDataNormalizer(parquet_path).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "summaries.db"))
+    for table_name in LOAD_ORDER:
+        if table_name in normalized:
+            db.insert_dataframe(normalized[table_name], table_name)
+    assert db.run_query("SELECT COUNT(*) AS n FROM shows")["n"][0] == len(normalized["shows"])
+    _summaries_match_base_tables(db)
+
+    db.run_query("DELETE FROM show_genres WHERE show_id IN (SELECT tvmaze_id FROM shows LIMIT 10)")
+    db.run_query("UPDATE shows SET average_runtime_minutes = 999 WHERE tvmaze_id = (SELECT MIN(tvmaze_id) FROM shows)")
+    _summaries_match_base_tables(db)
+    db.close_connection()
+
+def test_older_version_does_not_replace_newer(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    older = TVMazeDataNormalizer(parquet_path).transform()
+    newer = {table_name: df.copy() for table_name, df in older.items()}
+    show_id = newer["shows"]["tvmaze_id"][0]
+    newer["shows"].loc[0, "last_updated_utc"] += pd.Timedelta(days=1)
+    newer["show_genres"] = newer["show_genres"][newer["show_genres"]["show_id"] != show_id]
+    db = SQLiteDB(db_name=str(tmp_path / "out_of_order.db"))
+
+    # The newer snapshot loads first, then an older month is reloaded
+    db.load_incremental(newer)
+    counts = db.load_incremental(older)
+    assert counts == {"inserted": 0, "updated": 0, "unchanged": len(older["shows"])}
+    stored = db.run_query("SELECT last_updated_utc FROM shows WHERE tvmaze_id = ?", (int(show_id),))
+    assert stored["last_updated_utc"][0] == newer["shows"]["last_updated_utc"][0].strftime("%Y-%m-%d %H:%M:%S")
+    assert db.run_query("SELECT COUNT(*) AS n FROM show_genres WHERE show_id = ?", (int(show_id),))["n"][0] == 0
+    _summaries_match_base_tables(db)
+    db.close_connection()
+
+def test_summaries_follow_incremental_loads(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    parquet_path = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+    normalized = TVMazeDataNormalizer(parquet_path).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "summaries.db"))
+    db.load_incremental(normalized)
+    _summaries_match_base_tables(db)
+
+    # Newer versions of a few shows: other language, genres and runtime, or a new site
+    shows = normalized["shows"]
+    changed = shows["tvmaze_id"].head(5).tolist()
+    shows.loc[:4, "last_updated_utc"] += pd.Timedelta(days=1)
+    shows.loc[:4, "language_id"] = shows["language_id"].max()
+    shows.loc[:4, "average_runtime_minutes"] = 999
+    shows.loc[:1, "official_site_url"] = "https://only.example.com/"
+    genres = normalized["show_genres"]
+    normalized["show_genres"] = genres[~genres["show_id"].isin(changed[:2])]
+    assert db.load_incremental(normalized)["updated"] == 5
+    _summaries_match_base_tables(db)
+    assert db.run_query(ANALYTICS_QUERIES["runtime_stats"])["runtime_max"][0] == 999
+
+    # Databases loaded before the summaries existed are rebuilt on open
+    db.cursor.execute("DELETE FROM summary_runtime")
+    db.conn.commit()
+    db.close_connection()
+    db = SQLiteDB(db_name=str(tmp_path / "summaries.db"))
+    _summaries_match_base_tables(db)
+    db.close_connection()
+
+def test_summaries_after_bulk_load(tmp_path):
+    from src.data_normalization import TVMazeDataNormalizer
+
+    normalized = TVMazeDataNormalizer(os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")).transform()
+    db = SQLiteDB(db_name=str(tmp_path / "bulk_summaries.db"))
+    db.bulk_load(normalized)
+    _summaries_match_base_tables(db)
+    db.close_connection()
+
+def test_load_airings(tmp_path):
+    from src.data_processing import TVMazeDataProcessor
+
+    _, airings = TVMazeDataProcessor().process_tv_shows_and_airings("2024-01")
+    db = SQLiteDB(db_name=str(tmp_path / "airings.db"))
+    db.load_airings(airings)
+    db.load_airings(airings)  # Reloading a month replaces its rows
+    assert db.run_query("SELECT COUNT(*) AS n FROM airings")["n"][0] == len(airings)
+    day = db.run_query("SELECT airdate, COUNT(*) AS n FROM airings WHERE airdate = ? GROUP BY airdate", ("2024-01-15",))
+    assert day["n"][0] == (airings["airdate"].astype(str) == "2024-01-15").sum()
+
+    plan = [row[3] for row in db.cursor.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM airings WHERE airdate BETWEEN '2024-01-01' AND '2024-01-07'")]
+    assert any("INDEX idx_airings_airdate_show_id" in step for step in plan)
+    db.close_connection()
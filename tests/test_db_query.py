@@ -0,0 +1,82 @@
+import pytest
+import os
+import sys
+import sqlite3
+import threading
+import pyarrow as pa
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.data_normalization import TVMazeDataNormalizer
+from src.db_loader import SQLiteDB, ANALYTICS_QUERIES
+from src.db_query import QueryEngine
+
+PARQUET_PATH = os.path.join(path_to_modules, "data", "tvmaze_data_2024-01.parquet")
+
+@pytest.fixture
+def loaded_db(tmp_path):
+    db = SQLiteDB(db_name=str(tmp_path / "query.db"))
+    db.load_incremental(TVMazeDataNormalizer(PARQUET_PATH).transform())
+    yield db
+    db.close_connection()
+
+def test_cache_invalidated_by_load(loaded_db):
+    engine = QueryEngine(loaded_db.db_path, pool_size=2)
+    engine.prepare(ANALYTICS_QUERIES)
+    engine.prepare("show_by_id", "SELECT show_name FROM shows WHERE tvmaze_id = ?")
+
+    engine.prepare("genre_rows", "SELECT COUNT(*) AS n FROM show_genres")
+
+    first = engine.query("genre_rows")
+    assert engine.query("genre_rows") is first
+    assert (engine.hits, engine.misses) == (1, 1)
+    name = engine.query("show_by_id", (int(loaded_db.run_query("SELECT MIN(tvmaze_id) AS i FROM shows")["i"][0]),))
+    assert len(name) == 1
+
+    version = engine.data_version()
+    loaded_db.run_query("DELETE FROM show_genres")
+    assert engine.data_version() == version + 1
+    after = engine.query("genre_rows")
+    assert after is not first
+    assert after["n"][0] == 0 < first["n"][0]
+    engine.close()
+
+def test_read_only_and_prepare_errors(loaded_db):
+    engine = QueryEngine(loaded_db.db_path, pool_size=1)
+    with pytest.raises(sqlite3.OperationalError):
+        engine.query("DELETE FROM shows", cache=False)
+    with pytest.raises(sqlite3.OperationalError):
+        engine.prepare("broken", "SELECT missing_column FROM shows")
+    assert loaded_db.run_query("SELECT COUNT(*) AS n FROM shows")["n"][0] > 0
+    engine.close()
+
+def test_streaming_rows_and_arrow_batches(loaded_db):
+    engine = QueryEngine(loaded_db.db_path)
+    expected = loaded_db.run_query("SELECT tvmaze_id, show_name FROM shows ORDER BY tvmaze_id")
+
+    batches = list(engine.iter_rows("SELECT tvmaze_id, show_name FROM shows ORDER BY tvmaze_id", batch_size=100))
+    assert all(len(batch) <= 100 for batch in batches)
+    assert [row for batch in batches for row in batch] == list(expected.itertuples(index=False, name=None))
+
+    table = pa.Table.from_batches(engine.iter_arrow_batches(
+        "SELECT tvmaze_id, show_name FROM shows ORDER BY tvmaze_id", batch_size=100))
+    assert table.num_rows == len(expected)
+    assert table.column("tvmaze_id").to_pylist() == expected["tvmaze_id"].tolist()
+    engine.close()
+
+def test_concurrent_readers(loaded_db):
+    engine = QueryEngine(loaded_db.db_path, pool_size=4)
+    results = []
+
+    def read(offset):
+        df = engine.query("SELECT COUNT(*) AS n FROM shows WHERE tvmaze_id > ?", (offset,), cache=False)
+        results.append(int(df["n"][0]))
+
+    threads = [threading.Thread(target=read, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8
+    engine.close()
@@ -0,0 +1,60 @@
+import pytest
+import os
+import sys
+import json
+import pstats
+import pandas as pd
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.instrumentation import Instrumentation
+from src.data_cleaning import TVMazeDataCleaner
+from src.data_processing import TVMazeDataProcessor
+from src.pipeline import PipelineRunner, Stage
+
+def test_wrapped_stage_report_and_log(tmp_path):
+    instrumentation = Instrumentation("run", report_dir=str(tmp_path), profiler="cprofile", trace_memory=True)
+    processor = TVMazeDataProcessor()
+    df = processor.tv_shows_to_dataframe(processor.get_json_files("2024-01-0"))
+    cleaner = instrumentation.wrap(TVMazeDataCleaner(df), "clean_data")
+    cleaned = cleaner.clean_data()
+    report_path = instrumentation.write_report()
+    instrumentation.close()
+
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    (stage,) = report["stages"]
+    assert stage["stage"] == "TVMazeDataCleaner.clean_data"
+    assert stage["rows_in"] == len(df) and stage["rows_out"] == len(cleaned)
+    assert stage["status"] == "ok"
+    assert stage["wall_seconds"] > 0 and stage["peak_rss_bytes"] > 0 and stage["peak_traced_bytes"] > 0
+    for field in ("cpu_seconds", "bytes_read", "bytes_written"):
+        assert stage[field] >= 0
+
+    with open(instrumentation.log_path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    assert [event["event"] for event in events] == ["stage_start", "stage_end"]
+    assert events[1]["rows_out"] == len(cleaned)
+
+    pstats.Stats(str(tmp_path / "run.TVMazeDataCleaner.clean_data.prof"))
+
+def test_failed_stage_is_recorded(tmp_path):
+    instrumentation = Instrumentation("failing", report_dir=str(tmp_path))
+    with pytest.raises(ZeroDivisionError):
+        with instrumentation.stage("divide"):
+            1 / 0
+    instrumentation.close()
+    (stage,) = instrumentation.report()["stages"]
+    assert stage["status"] == "failed" and "ZeroDivisionError" in stage["error"]
+
+def test_pipeline_runner_records_stages(tmp_path):
+    instrumentation = Instrumentation("pipeline", report_dir=str(tmp_path))
+    stages = [
+        Stage("make", lambda: {"rows": pd.DataFrame({"x": range(5)})}, outputs={"rows": "frame"}),
+        Stage("halve", lambda rows: {"half": rows.head(2)}, inputs=("rows",), outputs={"half": "frame"}),
+    ]
+    PipelineRunner(stages, str(tmp_path / "checkpoints"), instrumentation=instrumentation).run()
+    instrumentation.close()
+    rows = {stage["stage"]: (stage["rows_in"], stage["rows_out"]) for stage in instrumentation.report()["stages"]}
+    assert rows == {"make": (None, 5), "halve": (5, 2)}
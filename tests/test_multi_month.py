@@ -0,0 +1,71 @@
+import pytest
+import os
+import sys
+import shutil
+import sqlite3
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.db_loader import SQLiteDB
+from src.multi_month import SingleWriter, month_range, process_month, run_months
+
+MONTHS = ["2024-01", "2024-02", "2024-03"]
+# Shows with their lookup values instead of ids, which can differ from a sequential run
+SHOWS_QUERY = """
+    SELECT s.tvmaze_id, s.show_name, s.last_updated_utc, l.language, t.show_type, st.status
+    FROM shows s
+    LEFT JOIN languages l ON l.id = s.language_id
+    LEFT JOIN show_types t ON t.id = s.show_type_id
+    LEFT JOIN statuses st ON st.id = s.status_id
+    ORDER BY s.tvmaze_id
+"""
+GENRES_QUERY = """
+    SELECT sg.show_id, g.genre FROM show_genres sg JOIN genres g ON g.id = sg.genre_id ORDER BY 1, 2
+"""
+
+@pytest.fixture(scope="module")
+def json_dir(tmp_path_factory):
+    # Each month replays a different week of the January sample, so shows recur across months
+    json_dir = tmp_path_factory.mktemp("json")
+    for index, year_month in enumerate(MONTHS):
+        for day in range(1, 8):
+            source = os.path.join(path_to_modules, "json", f"2024-01-{index * 7 + day:02d}.json")
+            shutil.copy(source, json_dir / f"{year_month}-{day:02d}.json")
+    return str(json_dir)
+
+def test_month_range():
+    assert month_range("2023-11", "2024-02") == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    with pytest.raises(ValueError):
+        month_range("2024-02", "2024-01")
+
+def test_matches_sequential_loads(tmp_path, json_dir):
+    sequential = SQLiteDB(db_name=str(tmp_path / "sequential.db"))
+    for year_month in MONTHS:
+        normalized, airings = process_month(year_month, json_dir, lookups=sequential.fetch_lookups(), export=False)
+        sequential.load_incremental(normalized)
+        sequential.load_airings(airings)
+
+    counts = run_months(MONTHS + ["2024-04"], json_dir=json_dir, project_root=str(tmp_path),
+                        db_name=str(tmp_path / "parallel.db"), workers=2, max_batch=2)
+    assert list(counts) == MONTHS
+    assert counts["2024-01"]["inserted"] > 0 and counts["2024-02"]["updated"] + counts["2024-02"]["unchanged"] > 0
+    assert os.path.isdir(tmp_path / "data" / "tvmaze_dataset" / "year=2024" / "month=3")
+
+    parallel = SQLiteDB(db_name=str(tmp_path / "parallel.db"))
+    for query in (SHOWS_QUERY, GENRES_QUERY, "SELECT * FROM airings ORDER BY episode_id",
+                  "SELECT * FROM summary_sites ORDER BY official_site_url"):
+        assert parallel.run_query(query).equals(sequential.run_query(query))
+    assert parallel.run_query("SELECT version FROM data_version")["version"][0] <= 3
+    parallel.close_connection()
+    sequential.close_connection()
+
+def test_writer_fails_when_the_database_cannot_open(tmp_path):
+    # The writer keeps draining the bounded queue, so producers get the error instead of blocking
+    writer = SingleWriter("sqlite", str(tmp_path / "missing" / "test.db"), max_batch=1).start()
+    with pytest.raises(sqlite3.OperationalError):
+        for _ in range(5):
+            writer.put("2024-01", {}, None)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.close()
+    assert not writer._thread.is_alive()
@@ -0,0 +1,87 @@
+import pytest
+import os
+import sys
+import threading
+import pandas as pd
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.pipeline import PipelineRunner, Stage, build_stages
+
+def toy_stages(calls, source, fail=None, barrier=None):
+    def step(name, produce):
+        def func(**inputs):
+            calls.append(name)
+            if barrier is not None and name in ("left", "right"):
+                barrier.wait(timeout=5)
+            if fail == name:
+                raise RuntimeError(f"{name} broke")
+            return produce(**inputs)
+        return func
+
+    return [
+        Stage("extract", step("extract", lambda: {"rows": pd.DataFrame({"x": list(source)})}),
+              outputs={"rows": "frame"}, volatile=True),
+        Stage("left", step("left", lambda rows: {"total": int(rows["x"].sum())}),
+              inputs=("rows",), outputs={"total": "json"}),
+        Stage("right", step("right", lambda rows: {"parity": rows.assign(even=rows["x"] % 2 == 0)}),
+              inputs=("rows",), outputs={"parity": "frame"}),
+        Stage("report", step("report", lambda total, parity: {"report": {"total": total, "even": int(parity["even"].sum())}}),
+              inputs=("total", "parity"), outputs={"report": "json"}),
+    ]
+
+def test_unchanged_inputs_are_skipped(tmp_path):
+    calls = []
+    outcome = PipelineRunner(toy_stages(calls, [1, 2, 3]), str(tmp_path)).run()
+    assert set(outcome.values()) == {"ran"}
+
+    # The volatile stage reruns, but identical output keeps everything downstream cached
+    calls.clear()
+    runner = PipelineRunner(toy_stages(calls, [1, 2, 3]), str(tmp_path))
+    assert runner.run() == {"extract": "ran", "left": "skipped", "right": "skipped", "report": "skipped"}
+    assert calls == ["extract"]
+    assert runner._load_artifact("report") == {"total": 6, "even": 1}
+
+    calls.clear()
+    runner = PipelineRunner(toy_stages(calls, [1, 2, 3, 4]), str(tmp_path))
+    assert set(runner.run().values()) == {"ran"}
+    assert runner._load_artifact("report") == {"total": 10, "even": 2}
+
+def test_force_and_targets(tmp_path):
+    calls = []
+    PipelineRunner(toy_stages(calls, [1, 2]), str(tmp_path)).run()
+    calls.clear()
+    outcome = PipelineRunner(toy_stages(calls, [1, 2]), str(tmp_path)).run(targets=["left"], force=["left"])
+    assert outcome == {"extract": "ran", "left": "ran"}
+    assert calls == ["extract", "left"]
+
+def test_resume_after_failure(tmp_path):
+    calls = []
+    with pytest.raises(RuntimeError, match="right broke"):
+        PipelineRunner(toy_stages(calls, [1, 2], fail="right"), str(tmp_path)).run()
+    assert "report" not in calls
+
+    calls.clear()
+    outcome = PipelineRunner(toy_stages(calls, [1, 2]), str(tmp_path)).run(resume=True)
+    assert calls == ["right", "report"]
+    assert outcome["extract"] == outcome["left"] == "skipped"
+
+def test_independent_stages_run_concurrently(tmp_path):
+    # Both branches wait on one barrier, which only opens if they run at the same time
+    calls = []
+    barrier = threading.Barrier(2)
+    outcome = PipelineRunner(toy_stages(calls, [1], barrier=barrier), str(tmp_path), max_workers=2).run()
+    assert outcome["report"] == "ran"
+
+def test_pipeline_stages_offline(tmp_path):
+    stages = build_stages("2024-01", project_root=str(tmp_path), db_name=str(tmp_path / "pipeline.db"),
+                          profiling_mode="stats", offline=True)
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    runner = PipelineRunner(stages, checkpoint_dir)
+    runner.run()
+    shows = runner._load_artifact("normalized")["shows"]
+    assert runner._load_artifact("load_counts")["inserted"] == len(shows)
+
+    outcome = PipelineRunner(stages, checkpoint_dir).run()
+    assert [name for name, result in outcome.items() if result == "ran"] == ["fetch"]
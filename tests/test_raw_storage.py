@@ -0,0 +1,76 @@
+import pytest
+import os
+import sys
+import shutil
+
+path_to_modules = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if path_to_modules not in sys.path:
+    sys.path.insert(0,path_to_modules)
+from src.raw_storage import RAW_FORMATS, SHOW_STORE_DIRNAME, ShowStore, raw_path, read_raw, write_raw, migrate_json_dir
+from src.data_processing import TVMazeDataProcessor
+
+@pytest.mark.parametrize("raw_format", RAW_FORMATS)
+def test_write_read_round_trip(tmp_path, raw_format):
+    data = [{"id": 1, "name": "Нежность", "_embedded": {"show": {"id": 7, "genres": []}}}]
+    file_path = raw_path(str(tmp_path), "2024-01-01", raw_format)
+    write_raw(file_path, data)
+    assert read_raw(file_path) == data
+    assert os.listdir(tmp_path) == [os.path.basename(file_path)]
+
+def test_migrate_json_dir(tmp_path):
+    project_root = path_to_modules
+    for day in ("01", "02", "03"):
+        shutil.copy(os.path.join(project_root, "json", f"2024-01-{day}.json"), tmp_path)
+    expected = TVMazeDataProcessor(str(tmp_path)).process_tv_shows("2024-01")
+
+    assert migrate_json_dir(str(tmp_path), "ndjson.gz") == 3
+    assert sorted(os.listdir(tmp_path)) == [f"2024-01-0{day}.ndjson.gz" for day in (1, 2, 3)]
+
+    migrated = TVMazeDataProcessor(str(tmp_path)).process_tv_shows("2024-01")
+    assert migrated.equals(expected)
+
+def test_get_json_files_prefers_newest_format(tmp_path):
+    old_path = raw_path(str(tmp_path), "2024-01-01", "ndjson.gz")
+    new_path = raw_path(str(tmp_path), "2024-01-01", "json")
+    write_raw(old_path, [{"id": 1}])
+    write_raw(new_path, [{"id": 2}])
+    os.utime(old_path, ns=(1_000_000_000, 1_000_000_000))
+    processor = TVMazeDataProcessor(str(tmp_path))
+    assert processor.get_json_files("2024-01") == [new_path]
+
+    # Written at the same time, the compressed copy wins
+    os.utime(new_path, ns=(1_000_000_000, 1_000_000_000))
+    assert processor.get_json_files("2024-01") == [old_path]
+
+@pytest.mark.parametrize("raw_format", ["json", "ndjson.gz"])
+def test_show_store(tmp_path, raw_format, monkeypatch):
+    for day in ("01", "02", "03"):
+        shutil.copy(os.path.join(path_to_modules, "json", f"2024-01-{day}.json"), tmp_path)
+    processor = TVMazeDataProcessor(str(tmp_path))
+    expected = processor.process_tv_shows("2024-01")
+    expected_shows, expected_airings = processor.process_tv_shows_and_airings("2024-01")
+    versions = {(entry["_embedded"]["show"]["id"], entry["_embedded"]["show"]["updated"])
+                for path in processor.get_json_files("2024-01") for entry in read_raw(path)}
+
+    assert migrate_json_dir(str(tmp_path), raw_format, split_shows=True) == 3
+    store_dir = tmp_path / SHOW_STORE_DIRNAME
+    stored = [record for pack in store_dir.glob("pack-*") for record in read_raw(str(pack), resolve_shows=False)]
+    assert len(stored) == len(versions)
+    day_file = raw_path(str(tmp_path), "2024-01-01", raw_format)
+    assert set(read_raw(day_file, resolve_shows=False)[0]["_embedded"]["show"]) == {"id", "updated", "ref", "pack"}
+
+    # Versions already in the store are not written again
+    packs = sorted(os.listdir(store_dir))
+    write_raw(day_file, read_raw(day_file), show_store=ShowStore(str(tmp_path), raw_format))
+    assert sorted(os.listdir(store_dir)) == packs
+
+    assert TVMazeDataProcessor(str(tmp_path)).process_tv_shows("2024-01").equals(expected)
+    shows, airings = TVMazeDataProcessor(str(tmp_path)).process_tv_shows_and_airings("2024-01")
+    assert shows.equals(expected_shows) and airings.equals(expected_airings)
+
+    # The json_normalize path resolves every file through a single store
+    import src.data_processing as data_processing
+    stores = []
+    monkeypatch.setattr(data_processing, "ShowStore", lambda *args: stores.append(args) or ShowStore(*args))
+    assert TVMazeDataProcessor(str(tmp_path)).process_tv_shows("2024-01").equals(expected)
+    assert stores == [(str(tmp_path),)]